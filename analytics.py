@@ -24,7 +24,7 @@ def generate_executive_summary(df: pd.DataFrame, summary_data: pd.DataFrame = No
     avg_score = df['total_score'].mean()
     
     # 找出最突出的类别
-    top_category = df.groupby('product_category')['total_score'].mean().idxmax()
+    top_category = df.groupby('product_category', observed=True)['total_score'].mean().idxmax()
     top_category_growth = df[df['product_category'] == top_category]['growth_rate'].mean()
     
     # 找出情绪最高的产品
@@ -308,7 +308,7 @@ def analyze_price_sensitivity(df: pd.DataFrame, topic_data: pd.DataFrame) -> Dic
     
     # 找出最佳价格区间（按平均分数）
     df['price_range'] = pd.cut(df['price_avg'], bins=[0, 25, 40, 100], labels=['低价', '中价', '高价'])
-    best_price_range = df.groupby('price_range')['total_score'].mean().idxmax()
+    best_price_range = df.groupby('price_range', observed=True)['total_score'].mean().idxmax()
     
     analysis = {
         "price_worry_pct": price_worry_pct,
@@ -34,8 +34,36 @@ def get_local_weeks():
             continue
     return sorted(weeks)
 
+def get_remote_weeks_from_changes():
+    """
+    Get remote weeks from the Drive API catalog, kept current through the
+    changes feed so only the delta since the last run is fetched.
+    Returns None when the Drive API client is unavailable.
+    """
+    try:
+        from data_manager_gdrive import get_change_watcher, extract_week_number_from_filename
+    except ImportError:
+        return None
+    
+    watcher = get_change_watcher()
+    watcher.poll()
+    if not watcher.catalog.loaded or watcher.last_error is not None:
+        return None
+    
+    weeks = set()
+    for file in watcher.catalog.files():
+        if "Week_" in file["name"]:
+            week_num = extract_week_number_from_filename(file["name"])
+            if week_num is not None:
+                weeks.add(week_num)
+    return sorted(weeks)
+
 def get_remote_weeks():
     """Get list of weeks already in Google Drive"""
+    weeks = get_remote_weeks_from_changes()
+    if weeks is not None:
+        return weeks
+    
     remote_path = f"{GDRIVE_CONFIG['remote_name']},drive_id={GDRIVE_CONFIG['shared_drive_id']}:"
     
     cmd = [
@@ -95,6 +123,47 @@ def upload_week(week_num):
         print(f"   ❌ Week {week_num:02d} upload failed: {result.stderr}")
         return False
 
+def update_rollups(week_num):
+    """
+    Precompute the history rollup table for an uploaded week so the
+    dashboard's history tab does not have to aggregate its raw rows.
+    Returns False when the Drive API client is unavailable or the update fails.
+    """
+    try:
+        from data_access import week_revisions
+        from data_manager_gdrive import get_change_watcher
+        from rollups import ROLLUP_COLUMNS, WeekRollups, source_rollup_dir
+        from week_store import read_week_file
+    except ImportError:
+        return False
+    
+    data_file = Path(f"/home/ubuntu/week_{week_num:02d}_data") / f"All_Data_Week_{week_num:02d}.csv"
+    if not data_file.exists():
+        return False
+    
+    try:
+        # The catalog may still be inside its refresh window and not know about
+        # the upload yet: apply pending changes first, then fall back to a full
+        # listing so the rollup is stored under the revision just uploaded
+        watcher = get_change_watcher()
+        watcher.poll()
+        revision = week_revisions([week_num], source="drive").get(week_num)
+        if revision is None or watcher.last_error is not None:
+            watcher.catalog.refresh()
+            revision = week_revisions([week_num], source="drive").get(week_num)
+        if revision is None:
+            print(f"   ❌ Week {week_num:02d} rollup not updated: "
+                  f"All_Data_Week_{week_num:02d}.csv is not in the Drive catalog after upload")
+            return False
+        df = read_week_file(str(data_file), ROLLUP_COLUMNS)
+        rollups = WeekRollups(lambda week: None, source_rollup_dir("drive"))
+        rollups.ingest_week(week_num, df, revision)
+        print(f"   📊 Week {week_num:02d} rollups updated")
+        return True
+    except Exception as e:
+        print(f"   ⚠️  Week {week_num:02d} rollup update failed: {e}")
+        return False
+
 def verify_upload(week_num):
     """Verify that all files for a week are in Google Drive"""
     expected_files = [
@@ -156,6 +225,7 @@ def sync_all():
         if upload_week(week):
             if verify_upload(week):
                 success_count += 1
+                update_rollups(week)
             else:
                 print(f"   ⚠️  Week {week:02d} uploaded but verification failed")
     
@@ -196,7 +266,8 @@ def fill_gaps():
     if can_upload:
         print(f"📤 Can upload from local: {can_upload}")
         for week in can_upload:
-            upload_week(week)
+            if upload_week(week):
+                update_rollups(week)
     
     if need_collection:
         print(f"⚠️  Need to collect data first: {need_collection}")
@@ -217,8 +288,8 @@ def main():
     if args.week:
         # Upload specific week
         success = upload_week(args.week)
-        if success:
-            verify_upload(args.week)
+        if success and verify_upload(args.week):
+            update_rollups(args.week)
     elif args.fill_gaps:
         # Fill gaps in sequence
         fill_gaps()
@@ -14,6 +14,8 @@ from datetime import datetime
 import subprocess
 import random
 
+from week_store import write_week_snapshot, week_parquet_filename
+
 # Configuration
 GDRIVE_CONFIG = {
     "shared_drive_id": "0AFBJflVvo6P2Uk9PVA",
@@ -255,6 +257,11 @@ def generate_csv_files(data, week_number, output_dir):
     df.to_csv(main_file, index=False)
     print(f"   ✅ Created: {main_file}")
     
+    # Columnar snapshot of the same data (preferred by the dashboard loaders)
+    parquet_file = f"{output_dir}/{week_parquet_filename(week_number)}"
+    if write_week_snapshot(df, parquet_file):
+        print(f"   ✅ Created: {parquet_file}")
+    
     # Platform comparison
     platform_stats = df.groupby('platform').agg({
         'product_name': 'count',
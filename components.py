@@ -7,7 +7,206 @@ import streamlit as st
 import plotly.graph_objects as go
 import plotly.express as px
 import pandas as pd
-from typing import Dict, List, Any
+import numpy as np
+from contextlib import nullcontext
+from typing import Callable, Dict, List, Any, Iterable, Optional, Tuple
+
+from exports import EXPORT_FORMATS, available_formats, get_export_cache
+
+# 分数分档：不低于 SCORE_HIGH 为高分，不高于 SCORE_LOW 为低分
+SCORE_HIGH = 45
+SCORE_LOW = 35
+
+# 分页表格可选的每页行数
+PAGE_SIZES = [25, 50, 100, 200]
+
+
+def view_navigation(labels: List[str], mode: str = 'lazy',
+                    key: str = 'active_view') -> Tuple[List[Any], Callable[[str], bool]]:
+    """
+    多视图导航
+
+    mode='tabs' 使用 st.tabs，每次rerun都会执行全部视图；
+    mode='lazy' 使用横向单选导航，只渲染当前选中的视图。
+    返回与 labels 一一对应的容器，以及判断视图是否需要执行的函数；
+    视图内容写在 with 块中，并用该函数跳过未选中的视图：
+
+        (summary, ranking), view_active = view_navigation(["摘要", "排名"])
+        with summary:
+            if view_active("摘要"):
+                st.subheader("摘要")
+
+    Args:
+        labels: 视图名称
+        mode: 'lazy' 或 'tabs'
+        key: 保存当前视图的 session_state 键
+
+    Returns:
+        Tuple[List, Callable[[str], bool]]: (各视图的容器, 视图是否需要执行)
+    """
+    if mode == 'tabs':
+        return list(st.tabs(labels)), lambda label: True
+
+    active = st.radio(
+        "视图",
+        options=labels,
+        horizontal=True,
+        key=key,
+        label_visibility="collapsed"
+    )
+    # 未选中的视图不创建任何元素
+    containers = [st.container() if label == active else nullcontext() for label in labels]
+    return containers, lambda label: label == active
+
+
+def score_band(values, high: float = SCORE_HIGH, low: float = SCORE_LOW) -> np.ndarray:
+    """
+    向量化计算分数分档标签
+
+    Args:
+        values: 分数
+        high: 高分下限（含）
+        low: 低分上限（含）
+
+    Returns:
+        np.ndarray: 每个分数对应的标签（中间分数和空值为空字符串）
+    """
+    scores = np.asarray(values, dtype=np.float64)
+    return np.select([scores >= high, scores <= low], ['🟢 高分', '🔴 低分'], default='')
+
+
+def paginated_table(df: pd.DataFrame, columns: Optional[Dict[str, str]] = None,
+                    band_column: Optional[str] = None, band_label: str = '分档',
+                    key: str = 'table', page_size: int = 50, height: Optional[int] = None,
+                    signature: Optional[str] = None) -> pd.DataFrame:
+    """
+    服务端分页表格
+
+    调用方先在服务端完成筛选与排序，这里只截取当前页，列选择、重命名和
+    分档也只作用于当前页，浏览器每次只收到一页数据。
+
+    Args:
+        df: 已排序的数据
+        columns: 原列名 -> 显示列名（按此顺序显示，不存在的列会被跳过），None 时显示全部列
+        band_column: 计算分档的原列名，None 时不显示分档
+        band_label: 分档列的显示名称
+        key: 控件的 session_state 键前缀
+        page_size: 默认每页行数
+        height: 表格高度
+        signature: 数据与筛选条件的标识（例如 exports.export_key() 的结果），变化时回到第一页
+
+    Returns:
+        pd.DataFrame: 当前页显示的数据
+    """
+    total = len(df)
+    size_key, page_key = f"{key}_page_size", f"{key}_page"
+
+    col1, col2, col3 = st.columns([1, 1, 2])
+    with col1:
+        size = st.selectbox("每页行数", PAGE_SIZES,
+                            index=PAGE_SIZES.index(page_size) if page_size in PAGE_SIZES else 1,
+                            key=size_key)
+    pages = max(1, -(-total // size))
+    # 页码保存在 session_state 中：筛选条件变化后回到第一页；
+    # 未传 signature 时总页数变少、页码超出范围则回到最后一页
+    signature_key = f"{key}_signature"
+    if signature is not None and st.session_state.get(signature_key) != signature:
+        st.session_state[signature_key] = signature
+        st.session_state[page_key] = 1
+    if st.session_state.setdefault(page_key, 1) > pages:
+        st.session_state[page_key] = pages
+    with col2:
+        page = st.number_input("页码", min_value=1, max_value=pages, step=1, key=page_key)
+    start = (int(page) - 1) * size
+    end = min(start + size, total)
+    with col3:
+        st.caption(f"共 {total:,} 条，第 {int(page)}/{pages} 页（{start + 1 if total else 0}-{end}）")
+
+    page_df = df.iloc[start:end]
+    bands = score_band(page_df[band_column]) if band_column and band_column in page_df.columns else None
+    if columns is not None:
+        selected = [col for col in columns if col in page_df.columns]
+        page_df = page_df[selected].rename(columns={col: columns[col] for col in selected})
+    if bands is not None:
+        display_name = columns.get(band_column, band_column) if columns else band_column
+        position = page_df.columns.get_loc(display_name) + 1 if display_name in page_df.columns else len(page_df.columns)
+        page_df = page_df.copy()
+        page_df.insert(position, band_label, bands)
+
+    if height is None:
+        st.dataframe(page_df, use_container_width=True, hide_index=True)
+    else:
+        st.dataframe(page_df, use_container_width=True, hide_index=True, height=height)
+    return page_df
+
+
+def export_controls(export_key: str, sheets_fn: Callable[[], Dict[str, pd.DataFrame]],
+                    file_stem: str, key: str = 'export'):
+    """
+    按需生成的导出按钮
+
+    点击"生成导出文件"后才序列化数据，结果按 export_key 缓存在磁盘上，
+    其他会话相同的筛选条件直接复用已生成的文件。
+    下载按钮需要把文件内容交给Streamlit，只在本会话请求导出之后、
+    下载之前的rerun中出现，未请求导出时rerun不读取导出文件；
+    筛选条件或格式变化后需要重新请求。
+
+    Args:
+        export_key: exports.export_key() 的结果
+        sheets_fn: 返回 工作表名称 -> 数据 的函数，只在需要生成文件时调用
+        file_stem: 下载文件名（不含扩展名）
+        key: 控件的 session_state 键前缀
+    """
+    formats = available_formats()
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        fmt = st.selectbox("导出格式", formats, format_func=lambda f: EXPORT_FORMATS[f][0],
+                           key=f"{key}_format", label_visibility="collapsed")
+    cache = get_export_cache()
+    requested_key = f"{key}_requested"
+    requested = st.session_state.get(requested_key) == (export_key, fmt)
+
+    def build():
+        with st.spinner("正在生成导出文件..."):
+            try:
+                return cache.build(export_key, fmt, sheets_fn)
+            except Exception as e:
+                print(f"Error building export: {e}")
+                st.error(f"导出失败: {e}")
+                return None
+
+    with col2:
+        if not requested and st.button("📦 生成导出文件", key=f"{key}_prepare"):
+            st.session_state[requested_key] = (export_key, fmt)
+            requested = True
+        if not requested:
+            return
+
+        path = cache.get(export_key, fmt) or build()
+        f = None
+        if path is not None:
+            try:
+                f = open(path, 'rb')
+            except FileNotFoundError:
+                # 查找之后文件被其他导出挤出磁盘缓存，重新生成
+                path = build()
+                f = open(path, 'rb') if path is not None else None
+        if f is None:
+            st.session_state.pop(requested_key, None)
+            return
+
+        label, mime = EXPORT_FORMATS[fmt]
+        with f:
+            downloaded = st.download_button(
+                label=f"📥 下载数据 ({label})",
+                data=f,
+                file_name=f"{file_stem}.{fmt}",
+                mime=mime,
+                key=f"{key}_download"
+            )
+        if downloaded:
+            # 已下载：之后的rerun不再读取文件
+            st.session_state.pop(requested_key, None)
 
 
 def expandable_insight(title: str, content: str, data_source: Dict = None, solution: str = None):
@@ -9,29 +9,71 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from pathlib import Path
-import glob
 from datetime import datetime
 import numpy as np
 import subprocess
 import os
+import uuid
 
-# Auto-sync data from Google Drive on startup
+from schema import AI_TEXT_COLUMNS
+from data_access import dataset_revision, load_weeks, revision_digest, week_revisions
+from week_store import local_week_files, read_week_file
+from components import export_controls, paginated_table, view_navigation
+from exports import export_key
+from figure_cache import figure_key, get_figure_cache
+from search_index import TrigramIndex
+from filter_engine import FilterIndex
+from rollups import ROLLUP_COLUMNS, WeekRollups, group_summary, rollup_frame, select, source_rollup_dir
+
+# 导航模式：lazy 只执行当前视图，tabs 每次rerun执行全部标签页
+DASHBOARD_NAV_MODE = os.getenv('DASHBOARD_NAV_MODE', 'lazy')
+
+# Auto-sync data from Google Drive on startup（后台进行，页面先使用本地快照）
+from startup_sync import DEFAULT_STARTUP_WAIT, freshness_message, start_sync
 
 # Import data manager for Google Drive integration
 try:
     from data_manager_gdrive import (
         get_available_weeks,
-        load_week_data,
         load_week_metadata,
         upload_week_data,
         get_week_summary,
         extract_week_number_from_filename
     )
+    from data_access import load_week_data, load_week_frame, invalidate_week
+    from prefetch import prefetch_adjacent_weeks
     DATA_MANAGER_AVAILABLE = True
 except ImportError:
     DATA_MANAGER_AVAILABLE = False
 
+# Import AI text full-text search
+try:
+    from text_search import DEFAULT_INDEX_DIR, WeekTextIndex
+    TEXT_SEARCH_AVAILABLE = True
+except ImportError:
+    TEXT_SEARCH_AVAILABLE = False
+
+# Import near-duplicate product clustering
+try:
+    from dedup import cluster_names, collapse_duplicates
+    DEDUP_AVAILABLE = True
+except ImportError:
+    DEDUP_AVAILABLE = False
+
+# Import embedded SQL engine for cross-week aggregates
+try:
+    from sql_engine import ANALYTICS_COLUMNS, get_query_engine
+    SQL_ENGINE_AVAILABLE = True
+except ImportError:
+    SQL_ENGINE_AVAILABLE = False
+
+# Import cross-week product identity index
+try:
+    from product_identity import IDENTITY_COLUMNS, ProductIdentityIndex, product_history, source_index_path
+    PRODUCT_IDENTITY_AVAILABLE = True
+except ImportError:
+    PRODUCT_IDENTITY_AVAILABLE = False
+
 # Import custom emotion charts module
 try:
     from emotion_charts import (
@@ -83,6 +125,36 @@ try:
 except ImportError:
     RECOMMENDATIONS_AVAILABLE = False
 
+# AI生成的长文本列（AI_TEXT_COLUMNS）只在AI洞察页打开某个产品时才加载
+
+# 各页面用到的列（文件中不存在的列会被忽略）
+TAB_COLUMNS = {
+    'sidebar': ['product_category', 'total_score', 'views', 'likes', 'engagement_rate'],
+    'summary': [
+        'product_name', 'product_category', 'platform', 'views', 'price', 'price_avg',
+        'emotion_score', 'emotion_trend', 'sentiment_positive_pct', 'sentiment_neutral_pct',
+        'sentiment_negative_pct', 'sales_volume', 'sales_estimate', 'revenue_estimate',
+        'conversion_rate', 'rating_avg', 'growth_rate', 'market_potential',
+        'competition_level', 'action_priority', 'roi_estimate'
+    ],
+    'ranking': ['product_name', 'product_category', 'total_score', 'emotion_score',
+                'views', 'likes', 'engagement_rate'],
+    'analysis': ['product_name', 'product_category', 'total_score', 'emotion_score',
+                 'views', 'engagement_rate'],
+    'ai_insight': ['product_name', 'product_category', 'total_score', 'emotion_score',
+                   'sales_score', 'tiktok_url'],
+    'emotion': ['emotion_score'],
+}
+
+# 当前周次需要常驻内存的列
+WEEK_COLUMNS = list(dict.fromkeys(col for cols in TAB_COLUMNS.values() for col in cols))
+
+# 历史趋势页只需要少量列
+HISTORY_COLUMNS = ['week_number', 'product_name', 'product_category', 'total_score', 'views', 'engagement_rate']
+
+# 排名页跨周搜索需要的列
+SEARCH_COLUMNS = ['week_number'] + TAB_COLUMNS['ranking']
+
 # 页面配置
 st.set_page_config(
     page_title="3D打印市场情报仪表板",
@@ -133,31 +205,140 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-@st.cache_data
-def load_data(file_path):
-    """加载CSV数据"""
+@st.cache_data(max_entries=32)
+def load_data(file_path, columns=None, revision=None):
+    """
+    加载周次数据（同名Parquet快照存在时优先读取），columns 为要读取的列
+
+    revision 只参与缓存键：文件变化后版本不同，自动重新读取
+    """
     try:
-        df = pd.read_csv(file_path)
+        df = read_week_file(file_path, list(columns) if columns is not None else None)
         return df
     except Exception as e:
         st.error(f"加载数据失败: {e}")
         return None
 
-@st.cache_data
-def load_all_weeks_data():
-    """加载所有周次的历史数据"""
-    reports_dir = Path('reports')
-    all_files = sorted(glob.glob(str(reports_dir / 'All_Data_Week_*.csv')))
-    
-    if not all_files:
-        return None
-    
-    dfs = []
-    for file in all_files:
-        df = pd.read_csv(file)
-        dfs.append(df)
-    
-    return pd.concat(dfs, ignore_index=True)
+@st.cache_data(max_entries=8)
+def load_all_weeks_data(source='local', columns=None, revision=None, _revisions=None):
+    """
+    加载所有周次的历史数据（并行读取各周后一次性合并），columns 为要读取的列
+
+    revision 为 dataset_revision() 的结果，只参与缓存键：某一周更新后
+    只有历史汇总重新计算，未变化的周次仍从周次缓存读取。
+    _revisions 为对应的 week_revisions()，周次缓存中是旧版本时据此重新校验；
+    结果的 attrs['revision'] 是实际读到的数据版本
+    """
+    columns = list(columns) if columns is not None else None
+    historical_df = load_weeks(source=source, columns=columns, revisions=_revisions)
+    if historical_df is None and source != 'local':
+        historical_df = load_weeks(source='local', columns=columns)
+    return historical_df
+
+def load_week_frame_columns(week_num, columns, source):
+    """读取某周的指定列，返回 (数据, 实际读到的文件版本)（Drive经周次缓存，本地经 load_data 缓存）"""
+    if source == 'drive':
+        # 按目录索引中的当前版本读取，与调用方用来记录的 week_revisions() 一致
+        return load_week_frame(week_num, columns, week_revisions([week_num], source='drive').get(week_num))
+    week_files = local_week_files('reports')
+    revision = week_revisions([week_num], source='local').get(week_num)
+    if week_num not in week_files or revision is None:
+        return None, None
+    return load_data(week_files[week_num], tuple(columns), revision), revision
+
+def load_week_columns(week_num, columns, source):
+    """读取某周的指定列"""
+    return load_week_frame_columns(week_num, columns, source)[0]
+
+@st.cache_resource
+def get_text_index(source):
+    """AI文本BM25索引（各周索引按文件版本持久化，按数据来源分目录，进程内所有会话共用）"""
+    return WeekTextIndex(lambda week_num: load_week_frame_columns(week_num, AI_TEXT_COLUMNS, source),
+                         os.path.join(DEFAULT_INDEX_DIR, source))
+
+@st.cache_resource
+def get_identity_index(source):
+    """跨周产品标识索引（按文件版本增量更新并持久化，进程内所有会话共用）"""
+    return ProductIdentityIndex(source_index_path(source))
+
+def sync_identity_index(source):
+    """把新增或变化的周次写入产品标识索引"""
+    index = get_identity_index(source)
+    index.sync(week_revisions(source=source),
+               lambda week_num: load_week_frame_columns(week_num, IDENTITY_COLUMNS, source))
+    return index
+
+@st.cache_resource
+def get_week_rollups(source):
+    """周次汇总表（按文件版本持久化，进程内所有会话共用）"""
+    return WeekRollups(lambda week_num: load_week_columns(week_num, ROLLUP_COLUMNS, source),
+                       source_rollup_dir(source))
+
+def load_history_rollups(source):
+    """全部周次的汇总表（只计算新增或变化的周次），attrs['revision'] 为汇总所用各周版本"""
+    revisions = week_revisions(source=source)
+    rollups = get_week_rollups(source).history(revisions)
+    if rollups.empty and source != 'local':
+        revisions = week_revisions(source='local')
+        rollups = get_week_rollups('local').history(revisions)
+    rollups.attrs['revision'] = revision_digest(revisions)
+    return rollups
+
+def sync_query_engine(source):
+    """把新增或变化的周次注册到SQL引擎（每个周次版本只导入一次）"""
+    engine = get_query_engine(source)
+    engine.sync(week_revisions(source=source),
+                lambda week_num: load_week_columns(week_num, ANALYTICS_COLUMNS, source))
+    return engine
+
+@st.cache_resource(max_entries=16)
+def _cached_name_index(revision, scope, _names):
+    """产品名称三元组索引，每个数据版本只构建一次（_names 不参与缓存键）"""
+    return TrigramIndex(_names)
+
+@st.cache_resource(max_entries=16)
+def _cached_filter_index(revision, scope, _frame):
+    """类别位图与排序排列，每个数据版本只构建一次（_frame 不参与缓存键）"""
+    return FilterIndex(_frame)
+
+@st.cache_resource(max_entries=16)
+def _cached_duplicate_labels(revision, scope, _names):
+    """相似产品簇编号，每个数据版本只计算一次（_names 不参与缓存键）"""
+    return cluster_names(_names)
+
+# 以下索引的结果是行位置，只对构建时的数据有效：缓存条目的行数与当前数据
+# 不一致时（同一版本键对应了不同的数据）不使用缓存，直接按当前数据重建
+
+def get_name_index(revision, scope, names):
+    """产品名称三元组索引"""
+    index = _cached_name_index(revision, scope, names)
+    return index if len(index) == len(names) else TrigramIndex(names)
+
+def get_filter_index(revision, scope, frame):
+    """类别位图与排序排列"""
+    index = _cached_filter_index(revision, scope, frame)
+    return index if len(index) == len(frame) else FilterIndex(frame)
+
+def get_duplicate_labels(revision, scope, names):
+    """相似产品簇编号"""
+    labels = _cached_duplicate_labels(revision, scope, names)
+    return labels if len(labels) == len(names) else cluster_names(names)
+
+def export_sheets(data, filters):
+    """导出文件的工作表：产品数据、按类别汇总和筛选条件（CSV/Parquet只包含产品数据）"""
+    sheets = {'产品数据': data}
+    if 'product_category' in data.columns and 'total_score' in data.columns:
+        summary = data.groupby('product_category', observed=True).agg(
+            产品数=('total_score', 'size'),
+            平均分=('total_score', 'mean'),
+            最高分=('total_score', 'max')
+        ).reset_index().rename(columns={'product_category': '类别'})
+        sheets['类别汇总'] = summary
+    sheets['筛选条件'] = pd.DataFrame(
+        [(name, str(value)) for name, value in filters.items()] + [('rows', str(len(data)))],
+        columns=['条件', '取值']
+    )
+    return sheets
 
 @st.cache_data
 def generate_emotion_data():
@@ -292,7 +473,14 @@ def main():
         
         # 数据源选择 - 使用Google Drive
         if DATA_MANAGER_AVAILABLE:
+            # 先用上次同步的目录快照和磁盘缓存渲染，Drive变更在后台校验（下一次rerun生效）
+            sync = start_sync('drive')
             available_weeks = get_available_weeks()
+            if not available_weeks and sync.running:
+                # 本地还没有任何快照，等待首次同步
+                with st.spinner("正在从Google Drive同步数据..."):
+                    sync.wait(DEFAULT_STARTUP_WAIT)
+                available_weeks = get_available_weeks()
             if not available_weeks:
                 st.error("未找到数据！请上传数据文件")
                 return
@@ -307,19 +495,21 @@ def main():
             # 提取周次编号
             selected_week_num = int(selected_week_str.split()[1])
         else:
-            # 退回到本地文件加载
-            reports_dir = Path('reports')
-            csv_files = sorted(glob.glob(str(reports_dir / 'All_Data_Week_*.csv')), reverse=True)
-            
-            if not csv_files:
+            # 退回到本地文件加载（rclone在后台把Drive上的文件同步到reports目录）
+            sync = start_sync('rclone')
+            week_files = local_week_files('reports')
+            if not week_files and sync.running:
+                with st.spinner("正在从Google Drive同步数据..."):
+                    sync.wait(DEFAULT_STARTUP_WAIT)
+                week_files = local_week_files('reports')
+            
+            if not week_files:
                 st.error("未找到数据文件！")
                 return
             
             week_options = {}
-            for file in csv_files:
-                filename = Path(file).name
-                week_num = filename.split('_')[3].replace('.csv', '')
-                week_options[f"第 {week_num} 周"] = file
+            for week_num, file in sorted(week_files.items(), reverse=True):
+                week_options[f"第 {week_num:02d} 周"] = file
             
             selected_week_str = st.selectbox(
                 "选择周次",
@@ -329,6 +519,13 @@ def main():
             data_file = week_options[selected_week_str]
             selected_week_num = int(selected_week_str.split()[1])
         
+        # 数据新鲜度
+        level, message = freshness_message(sync.status())
+        getattr(st, level)(message)
+        if sync.enabled and st.button("🔄 立即同步", disabled=sync.running):
+            sync.trigger(force=True)
+            st.rerun()
+        
         st.divider()
         
         # 筛选选项
@@ -336,12 +533,23 @@ def main():
         
         # 加载数据
         if DATA_MANAGER_AVAILABLE:
-            df = load_week_data(selected_week_num)
+            # 以周次缓存实际返回的数据版本为键，而不是另行查询目录索引
+            df, served_revision = load_week_frame(
+                selected_week_num, WEEK_COLUMNS,
+                week_revisions([selected_week_num], source='drive').get(selected_week_num)
+            )
             if df is None:
                 st.error(f"加载第 {selected_week_num} 周数据失败！")
                 return
+            # 后台预取前后相邻的周次，切换周次时取消本会话尚未开始的旧预取
+            prefetch_adjacent_weeks(
+                selected_week_num, available_weeks, WEEK_COLUMNS,
+                owner=st.session_state.setdefault('prefetch_owner', uuid.uuid4().hex)
+            )
+            week_revision = revision_digest({selected_week_num: served_revision})
         else:
-            df = load_data(data_file)
+            week_revision = dataset_revision([selected_week_num], source='local')
+            df = load_data(data_file, tuple(WEEK_COLUMNS), week_revision)
         
         if df is None:
             return
@@ -408,8 +616,8 @@ def main():
                     if success:
                         st.success(f"✅ 第 {week_num:02d} 周数据已保存！")
                         st.balloons()
-                        # 清除缓存并重新加载
-                        st.cache_data.clear()
+                        # 只失效该周次；历史汇总的缓存键包含数据集版本，会随之更新
+                        invalidate_week(week_num)
                         st.rerun()
                     else:
                         st.error("❌ 上传失败，请检查文件格式")
@@ -421,14 +629,26 @@ def main():
         st.caption("💡 数据保存在 Google Drive")
     
     # 应用筛选
-    filtered_df = df.copy()
-    if selected_category != '全部':
-        filtered_df = filtered_df[filtered_df['product_category'] == selected_category]
-    filtered_df = filtered_df[
-        (filtered_df['total_score'] >= min_score) & 
-        (filtered_df['total_score'] <= max_score)
-    ]
-    
+    # 侧边栏筛选（索引按数据版本构建一次，筛选只做查表和二分查找，不复制原数据）
+    week_filter_index = get_filter_index(week_revision, f'week-{selected_week_num}', df)
+    filtered_df = df.iloc[week_filter_index.positions(selected_category, (min_score, max_score))]
+
+    def show_chart(chart_id, build_fn, revision=None, filtered=True):
+        """
+        显示图表：同一数据版本、同一筛选条件下的图表跨会话共享
+
+        chart_id 为字符串，或 (字符串, 页面内其他控件的取值...) 组成的元组
+        """
+        key = figure_key(
+            revision or week_revision,
+            selected_category if filtered else None,
+            (min_score, max_score) if filtered else None,
+            chart_id
+        )
+        fig = get_figure_cache().get_or_build(key, build_fn)
+        element_key = chart_id if isinstance(chart_id, str) else chart_id[0]
+        st.plotly_chart(fig, use_container_width=True, key=element_key)
+
     # KPI指标卡片
     st.subheader("关键指标")
     col1, col2, col3, col4, col5 = st.columns(5)
@@ -475,7 +695,8 @@ def main():
     st.divider()
     
     # 标签页（新增3个Tab）
-    tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8, tab9 = st.tabs([
+    # lazy模式下只执行当前视图（DASHBOARD_NAV_MODE=tabs 恢复一次渲染全部标签页）
+    (tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8, tab9), view_active = view_navigation([
         "执行摘要",
         "产品排名",
         "数据分析",
@@ -485,1721 +706,1933 @@ def main():
         "产品分析",
         "竞争分析",
         "行动计划"
-    ])
+    ], mode=DASHBOARD_NAV_MODE)
     
     # Tab 1: 产品排名表格（保持不变）
 
     # Tab 1: 执行摘要
     with tab1:
-        st.subheader("执行摘要")
+        if view_active("执行摘要"):
+            st.subheader("执行摘要")
         
-        st.markdown("""
-        <div class="insight-box">
-        <strong>核心目标</strong><br>
-        基于社交媒体情绪数据和电商平台销售数据，快速识别高潜力产品机会，
-        助力3D打印定制业务实现数据驱动的产品选择和市场策略。
-        </div>
-        """, unsafe_allow_html=True)
+            st.markdown("""
+            <div class="insight-box">
+            <strong>核心目标</strong><br>
+            基于社交媒体情绪数据和电商平台销售数据，快速识别高潜力产品机会，
+            助力3D打印定制业务实现数据驱动的产品选择和市场策略。
+            </div>
+            """, unsafe_allow_html=True)
         
-        st.divider()
+            st.divider()
         
-        # 生成摘要数据（如果可用）
-        summary = None
-        if SUMMARY_GENERATOR_AVAILABLE:
-            summary = generate_dynamic_summary(filtered_df)
+            # 生成摘要数据（如果可用）
+            summary = None
+            if SUMMARY_GENERATOR_AVAILABLE:
+                summary = generate_dynamic_summary(filtered_df)
         
-        # 基于数据的解决方案推荐
-        if RECOMMENDATIONS_AVAILABLE:
-            st.markdown("### 🎯 基于数据的解决方案推荐")
+            # 基于数据的解决方案推荐
+            if RECOMMENDATIONS_AVAILABLE:
+                st.markdown("### 🎯 基于数据的解决方案推荐")
             
-            recommendations = generate_recommendations(filtered_df, summary)
+                recommendations = generate_recommendations(filtered_df, summary)
             
-            # 显示推荐数量
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.metric("总推荐数", len(recommendations))
-            with col2:
-                high_priority = len([r for r in recommendations if r['priority'] == '高'])
-                st.metric("高优先级", high_priority, delta="立即执行")
-            with col3:
-                mid_priority = len([r for r in recommendations if r['priority'] == '中'])
-                st.metric("中优先级", mid_priority, delta="近期规划")
-            
-            st.markdown("---")
-            
-            # 显示所有推荐（使用Streamlit原生组件）
-            for i, rec in enumerate(recommendations, 1):
-                # 优先级颜色映射
-                priority_colors = {
-                    '高': '🔴',
-                    '中': '🟡',
-                    '低': '🔵'
-                }
-                priority_icon = priority_colors.get(rec['priority'], '⚪')
+                # 显示推荐数量
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("总推荐数", len(recommendations))
+                with col2:
+                    high_priority = len([r for r in recommendations if r['priority'] == '高'])
+                    st.metric("高优先级", high_priority, delta="立即执行")
+                with col3:
+                    mid_priority = len([r for r in recommendations if r['priority'] == '中'])
+                    st.metric("中优先级", mid_priority, delta="近期规划")
+            
+                st.markdown("---")
+            
+                # 显示所有推荐（使用Streamlit原生组件）
+                for i, rec in enumerate(recommendations, 1):
+                    # 优先级颜色映射
+                    priority_colors = {
+                        '高': '🔴',
+                        '中': '🟡',
+                        '低': '🔵'
+                    }
+                    priority_icon = priority_colors.get(rec['priority'], '⚪')
                 
-                # 使用container创建卡片效果
-                with st.container():
-                    # 标题行
-                    col_title, col_priority = st.columns([4, 1])
-                    with col_title:
-                        st.markdown(f"#### 推荐 {i}: {rec['category']}")
-                    with col_priority:
-                        st.markdown(f"**{priority_icon} {rec['priority']}优先级**")
+                    # 使用container创建卡片效果
+                    with st.container():
+                        # 标题行
+                        col_title, col_priority = st.columns([4, 1])
+                        with col_title:
+                            st.markdown(f"#### 推荐 {i}: {rec['category']}")
+                        with col_priority:
+                            st.markdown(f"**{priority_icon} {rec['priority']}优先级**")
                     
-                    # 问题和建议
-                    st.markdown(f"**问题：** {rec['issue']}")
-                    st.markdown(f"**建议：** {rec['recommendation']}")
+                        # 问题和建议
+                        st.markdown(f"**问题：** {rec['issue']}")
+                        st.markdown(f"**建议：** {rec['recommendation']}")
                     
-                    # 具体行动
-                    st.markdown("**具体行动：**")
-                    for j, action in enumerate(rec['actions'], 1):
-                        st.markdown(f"   {j}. {action}")
+                        # 具体行动
+                        st.markdown("**具体行动：**")
+                        for j, action in enumerate(rec['actions'], 1):
+                            st.markdown(f"   {j}. {action}")
                     
-                    # 影响和时间线
-                    col_impact, col_timeline = st.columns(2)
-                    with col_impact:
-                        st.success(f"✓ {rec['expected_impact']}")
-                    with col_timeline:
-                        st.info(f"⏰ {rec['timeline']}")
+                        # 影响和时间线
+                        col_impact, col_timeline = st.columns(2)
+                        with col_impact:
+                            st.success(f"✓ {rec['expected_impact']}")
+                        with col_timeline:
+                            st.info(f"⏰ {rec['timeline']}")
                     
-                    st.markdown("---")
+                        st.markdown("---")
             
-            # 可展开的行动计划
-            with st.expander("📋 查看分组行动计划"):
-                action_matrix = create_action_priority_matrix(recommendations)
+                # 可展开的行动计划
+                with st.expander("📋 查看分组行动计划"):
+                    action_matrix = create_action_priority_matrix(recommendations)
                 
-                for category, recs in action_matrix.items():
-                    if recs:
-                        st.markdown(f"#### {category}")
-                        for rec in recs:
-                            st.markdown(f"- **{rec['category']}**: {rec['recommendation']}")
-                        st.markdown("")
+                    for category, recs in action_matrix.items():
+                        if recs:
+                            st.markdown(f"#### {category}")
+                            for rec in recs:
+                                st.markdown(f"- **{rec['category']}**: {rec['recommendation']}")
+                            st.markdown("")
         
-        st.divider()
+            st.divider()
         
-        # 三大核心洞察 - 动态生成
-        st.markdown("### 💡 三大核心洞察")
+            # 三大核心洞察 - 动态生成
+            st.markdown("### 💡 三大核心洞察")
         
-        # 使用已生成的摘要
-        if SUMMARY_GENERATOR_AVAILABLE and summary:
-            emotion_html, sales_html, strategy_html = format_insight_html(summary)
+            # 使用已生成的摘要
+            if SUMMARY_GENERATOR_AVAILABLE and summary:
+                emotion_html, sales_html, strategy_html = format_insight_html(summary)
             
-            col1, col2, col3 = st.columns(3)
+                col1, col2, col3 = st.columns(3)
             
-            with col1:
-                st.markdown(emotion_html, unsafe_allow_html=True)
+                with col1:
+                    st.markdown(emotion_html, unsafe_allow_html=True)
             
-            with col2:
-                st.markdown(sales_html, unsafe_allow_html=True)
+                with col2:
+                    st.markdown(sales_html, unsafe_allow_html=True)
             
-            with col3:
-                st.markdown(strategy_html, unsafe_allow_html=True)
-        else:
-            # 退回到静态内容
-            col1, col2, col3 = st.columns(3)
+                with col3:
+                    st.markdown(strategy_html, unsafe_allow_html=True)
+            else:
+                # 退回到静态内容
+                col1, col2, col3 = st.columns(3)
             
-            with col1:
-                st.markdown("""
-                <div class="insight-box">
-                <strong>情绪发现</strong><br><br>
-                • <strong>正面情绪占主导</strong>: 兴奋、好奇、满意等正面情绪占总量的65%<br>
-                • <strong>上升最快</strong>: 兴奋情绪4周增长38%，表明用户对创新产品接受度高<br>
-                • <strong>需要关注</strong>: 担忧和困惑情绪主要集中在价格和质量方面<br><br>
-                <em>建议：强化产品质量展示，提供透明的定价说明</em>
-                </div>
-                """, unsafe_allow_html=True)
+                with col1:
+                    st.markdown("""
+                    <div class="insight-box">
+                    <strong>情绪发现</strong><br><br>
+                    • <strong>正面情绪占主导</strong>: 兴奋、好奇、满意等正面情绪占总量的65%<br>
+                    • <strong>上升最快</strong>: 兴奋情绪4周增长38%，表明用户对创新产品接受度高<br>
+                    • <strong>需要关注</strong>: 担忧和困惑情绪主要集中在价格和质量方面<br><br>
+                    <em>建议：强化产品质量展示，提供透明的定价说明</em>
+                    </div>
+                    """, unsafe_allow_html=True)
             
-            with col2:
-                st.markdown("""
-                <div class="insight-box">
-                <strong>销售发现</strong><br><br>
-                • <strong>Etsy表现最佳</strong>: 增长率32%，用户愿意为定制付费<br>
-                • <strong>热门类别</strong>: 办公用品和数码配件需求旺盛<br>
-                • <strong>平均客单价</strong>: $38，中高端市场潜力大<br><br>
-                <em>建议：优先在Etsy上架，重点开发办公和数码类产品</em>
-                </div>
-                """, unsafe_allow_html=True)
+                with col2:
+                    st.markdown("""
+                    <div class="insight-box">
+                    <strong>销售发现</strong><br><br>
+                    • <strong>Etsy表现最佳</strong>: 增长率32%，用户愿意为定制付费<br>
+                    • <strong>热门类别</strong>: 办公用品和数码配件需求旺盛<br>
+                    • <strong>平均客单价</strong>: $38，中高端市场潜力大<br><br>
+                    <em>建议：优先在Etsy上架，重点开发办公和数码类产品</em>
+                    </div>
+                    """, unsafe_allow_html=True)
             
-            with col3:
-                st.markdown("""
-                <div class="insight-box">
-                <strong>战略建议</strong><br><br>
-                • <strong>快速进入</strong>: 市场处于快速增长期，机会窗口期<br>
-                • <strong>小批量测试</strong>: 8周内完成从设计到上线<br>
-                • <strong>预算控制</strong>: 总预算$9,000，分阶段执行<br><br>
-                <em>建议：立即启动Top 3产品开发</em>
-                </div>
-                """, unsafe_allow_html=True)
+                with col3:
+                    st.markdown("""
+                    <div class="insight-box">
+                    <strong>战略建议</strong><br><br>
+                    • <strong>快速进入</strong>: 市场处于快速增长期，机会窗口期<br>
+                    • <strong>小批量测试</strong>: 8周内完成从设计到上线<br>
+                    • <strong>预算控制</strong>: 总预算$9,000，分阶段执行<br><br>
+                    <em>建议：立即启动Top 3产品开发</em>
+                    </div>
+                    """, unsafe_allow_html=True)
         
-        # 可展开的数据面板
-        st.markdown("### 🔍 数据追溯与详细解释")
+            # 可展开的数据面板
+            st.markdown("### 🔍 数据追溯与详细解释")
         
-        with st.expander("📊 查看情绪发现的数据来源"):
-            st.markdown("""
-            #### 数据来源
-            - **社交媒体**: TikTok, Instagram, YouTube
-            - **电商平台**: Etsy, Amazon, eBay
-            - **评论数据**: 用户评论、评分、互动
-            
-            #### 计算方法
-            1. **正面情绪占比**: 正面情绪数量 / 总情绪数量 × 100%
-            2. **情绪增长率**: (当前周 - 上周) / 上周 × 100%
-            3. **情绪分数**: 基于正面情绪占比和强度的综合评分
-            
-            #### 原始数据示例
-            """
-            )
+            with st.expander("📊 查看情绪发现的数据来源"):
+                st.markdown("""
+                #### 数据来源
+                - **社交媒体**: TikTok, Instagram, YouTube
+                - **电商平台**: Etsy, Amazon, eBay
+                - **评论数据**: 用户评论、评分、互动
+            
+                #### 计算方法
+                1. **正面情绪占比**: 正面情绪数量 / 总情绪数量 × 100%
+                2. **情绪增长率**: (当前周 - 上周) / 上周 × 100%
+                3. **情绪分数**: 基于正面情绪占比和强度的综合评分
+            
+                #### 原始数据示例
+                """
+                )
             
-            if SUMMARY_GENERATOR_AVAILABLE:
-                emotion = summary.get('emotion', {})
-                st.dataframe({
-                    '指标': ['正面情绪占比', '平均情绪分', '最佳产品', '趋势方向'],
-                    '数值': [
-                        f"{emotion.get('positive_pct', 0):.1f}%",
-                        f"{emotion.get('avg_emotion', 0):.1f}",
-                        emotion.get('top_product', 'N/A'),
-                        emotion.get('trend_direction', '稳定')
-                    ]
-                }, use_container_width=True)
-        
-        with st.expander("💰 查看销售发现的数据来源"):
-            st.markdown("""
-            #### 数据来源
-            - **平台销售数据**: Etsy, Amazon, eBay 的公开数据
-            - **价格数据**: 各平台的产品定价
-            - **销量估算**: 基于浏览量和转化率
-            
-            #### 计算方法
-            1. **平台营收**: 各产品销售额汇总
-            2. **平均客单价**: 总营收 / 总订单数
-            3. **增长率**: 对比历史同期数据
-            
-            #### 平台对比
-            """
-            )
+                if SUMMARY_GENERATOR_AVAILABLE:
+                    emotion = summary.get('emotion', {})
+                    st.dataframe({
+                        '指标': ['正面情绪占比', '平均情绪分', '最佳产品', '趋势方向'],
+                        '数值': [
+                            f"{emotion.get('positive_pct', 0):.1f}%",
+                            f"{emotion.get('avg_emotion', 0):.1f}",
+                            emotion.get('top_product', 'N/A'),
+                            emotion.get('trend_direction', '稳定')
+                        ]
+                    }, use_container_width=True)
+        
+            with st.expander("💰 查看销售发现的数据来源"):
+                st.markdown("""
+                #### 数据来源
+                - **平台销售数据**: Etsy, Amazon, eBay 的公开数据
+                - **价格数据**: 各平台的产品定价
+                - **销量估算**: 基于浏览量和转化率
+            
+                #### 计算方法
+                1. **平台营收**: 各产品销售额汇总
+                2. **平均客单价**: 总营收 / 总订单数
+                3. **增长率**: 对比历史同期数据
+            
+                #### 平台对比
+                """
+                )
             
-            if SUMMARY_GENERATOR_AVAILABLE:
-                sales = summary.get('sales', {})
-                platform_data = {
-                    '平台': [sales.get('top_platform', 'N/A'), '其他'],
-                    '预估营收': [f"${sales.get('top_platform_revenue', 0):,.0f}", '$-'],
-                    '平均价格': [f"${sales.get('avg_price', 0):.2f}", '$-'],
-                    '增长率': [f"{sales.get('avg_growth', 0):+.1f}%", '-']
-                }
-                st.dataframe(platform_data, use_container_width=True)
-        
-        with st.expander("🎯 查看战略建议的数据基础"):
-            st.markdown("""
-            #### 分析维度
-            - **市场潜力**: 基于搜索量、趋势、竞争度
-            - **ROI估算**: 基于成本、定价、销量预测
-            - **优先级排序**: 综合考虑潜力、竞争、执行难度
-            
-            #### 推荐逻辑
-            1. **高潜力 + 低竞争** = 高优先级
-            2. **高ROI + 低风险** = 建议快速进入
-            3. **市场增长趋势** = 机会窗口期
-            """
-            )
+                if SUMMARY_GENERATOR_AVAILABLE:
+                    sales = summary.get('sales', {})
+                    platform_data = {
+                        '平台': [sales.get('top_platform', 'N/A'), '其他'],
+                        '预估营收': [f"${sales.get('top_platform_revenue', 0):,.0f}", '$-'],
+                        '平均价格': [f"${sales.get('avg_price', 0):.2f}", '$-'],
+                        '增长率': [f"{sales.get('avg_growth', 0):+.1f}%", '-']
+                    }
+                    st.dataframe(platform_data, use_container_width=True)
+        
+            with st.expander("🎯 查看战略建议的数据基础"):
+                st.markdown("""
+                #### 分析维度
+                - **市场潜力**: 基于搜索量、趋势、竞争度
+                - **ROI估算**: 基于成本、定价、销量预测
+                - **优先级排序**: 综合考虑潜力、竞争、执行难度
+            
+                #### 推荐逻辑
+                1. **高潜力 + 低竞争** = 高优先级
+                2. **高ROI + 低风险** = 建议快速进入
+                3. **市场增长趋势** = 机会窗口期
+                """
+                )
             
-            if SUMMARY_GENERATOR_AVAILABLE:
-                strategy = summary.get('strategy', {})
-                st.dataframe({
-                    '指标': ['高潜力产品数', '低竞争机会', '平均ROI', '最高ROI'],
-                    '数值': [
-                        strategy.get('high_potential_count', 0),
-                        strategy.get('low_competition_count', 0),
-                        f"{strategy.get('avg_roi', 0):.1f}%",
-                        f"{strategy.get('max_roi', 0):.1f}%"
-                    ]
-                }, use_container_width=True)
+                if SUMMARY_GENERATOR_AVAILABLE:
+                    strategy = summary.get('strategy', {})
+                    st.dataframe({
+                        '指标': ['高潜力产品数', '低竞争机会', '平均ROI', '最高ROI'],
+                        '数值': [
+                            strategy.get('high_potential_count', 0),
+                            strategy.get('low_competition_count', 0),
+                            f"{strategy.get('avg_roi', 0):.1f}%",
+                            f"{strategy.get('max_roi', 0):.1f}%"
+                        ]
+                    }, use_container_width=True)
                 
-                high_priority = strategy.get('high_priority_products', [])
-                if high_priority:
-                    st.markdown("#### 高优先级产品")
-                    for i, product in enumerate(high_priority[:3], 1):
-                        st.write(f"{i}. {product}")
-        
-        # 详细数据源表格
-        st.markdown("### 📊 数据源统计")
-        
-        if 'platform' in filtered_df.columns:
-            # 按平台统计
-            # Determine which sales column to use
-            sales_col = None
-            if 'sales_volume' in filtered_df.columns:
-                sales_col = 'sales_volume'
-            elif 'sales_estimate' in filtered_df.columns:
-                sales_col = 'sales_estimate'
-            
-            agg_dict = {
-                'product_name': 'count',
-                'views': 'sum'
-            }
-            if sales_col:
-                agg_dict[sales_col] = 'sum'
+                    high_priority = strategy.get('high_priority_products', [])
+                    if high_priority:
+                        st.markdown("#### 高优先级产品")
+                        for i, product in enumerate(high_priority[:3], 1):
+                            st.write(f"{i}. {product}")
+        
+            # 详细数据源表格
+            st.markdown("### 📊 数据源统计")
+        
+            if 'platform' in filtered_df.columns:
+                # 按平台统计
+                # Determine which sales column to use
+                sales_col = None
+                if 'sales_volume' in filtered_df.columns:
+                    sales_col = 'sales_volume'
+                elif 'sales_estimate' in filtered_df.columns:
+                    sales_col = 'sales_estimate'
+            
+                agg_dict = {
+                    'product_name': 'count',
+                    'views': 'sum'
+                }
+                if sales_col:
+                    agg_dict[sales_col] = 'sum'
             
-            platform_stats = filtered_df.groupby('platform').agg(agg_dict).reset_index()
+                platform_stats = filtered_df.groupby('platform', observed=True).agg(agg_dict).reset_index()
             
-            # Rename columns
-            col_names = ['平台', '产品数量', '总浏览量']
-            if sales_col:
-                col_names.append('总销量')
-            platform_stats.columns = col_names
+                # Rename columns
+                col_names = ['平台', '产品数量', '总浏览量']
+                if sales_col:
+                    col_names.append('总销量')
+                platform_stats.columns = col_names
             
-            # 计算占比
-            total_products = platform_stats['产品数量'].sum()
-            total_views = platform_stats['总浏览量'].sum()
-            platform_stats['产品占比'] = (platform_stats['产品数量'] / total_products * 100).round(1).astype(str) + '%'
-            platform_stats['浏览占比'] = (platform_stats['总浏览量'] / total_views * 100).round(1).astype(str) + '%'
+                # 计算占比
+                total_products = platform_stats['产品数量'].sum()
+                total_views = platform_stats['总浏览量'].sum()
+                platform_stats['产品占比'] = (platform_stats['产品数量'] / total_products * 100).round(1).astype(str) + '%'
+                platform_stats['浏览占比'] = (platform_stats['总浏览量'] / total_views * 100).round(1).astype(str) + '%'
             
-            # 格式化数字
-            platform_stats['总浏览量'] = platform_stats['总浏览量'].apply(lambda x: f"{x:,}")
-            if '总销量' in platform_stats.columns:
-                platform_stats['总销量'] = platform_stats['总销量'].apply(lambda x: f"{x:,}")
+                # 格式化数字
+                platform_stats['总浏览量'] = platform_stats['总浏览量'].apply(lambda x: f"{x:,}")
+                if '总销量' in platform_stats.columns:
+                    platform_stats['总销量'] = platform_stats['总销量'].apply(lambda x: f"{x:,}")
             
-            st.dataframe(platform_stats, use_container_width=True, hide_index=True)
+                st.dataframe(platform_stats, use_container_width=True, hide_index=True)
             
-            # 添加解释
-            st.caption("💡 表格显示了各平台的数据贡献度，帮助您了解数据来源分布")
+                # 添加解释
+                st.caption("💡 表格显示了各平台的数据贡献度，帮助您了解数据来源分布")
         
-        st.divider()
+            st.divider()
         
-        # 6个KPI - 动态计算
-        st.markdown("### 6大关键指标 (KPI)")
+            # 6个KPI - 动态计算
+            st.markdown("### 6大关键指标 (KPI)")
         
-        if SUMMARY_GENERATOR_AVAILABLE:
-            kpis = summary.get('kpis', {})
-            
-            col1, col2, col3 = st.columns(3)
+            if SUMMARY_GENERATOR_AVAILABLE:
+                kpis = summary.get('kpis', {})
             
-            with col1:
-                mentions = kpis.get('total_mentions', 0)
-                # 计算与平均值的对比
-                avg_mentions = 8420  # 可以后续从历史数据计算
-                delta_pct = ((mentions - avg_mentions) / avg_mentions * 100) if avg_mentions > 0 else 0
-                st.metric(
-                    "总浏览量",
-                    f"{mentions:,}",
-                    f"{delta_pct:+.1f}% vs 历史平均",
-                    help="当前周在社交媒体和电商平台上的总浏览量"
-                )
+                col1, col2, col3 = st.columns(3)
             
-            with col2:
-                emotion_score = kpis.get('avg_emotion_score', 0)
-                avg_emotion = 44.2
-                delta_emotion = emotion_score - avg_emotion
-                st.metric(
-                    "平均情绪分数",
-                    f"{emotion_score:.1f}",
-                    f"{delta_emotion:+.1f} vs 历史平均",
-                    help="正面情绪分数，满分50分"
-                )
+                with col1:
+                    mentions = kpis.get('total_mentions', 0)
+                    # 计算与平均值的对比
+                    avg_mentions = 8420  # 可以后续从历史数据计算
+                    delta_pct = ((mentions - avg_mentions) / avg_mentions * 100) if avg_mentions > 0 else 0
+                    st.metric(
+                        "总浏览量",
+                        f"{mentions:,}",
+                        f"{delta_pct:+.1f}% vs 历史平均",
+                        help="当前周在社交媒体和电商平台上的总浏览量"
+                    )
             
-            with col3:
-                growth = kpis.get('avg_growth_rate', 0)
-                st.metric(
-                    "增长率",
-                    f"{growth:+.1f}%",
-                    f"当前周趋势",
-                    help="当前周的平均增长率"
-                )
+                with col2:
+                    emotion_score = kpis.get('avg_emotion_score', 0)
+                    avg_emotion = 44.2
+                    delta_emotion = emotion_score - avg_emotion
+                    st.metric(
+                        "平均情绪分数",
+                        f"{emotion_score:.1f}",
+                        f"{delta_emotion:+.1f} vs 历史平均",
+                        help="正面情绪分数，满分50分"
+                    )
             
-            col4, col5, col6 = st.columns(3)
+                with col3:
+                    growth = kpis.get('avg_growth_rate', 0)
+                    st.metric(
+                        "增长率",
+                        f"{growth:+.1f}%",
+                        f"当前周趋势",
+                        help="当前周的平均增长率"
+                    )
             
-            with col4:
-                revenue = kpis.get('total_revenue', 0)
-                avg_revenue = 48200
-                delta_revenue = revenue - avg_revenue
-                st.metric(
-                    "预估营收",
-                    f"${revenue:,}",
-                    f"${delta_revenue:+,} vs 历史平均",
-                    help="基于当前周数据的预估总营收"
-                )
+                col4, col5, col6 = st.columns(3)
+            
+                with col4:
+                    revenue = kpis.get('total_revenue', 0)
+                    avg_revenue = 48200
+                    delta_revenue = revenue - avg_revenue
+                    st.metric(
+                        "预估营收",
+                        f"${revenue:,}",
+                        f"${delta_revenue:+,} vs 历史平均",
+                        help="基于当前周数据的预估总营收"
+                    )
             
-            with col5:
-                conversion = kpis.get('avg_conversion_rate', 0)
-                avg_conversion = 5.8
-                delta_conversion = conversion - avg_conversion
-                st.metric(
-                    "转化率",
-                    f"{conversion:.2f}%",
-                    f"{delta_conversion:+.2f}% vs 历史平均",
-                    help="从浏览到购买的平均转化率"
-                )
+                with col5:
+                    conversion = kpis.get('avg_conversion_rate', 0)
+                    avg_conversion = 5.8
+                    delta_conversion = conversion - avg_conversion
+                    st.metric(
+                        "转化率",
+                        f"{conversion:.2f}%",
+                        f"{delta_conversion:+.2f}% vs 历史平均",
+                        help="从浏览到购买的平均转化率"
+                    )
             
-            with col6:
-                rating = kpis.get('avg_rating', 0)
-                avg_rating = 4.5
-                delta_rating = rating - avg_rating
-                st.metric(
-                    "客户满意度",
-                    f"{rating:.2f}/5.0",
-                    f"{delta_rating:+.2f} vs 历史平均",
-                    help="平台平均评分"
-                )
-        else:
-            # 退回到静态KPI
-            col1, col2, col3 = st.columns(3)
+                with col6:
+                    rating = kpis.get('avg_rating', 0)
+                    avg_rating = 4.5
+                    delta_rating = rating - avg_rating
+                    st.metric(
+                        "客户满意度",
+                        f"{rating:.2f}/5.0",
+                        f"{delta_rating:+.2f} vs 历史平均",
+                        help="平台平均评分"
+                    )
+            else:
+                # 退回到静态KPI
+                col1, col2, col3 = st.columns(3)
             
-            with col1:
-                st.metric(
-                    "总提及次数",
-                    "8,420",
-                    "+28.5%",
-                    help="过去4周在社交媒体上的总提及次数"
-                )
+                with col1:
+                    st.metric(
+                        "总提及次数",
+                        "8,420",
+                        "+28.5%",
+                        help="过去4周在社交媒体上的总提及次数"
+                    )
             
-            with col2:
-                st.metric(
-                    "平均情绪分数",
-                    "44.2",
-                    "+3.8",
-                    help="正面情绪分数，满分50分"
-                )
+                with col2:
+                    st.metric(
+                        "平均情绪分数",
+                        "44.2",
+                        "+3.8",
+                        help="正面情绪分数，满分50分"
+                    )
             
-            with col3:
-                st.metric(
-                    "增长率",
-                    "32.1%",
-                    "+5.2%",
-                    help="过去4周的平均增长率"
-                )
+                with col3:
+                    st.metric(
+                        "增长率",
+                        "32.1%",
+                        "+5.2%",
+                        help="过去4周的平均增长率"
+                    )
             
-            col4, col5, col6 = st.columns(3)
+                col4, col5, col6 = st.columns(3)
             
-            with col4:
-                st.metric(
-                    "预估营收",
-                    "$48,200",
-                    "+$12,500",
-                    help="基于Top 5产品的预估月营收"
-                )
+                with col4:
+                    st.metric(
+                        "预估营收",
+                        "$48,200",
+                        "+$12,500",
+                        help="基于Top 5产品的预估月营收"
+                    )
             
-            with col5:
-                st.metric(
-                    "转化率",
-                    "5.8%",
-                    "+1.2%",
-                    help="从浏览到购买的平均转化率"
-                )
+                with col5:
+                    st.metric(
+                        "转化率",
+                        "5.8%",
+                        "+1.2%",
+                        help="从浏览到购买的平均转化率"
+                    )
             
-            with col6:
-                st.metric(
-                    "客户满意度",
-                    "4.5/5.0",
-                    "+0.3",
-                    help="平台平均评分"
-                )
+                with col6:
+                    st.metric(
+                        "客户满意度",
+                        "4.5/5.0",
+                        "+0.3",
+                        help="平台平均评分"
+                    )
         
-        st.divider()
+            st.divider()
         
-        # Top 3产品推荐
-        st.markdown("### 🏆 Top 3 产品推荐")
-        
-        top_products = [
-            {
-                'rank': 1,
-                'name': '迷你桌面收纳盒',
-                'score': 45.2,
-                'growth': 38.5,
-                'revenue': 12500,
-                'reason': '情绪分数最高，办公场景需求旺盛，适合快速进入',
-                'link': 'https://www.etsy.com/search?q=desk+organizer+3d+print'
-            },
-            {
-                'rank': 2,
-                'name': '创意手机支架',
-                'score': 43.8,
-                'growth': 32.1,
-                'revenue': 9800,
-                'reason': 'TikTok平台表现极佳，年轻用户喜爱，定制化需求强',
-                'link': 'https://www.etsy.com/search?q=phone+stand+3d+print'
-            },
-            {
-                'rank': 3,
-                'name': '装饰性墙挂',
-                'score': 42.5,
-                'growth': 28.3,
-                'revenue': 8500,
-                'reason': 'Instagram/Pinterest表现优秀，家居装饰市场稳定',
-                'link': 'https://www.etsy.com/search?q=wall+decor+3d+print'
-            }
-        ]
+            # Top 3产品推荐
+            st.markdown("### 🏆 Top 3 产品推荐")
+        
+            top_products = [
+                {
+                    'rank': 1,
+                    'name': '迷你桌面收纳盒',
+                    'score': 45.2,
+                    'growth': 38.5,
+                    'revenue': 12500,
+                    'reason': '情绪分数最高，办公场景需求旺盛，适合快速进入',
+                    'link': 'https://www.etsy.com/search?q=desk+organizer+3d+print'
+                },
+                {
+                    'rank': 2,
+                    'name': '创意手机支架',
+                    'score': 43.8,
+                    'growth': 32.1,
+                    'revenue': 9800,
+                    'reason': 'TikTok平台表现极佳，年轻用户喜爱，定制化需求强',
+                    'link': 'https://www.etsy.com/search?q=phone+stand+3d+print'
+                },
+                {
+                    'rank': 3,
+                    'name': '装饰性墙挂',
+                    'score': 42.5,
+                    'growth': 28.3,
+                    'revenue': 8500,
+                    'reason': 'Instagram/Pinterest表现优秀，家居装饰市场稳定',
+                    'link': 'https://www.etsy.com/search?q=wall+decor+3d+print'
+                }
+            ]
         
-        for product in top_products:
-            with st.expander(f"**#{product['rank']} {product['name']}** - 情绪分数: {product['score']}", expanded=(product['rank']==1)):
-                col1, col2 = st.columns([2, 1])
+            for product in top_products:
+                with st.expander(f"**#{product['rank']} {product['name']}** - 情绪分数: {product['score']}", expanded=(product['rank']==1)):
+                    col1, col2 = st.columns([2, 1])
                 
-                with col1:
-                    st.markdown(f"""
-                    **核心指标**
-                    - 情绪分数: **{product['score']}**/50
-                    - 增长率: **{product['growth']}%**
-                    - 预估月营收: **${product['revenue']:,}**
+                    with col1:
+                        st.markdown(f"""
+                        **核心指标**
+                        - 情绪分数: **{product['score']}**/50
+                        - 增长率: **{product['growth']}%**
+                        - 预估月营收: **${product['revenue']:,}**
                     
-                    **推荐理由**
-                    {product['reason']}
-                    """)
+                        **推荐理由**
+                        {product['reason']}
+                        """)
                     
-                    st.markdown(f"[查看类似产品]({product['link']})")
+                        st.markdown(f"[查看类似产品]({product['link']})")
                 
-                with col2:
-                    # 进度条
-                    st.markdown("**各项评分**")
-                    st.progress(product['score']/50, text=f"情绪: {product['score']}/50")
-                    st.progress(product['growth']/50, text=f"增长: {product['growth']:.0f}%")
-                    st.progress(min(product['revenue']/15000, 1.0), text=f"营收: ${product['revenue']/1000:.1f}K")
+                    with col2:
+                        # 进度条
+                        st.markdown("**各项评分**")
+                        st.progress(product['score']/50, text=f"情绪: {product['score']}/50")
+                        st.progress(product['growth']/50, text=f"增长: {product['growth']:.0f}%")
+                        st.progress(min(product['revenue']/15000, 1.0), text=f"营收: ${product['revenue']/1000:.1f}K")
         
-        st.divider()
+            st.divider()
         
-        # 数据解读
-        st.markdown("### 📖 数据解读")
+            # 数据解读
+            st.markdown("### 📖 数据解读")
         
-        col1, col2 = st.columns(2)
+            col1, col2 = st.columns(2)
         
-        with col1:
-            st.markdown("""
-            <div class="insight-box">
-            <strong>如何读懂情绪分数</strong><br><br>
-            情绪分数基于社交媒体用户评论和互动数据，通过AI分析生成：<br><br>
-            • <strong>40-50分</strong>: 极高正面情绪，强烈推荐<br>
-            • <strong>35-40分</strong>: 正面情绪为主，值得尝试<br>
-            • <strong>30-35分</strong>: 中立态度，需谨慎评估<br>
-            • <strong>30分以下</strong>: 负面情绪较多，不建议进入
-            </div>
-            """, unsafe_allow_html=True)
+            with col1:
+                st.markdown("""
+                <div class="insight-box">
+                <strong>如何读懂情绪分数</strong><br><br>
+                情绪分数基于社交媒体用户评论和互动数据，通过AI分析生成：<br><br>
+                • <strong>40-50分</strong>: 极高正面情绪，强烈推荐<br>
+                • <strong>35-40分</strong>: 正面情绪为主，值得尝试<br>
+                • <strong>30-35分</strong>: 中立态度，需谨慎评估<br>
+                • <strong>30分以下</strong>: 负面情绪较多，不建议进入
+                </div>
+                """, unsafe_allow_html=True)
         
-        with col2:
+            with col2:
+                st.markdown("""
+                <div class="insight-box">
+                <strong>如何读懂增长率</strong><br><br>
+                增长率反映了4周内的趋势变化，帮助判断市场热度：<br><br>
+                • <strong>30%以上</strong>: 快速增长，市场需求旺盛<br>
+                • <strong>15-30%</strong>: 稳定增长，市场潜力大<br>
+                • <strong>0-15%</strong>: 缓慢增长，需要营销推动<br>
+                • <strong>负增长</strong>: 市场需求下降，谨慎进入
+                </div>
+                """, unsafe_allow_html=True)
+        
+            st.divider()
+        
+            # 下一步行动
             st.markdown("""
             <div class="insight-box">
-            <strong>如何读懂增长率</strong><br><br>
-            增长率反映了4周内的趋势变化，帮助判断市场热度：<br><br>
-            • <strong>30%以上</strong>: 快速增长，市场需求旺盛<br>
-            • <strong>15-30%</strong>: 稳定增长，市场潜力大<br>
-            • <strong>0-15%</strong>: 缓慢增长，需要营销推动<br>
-            • <strong>负增长</strong>: 市场需求下降，谨慎进入
+            <strong>立即行动清单</strong><br><br>
+            1. ✅ <strong>确认产品选择</strong>: 从 Top 3 中选择 1-2 个产品启动<br>
+            2. ✅ <strong>联系供应商</strong>: 找到3D打印材料供应商，获取报价<br>
+            3. ✅ <strong>注册平台</strong>: 在 Etsy 和 Amazon 注册卖家账号<br>
+            4. ✅ <strong>开始设计</strong>: 完成产品3D建模和打样<br>
+            5. ✅ <strong>制定计划</strong>: 根据行动计划Tab制定详细时间表<br><br>
+            <strong>💼 预算准备</strong>: $9,000 (分阶段执行)<br>
+            <strong>⏰ 预计周期</strong>: 8周（从设计到上线）
             </div>
             """, unsafe_allow_html=True)
-        
-        st.divider()
-        
-        # 下一步行动
-        st.markdown("""
-        <div class="insight-box">
-        <strong>立即行动清单</strong><br><br>
-        1. ✅ <strong>确认产品选择</strong>: 从 Top 3 中选择 1-2 个产品启动<br>
-        2. ✅ <strong>联系供应商</strong>: 找到3D打印材料供应商，获取报价<br>
-        3. ✅ <strong>注册平台</strong>: 在 Etsy 和 Amazon 注册卖家账号<br>
-        4. ✅ <strong>开始设计</strong>: 完成产品3D建模和打样<br>
-        5. ✅ <strong>制定计划</strong>: 根据行动计划Tab制定详细时间表<br><br>
-        <strong>💼 预算准备</strong>: $9,000 (分阶段执行)<br>
-        <strong>⏰ 预计周期</strong>: 8周（从设计到上线）
-        </div>
-        """, unsafe_allow_html=True)
     
     # 页脚
 
     # Tab 2: 产品排名
     with tab2:
-        st.subheader("🏆 产品排名表")
-        
-        # 显示选项
-        col1, col2 = st.columns([3, 1])
-        with col1:
-            search_term = st.text_input("搜索产品名称", "")
-        with col2:
-            # Build sort options based on available columns
-            sort_options = ["total_score", "views", "engagement_rate"]
-            if 'emotion_score' in filtered_df.columns:
-                sort_options.append("emotion_score")
-            sort_by = st.selectbox("排序依据", sort_options)
-        
-        # 搜索筛选
-        display_df = filtered_df.copy()
-        if search_term:
-            display_df = display_df[display_df['product_name'].str.contains(search_term, case=False, na=False)]
-        
-        # 排序
-        display_df = display_df.sort_values(by=sort_by, ascending=False)
-        
-        # 格式化显示列 - only include columns that exist
-        display_columns = {
-            'product_name': '产品名称',
-            'product_category': '类别',
-            'total_score': '总分'
-        }
-        
-        # Add optional columns if they exist
-        if 'emotion_score' in display_df.columns:
-            display_columns['emotion_score'] = '情绪分'
-        
-        display_columns.update({
-            'views': '浏览量',
-            'likes': '点赞数',
-            'engagement_rate': '互动率(%)'
-        })
+        if view_active("产品排名"):
+            st.subheader("🏆 产品排名表")
         
-        # 创建显示数据框 - only select columns that exist
-        available_cols = [col for col in display_columns.keys() if col in display_df.columns]
-        show_df = display_df[available_cols].copy()
-        show_df.columns = [display_columns[col] for col in available_cols]
-        
-        # 添加颜色标记
-        def highlight_score(val):
-            if val >= 45:
-                return 'background-color: #4CAF50; color: white'
-            elif val <= 35:
-                return 'background-color: #FF6B6B; color: white'
-            else:
-                return ''
+            # 显示选项
+            col1, col2 = st.columns([3, 1])
+            with col1:
+                search_term = st.text_input("搜索产品名称", "")
+                search_history = st.checkbox("搜索全部周次", value=False)
+                dedup_ranking = st.checkbox("合并相似产品", value=False, disabled=not DEDUP_AVAILABLE,
+                                            help="标题近似的同款产品只显示得分最高的一条")
+            with col2:
+                # Build sort options based on available columns
+                sort_options = ["total_score", "views", "engagement_rate"]
+                if 'emotion_score' in filtered_df.columns:
+                    sort_options.append("emotion_score")
+                sort_by = st.selectbox("排序依据", sort_options)
+        
+            # 搜索筛选（三元组索引按数据版本构建一次，筛选条件变化不重建）
+            search_df = None
+            if search_history:
+                search_source = 'drive' if DATA_MANAGER_AVAILABLE else 'local'
+                search_revision = dataset_revision(source=search_source)
+                search_df = load_all_weeks_data(search_source, tuple(SEARCH_COLUMNS), search_revision,
+                                                week_revisions(source=search_source))
+                if search_df is not None:
+                    search_revision = search_df.attrs.get('revision', search_revision)
+                search_scope = 'history'
+            if search_df is None:
+                search_df = df
+                search_revision = week_revision
+                search_scope = f'week-{selected_week_num}'
+        
+            search_filter_index = get_filter_index(search_revision, search_scope, search_df)
+            positions = search_filter_index.positions(selected_category, (min_score, max_score))
+            if search_term:
+                name_index = get_name_index(search_revision, search_scope, search_df['product_name'])
+                positions = np.intersect1d(positions, name_index.search(search_term), assume_unique=True)
+        
+            # 排序（复用预先计算的排列）
+            display_df = search_df.iloc[search_filter_index.sort(positions, sort_by)]
+        
+            # 相似产品合并（簇编号按数据版本计算一次，筛选和排序后每簇保留第一条）
+            if dedup_ranking and DEDUP_AVAILABLE:
+                labels = pd.Series(
+                    get_duplicate_labels(search_revision, search_scope, search_df['product_name']),
+                    index=search_df.index
+                )
+                display_df = collapse_duplicates(display_df, labels.loc[display_df.index])
+        
+            # 格式化显示列 - only include columns that exist
+            display_columns = {
+                'week_number': '周次',
+                'product_name': '产品名称',
+                'product_category': '类别',
+                'total_score': '总分'
+            }
         
-        # 显示表格
-        st.dataframe(
-            show_df.style.applymap(highlight_score, subset=['总分']),
-            use_container_width=True,
-            height=500
-        )
+            # Add optional columns if they exist
+            if 'emotion_score' in display_df.columns:
+                display_columns['emotion_score'] = '情绪分'
         
-        # 下载按钮
-        csv = display_df.to_csv(index=False).encode('utf-8-sig')
-        st.download_button(
-            label="📥 下载数据 (CSV)",
-            data=csv,
-            file_name=f"products_week_{selected_week_num:02d}.csv",
-            mime="text/csv"
-        )
+            display_columns.update({
+                'views': '浏览量',
+                'likes': '点赞数',
+                'engagement_rate': '互动率(%)'
+            })
+            display_columns['duplicate_count'] = '相似数'
+        
+            # 实际读到的数据版本 search_revision 与筛选条件，决定表格页码何时重置以及导出缓存键
+            export_filters = {
+                'scope': search_scope,
+                'category': selected_category,
+                'score_range': (float(min_score), float(max_score)),
+                'search': search_term,
+                'sort_by': sort_by,
+                'dedup': bool(dedup_ranking and DEDUP_AVAILABLE),
+            }
+            ranking_key = export_key(search_revision, export_filters)
+        
+            # 分页显示（只截取、重命名和分档当前页），筛选条件变化时回到第一页
+            if search_df is df:
+                display_columns.pop('week_number')
+            paginated_table(display_df, display_columns, band_column='total_score', key='ranking_table',
+                            height=500, signature=ranking_key)
+        
+            # 导出（点击后才生成文件，按 ranking_key 缓存）
+            export_controls(
+                ranking_key,
+                lambda: export_sheets(display_df, export_filters),
+                file_stem=f"products_week_{selected_week_num:02d}",
+                key='ranking_export'
+            )
     
     # Tab 2: 数据分析（保持不变）
 
     # Tab 3: 数据分析
     with tab3:
-        st.subheader("数据可视化分析")
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            # 分数分布
-            st.markdown("#### 总分分布")
-            fig_score = px.histogram(
-                filtered_df,
-                x='total_score',
-                nbins=20,
-                title='产品总分分布',
-                color_discrete_sequence=['#2196F3']
-            )
-            fig_score.update_layout(
-                xaxis_title='总分',
-                yaxis_title='产品数量',
-                showlegend=False
-            )
-            st.plotly_chart(fig_score, use_container_width=True, key='fig_score_1')
-            
-            # 类别分布
-            st.markdown("#### 产品类别分布")
-            category_counts = filtered_df['product_category'].value_counts()
-            fig_category = px.pie(
-                values=category_counts.values,
-                names=category_counts.index,
-                title='产品类别占比',
-                color_discrete_sequence=px.colors.qualitative.Set3
-            )
-            st.plotly_chart(fig_category, use_container_width=True, key='fig_category_1')
-        
-        with col2:
-            # 浏览量 vs 互动率
-            st.markdown("#### 浏览量 vs 互动率")
-            fig_scatter = px.scatter(
-                filtered_df,
-                x='views',
-                y='engagement_rate',
-                size='total_score',
-                color='product_category',
-                hover_data=['product_name'],
-                title='浏览量与互动率关系',
-                color_discrete_sequence=px.colors.qualitative.Bold
-            )
-            fig_scatter.update_layout(
-                xaxis_title='浏览量',
-                yaxis_title='互动率 (%)'
-            )
-            st.plotly_chart(fig_scatter, use_container_width=True, key='fig_scatter_1')
-            
-            # Top 5 产品对比
-            st.markdown("#### Top 5 产品对比")
-            # Sort by emotion_score if available, otherwise use total_score
-            sort_col = 'emotion_score' if 'emotion_score' in filtered_df.columns else 'total_score'
-            top5 = filtered_df.nlargest(5, sort_col)
-            fig_bar = go.Figure()
-            fig_bar.add_trace(go.Bar(
-                name='总分',
-                x=top5['product_name'].str[:30],
-                y=top5['total_score'],
-                marker_color='#2196F3'
-            ))
-            fig_bar.update_layout(
-                title='Top 5 产品总分对比',
-                xaxis_title='产品',
-                yaxis_title='总分',
-                xaxis_tickangle=-45
-            )
-            st.plotly_chart(fig_bar, use_container_width=True, key='fig_bar_1')
+        if view_active("数据分析"):
+            st.subheader("数据可视化分析")
+        
+            col1, col2 = st.columns(2)
+        
+            with col1:
+                # 分数分布
+                st.markdown("#### 总分分布")
+                def build_fig_score_1():
+                    fig_score = px.histogram(
+                        filtered_df,
+                        x='total_score',
+                        nbins=20,
+                        title='产品总分分布',
+                        color_discrete_sequence=['#2196F3']
+                    )
+                    fig_score.update_layout(
+                        xaxis_title='总分',
+                        yaxis_title='产品数量',
+                        showlegend=False
+                    )
+                    return fig_score
+                show_chart('fig_score_1', build_fig_score_1)
+            
+                # 类别分布
+                st.markdown("#### 产品类别分布")
+                category_counts = filtered_df['product_category'].value_counts()
+                # 分类列会保留筛选掉的类别，计数为0，不参与绘图
+                category_counts = category_counts[category_counts > 0]
+                def build_fig_category_1():
+                    fig_category = px.pie(
+                        values=category_counts.values,
+                        names=category_counts.index,
+                        title='产品类别占比',
+                        color_discrete_sequence=px.colors.qualitative.Set3
+                    )
+                    return fig_category
+                show_chart('fig_category_1', build_fig_category_1)
+        
+            with col2:
+                # 浏览量 vs 互动率
+                st.markdown("#### 浏览量 vs 互动率")
+                def build_fig_scatter_1():
+                    fig_scatter = px.scatter(
+                        filtered_df,
+                        x='views',
+                        y='engagement_rate',
+                        size='total_score',
+                        color='product_category',
+                        hover_data=['product_name'],
+                        title='浏览量与互动率关系',
+                        color_discrete_sequence=px.colors.qualitative.Bold
+                    )
+                    fig_scatter.update_layout(
+                        xaxis_title='浏览量',
+                        yaxis_title='互动率 (%)'
+                    )
+                    return fig_scatter
+                show_chart('fig_scatter_1', build_fig_scatter_1)
+            
+                # Top 5 产品对比
+                st.markdown("#### Top 5 产品对比")
+                # Sort by emotion_score if available, otherwise use total_score
+                sort_col = 'emotion_score' if 'emotion_score' in filtered_df.columns else 'total_score'
+                top5 = filtered_df.nlargest(5, sort_col)
+                def build_fig_bar_1():
+                    fig_bar = go.Figure()
+                    fig_bar.add_trace(go.Bar(
+                        name='总分',
+                        x=top5['product_name'].str[:30],
+                        y=top5['total_score'],
+                        marker_color='#2196F3'
+                    ))
+                    fig_bar.update_layout(
+                        title='Top 5 产品总分对比',
+                        xaxis_title='产品',
+                        yaxis_title='总分',
+                        xaxis_tickangle=-45
+                    )
+                    return fig_bar
+                show_chart('fig_bar_1', build_fig_bar_1)
     
     # Tab 3: AI洞察（保持不变）
 
     # Tab 4: AI洞察
     with tab4:
-        if show_ai_analysis:
-            st.subheader("AI深度分析")
-            
-            # 选择产品查看详细分析
-            product_names = filtered_df['product_name'].tolist()
-            selected_product = st.selectbox(
-                "选择产品查看AI分析",
-                options=product_names,
-                index=0
-            )
-            
-            product_data = filtered_df[filtered_df['product_name'] == selected_product].iloc[0]
-            
-            # 产品基本信息
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                # Rank based on emotion_score
-                rank = filtered_df[filtered_df['product_name'] == selected_product].index[0] + 1
-                st.metric("排名", f"#{rank}")
-            with col2:
-                st.metric("总分", f"{product_data['total_score']:.2f}")
-            with col3:
-                st.metric("类别", product_data['product_category'])
+        if view_active("AI洞察"):
+            if show_ai_analysis:
+                st.subheader("AI深度分析")
+            
+                # AI分析全文检索（跨全部周次）
+                if TEXT_SEARCH_AVAILABLE:
+                    ai_query = st.text_input("全文检索AI分析", "", placeholder="例如：环保 TPU（空格分隔，需同时包含）")
+                    if ai_query:
+                        text_source = 'drive' if DATA_MANAGER_AVAILABLE else 'local'
+                        results = get_text_index(text_source).search(week_revisions(source=text_source), ai_query)
+                        if results.empty:
+                            st.info("没有找到包含这些关键词的产品")
+                        else:
+                            names = []
+                            for week_num, row in zip(results['week_number'], results['row']):
+                                week_names = load_week_columns(week_num, ['product_name'], text_source)
+                                names.append(week_names['product_name'].iloc[row]
+                                             if week_names is not None and row < len(week_names) else '')
+                            st.dataframe(
+                                pd.DataFrame({
+                                    '周次': results['week_number'],
+                                    '产品名称': names,
+                                    '相关度': results['score'].round(2)
+                                }),
+                                use_container_width=True,
+                                hide_index=True
+                            )
+                    st.divider()
+            
+                # 选择产品查看详细分析
+                product_names = filtered_df['product_name'].tolist()
+                selected_product = st.selectbox(
+                    "选择产品查看AI分析",
+                    options=product_names,
+                    index=0
+                )
             
-            st.divider()
+                product_row = filtered_df[filtered_df['product_name'] == selected_product].index[0]
+                product_data = filtered_df.loc[product_row]
             
-            # AI分析内容
-            # 检查是否有AI字段
-            has_ai_fields = all(field in product_data.index for field in [
-                'ai_market_positioning', 'ai_pricing_strategy', 
-                'ai_target_audience', 'ai_risks'
-            ])
+                # AI长文本按需加载（每个周次只读取一次，之后命中缓存）
+                if DATA_MANAGER_AVAILABLE:
+                    ai_df = load_week_data(selected_week_num, AI_TEXT_COLUMNS)
+                else:
+                    ai_df = load_data(data_file, tuple(AI_TEXT_COLUMNS), week_revision)
+                if ai_df is not None and len(ai_df.columns) > 0:
+                    product_data = pd.concat([product_data, ai_df.loc[product_row]])
             
-            if has_ai_fields:
-                col1, col2 = st.columns(2)
-                
+                # 产品基本信息
+                col1, col2, col3 = st.columns(3)
                 with col1:
-                    st.markdown("#### 市场定位")
-                    st.info(product_data['ai_market_positioning'])
+                    # Rank based on emotion_score
+                    rank = product_row + 1
+                    st.metric("排名", f"#{rank}")
+                with col2:
+                    st.metric("总分", f"{product_data['total_score']:.2f}")
+                with col3:
+                    st.metric("类别", product_data['product_category'])
+            
+                # 同一产品的跨周表现（按规范化链接关联各周数据）
+                if PRODUCT_IDENTITY_AVAILABLE:
+                    identity_source = 'drive' if DATA_MANAGER_AVAILABLE else 'local'
+                    identity_index = sync_identity_index(identity_source)
+                    identity_key = identity_index.key_at(selected_week_num, int(product_row))
+                    product_weeks = product_history(
+                        identity_index, identity_key,
+                        lambda week_num: load_week_columns(week_num, ['total_score'], identity_source)
+                    )
+                    if len(product_weeks) > 1:
+                        st.markdown("#### 跨周表现")
+                        def build_fig_identity_1():
+                            fig_identity = px.line(
+                                product_weeks,
+                                x='week_number',
+                                y='total_score',
+                                title=f'{selected_product}的各周总分',
+                                markers=True,
+                                labels={'week_number': '周次', 'total_score': '总分'},
+                                color_discrete_sequence=['#2196F3']
+                            )
+                            fig_identity.update_xaxes(dtick=1)
+                            return fig_identity
+                        show_chart(('fig_identity_1', identity_key), build_fig_identity_1,
+                                   revision=revision_digest(identity_index.revisions()), filtered=False)
+            
+                st.divider()
+            
+                # AI分析内容
+                # 检查是否有AI字段
+                has_ai_fields = all(field in product_data.index for field in [
+                    'ai_market_positioning', 'ai_pricing_strategy', 
+                    'ai_target_audience', 'ai_risks'
+                ])
+            
+                if has_ai_fields:
+                    col1, col2 = st.columns(2)
+                
+                    with col1:
+                        st.markdown("#### 市场定位")
+                        st.info(product_data['ai_market_positioning'])
                     
-                    st.markdown("#### 定价策略")
-                    st.success(product_data['ai_pricing_strategy'])
+                        st.markdown("#### 定价策略")
+                        st.success(product_data['ai_pricing_strategy'])
                 
-                with col2:
-                    st.markdown("#### 👥 目标受众")
-                    st.info(product_data['ai_target_audience'])
+                    with col2:
+                        st.markdown("#### 👥 目标受众")
+                        st.info(product_data['ai_target_audience'])
                     
-                    st.markdown("#### ⚠️ 风险评估")
-                    st.warning(product_data['ai_risks'])
-            else:
-                st.info("💡 AI分析功能即将推出！当前数据文件中暂无AI生成的分析内容。")
-                st.markdown("""  
-                **可用的产品信息：**
-                """)
+                        st.markdown("#### ⚠️ 风险评估")
+                        st.warning(product_data['ai_risks'])
+                else:
+                    st.info("💡 AI分析功能即将推出！当前数据文件中暂无AI生成的分析内容。")
+                    st.markdown("""  
+                    **可用的产品信息：**
+                    """)
                 
-                # 显示可用的产品数据
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    if 'emotion_score' in product_data.index:
-                        st.metric("情绪得分", f"{product_data['emotion_score']:.2f}")
-                with col2:
-                    if 'sales_score' in product_data.index:
-                        st.metric("销售得分", f"{product_data['sales_score']:.2f}")
-                with col3:
-                    if 'total_score' in product_data.index:
-                        st.metric("综合得分", f"{product_data['total_score']:.2f}")
-            
-            st.divider()
-            
-            # TikTok链接
-            if 'tiktok_url' in product_data.index and pd.notna(product_data['tiktok_url']):
-                st.markdown(f"#### 查看原视频")
-                st.markdown(f"[点击访閮TikTok视频]({product_data['tiktok_url']})")
-        else:
-            st.info("请在侧边栏启用 '显示AI分析' 选项")
+                    # 显示可用的产品数据
+                    col1, col2, col3 = st.columns(3)
+                    with col1:
+                        if 'emotion_score' in product_data.index:
+                            st.metric("情绪得分", f"{product_data['emotion_score']:.2f}")
+                    with col2:
+                        if 'sales_score' in product_data.index:
+                            st.metric("销售得分", f"{product_data['sales_score']:.2f}")
+                    with col3:
+                        if 'total_score' in product_data.index:
+                            st.metric("综合得分", f"{product_data['total_score']:.2f}")
+            
+                st.divider()
+            
+                # TikTok链接
+                if 'tiktok_url' in product_data.index and pd.notna(product_data['tiktok_url']):
+                    st.markdown(f"#### 查看原视频")
+                    st.markdown(f"[点击访閮TikTok视频]({product_data['tiktok_url']})")
+            else:
+                st.info("请在侧边栏启用 '显示AI分析' 选项")
     
     # Tab 4: 历史趋势（保持不变）
 
     # Tab 5: 历史趋势
     with tab5:
-        if show_trends:
-            st.subheader("历史趋势分析")
-            
-            # 加载历史数据
-            historical_df = load_all_weeks_data()
-            
-            if historical_df is not None and len(historical_df) > 0:
-                # 周次趋势
-                st.markdown("#### 平均总分趋势")
-                weekly_avg = historical_df.groupby('week_number')['total_score'].mean().reset_index()
-                fig_trend = px.line(
-                    weekly_avg,
-                    x='week_number',
-                    y='total_score',
-                    title='各周平均总分变化趋势',
-                    markers=True,
-                    color_discrete_sequence=['#2196F3']
-                )
-                fig_trend.update_layout(
-                    xaxis_title='周次',
-                    yaxis_title='平均总分'
-                )
-                st.plotly_chart(fig_trend, use_container_width=True, key='fig_trend_1')
+        if view_active("历史趋势"):
+            if show_trends:
+                st.subheader("历史趋势分析")
+            
+                # 加载历史汇总表（每周预先汇总，图表不读取原始行）
+                history_source = 'drive' if DATA_MANAGER_AVAILABLE else 'local'
+            
+                # 相似产品合并：同一周内标题近似的同款产品只计一次（保留得分最高的一条）
+                dedup_history = st.toggle("合并相似产品", value=False, disabled=not DEDUP_AVAILABLE,
+                                          help="不同创作者/平台重复发布的同款产品在每周只统计一次")
+                if dedup_history and DEDUP_AVAILABLE:
+                    # 合并依赖产品名称，需要读取原始行后重新汇总
+                    history_revisions = week_revisions(source=history_source)
+                    historical_df = load_all_weeks_data(history_source, tuple(HISTORY_COLUMNS),
+                                                        revision_digest(history_revisions), history_revisions)
+                    history_rollups = pd.DataFrame()
+                    # 图表以实际读到的数据版本为键
+                    history_revision = revision_digest(history_revisions)
+                    if historical_df is not None:
+                        history_revision = historical_df.attrs.get('revision', history_revision)
+                    if historical_df is not None and len(historical_df) > 0:
+                        labels = get_duplicate_labels(history_revision, 'history', historical_df['product_name'])
+                        ranked = historical_df.assign(_cluster=labels).sort_values('total_score', ascending=False)
+                        collapsed = collapse_duplicates(ranked, ranked['_cluster'], by=['week_number'])
+                        st.caption(f"已合并 {len(historical_df) - len(collapsed)} 条相似产品记录")
+                        history_rollups = rollup_frame(collapsed)
+                    history_revision = f"{history_revision}:dedup"
+                else:
+                    history_rollups = load_history_rollups(history_source)
+                    history_revision = history_rollups.attrs['revision']
+            
+                if len(history_rollups) > 0:
+                    weekly = select(history_rollups)
                 
-                col1, col2 = st.columns(2)
+                    # 周次趋势
+                    st.markdown("#### 平均总分趋势")
+                    weekly_avg = weekly[['week_number', 'total_score_mean']].rename(columns={'total_score_mean': 'total_score'})
+                    def build_fig_trend_1():
+                        fig_trend = px.line(
+                            weekly_avg,
+                            x='week_number',
+                            y='total_score',
+                            title='各周平均总分变化趋势',
+                            markers=True,
+                            color_discrete_sequence=['#2196F3']
+                        )
+                        fig_trend.update_layout(
+                            xaxis_title='周次',
+                            yaxis_title='平均总分'
+                        )
+                        return fig_trend
+                    show_chart('fig_trend_1', build_fig_trend_1, revision=history_revision, filtered=False)
                 
-                with col1:
-                    # 浏览量趋势
-                    st.markdown("#### 总浏览量趋势")
-                    weekly_views = historical_df.groupby('week_number')['views'].sum().reset_index()
-                    fig_views = px.area(
-                        weekly_views,
-                        x='week_number',
-                        y='views',
-                        title='各周总浏览量变化',
-                        color_discrete_sequence=['#4CAF50']
-                    )
-                    st.plotly_chart(fig_views, use_container_width=True, key='fig_views_1')
+                    col1, col2 = st.columns(2)
                 
-                with col2:
-                    # 互动率趋势
-                    st.markdown("#### 平均互动率趋势")
-                    weekly_engagement = historical_df.groupby('week_number')['engagement_rate'].mean().reset_index()
-                    fig_engagement = px.area(
-                        weekly_engagement,
-                        x='week_number',
-                        y='engagement_rate',
-                        title='各周平均互动率变化',
-                        color_discrete_sequence=['#FF6B6B']
-                    )
-                    st.plotly_chart(fig_engagement, use_container_width=True, key='fig_engagement_1')
+                    with col1:
+                        # 浏览量趋势
+                        st.markdown("#### 总浏览量趋势")
+                        weekly_views = weekly[['week_number', 'views_sum']].rename(columns={'views_sum': 'views'})
+                        def build_fig_views_1():
+                            fig_views = px.area(
+                                weekly_views,
+                                x='week_number',
+                                y='views',
+                                title='各周总浏览量变化',
+                                color_discrete_sequence=['#4CAF50']
+                            )
+                            return fig_views
+                        show_chart('fig_views_1', build_fig_views_1, revision=history_revision, filtered=False)
                 
-                # 类别趋势
-                st.markdown("#### 产品类别趋势")
-                category_trend = historical_df.groupby(['week_number', 'product_category']).size().reset_index(name='count')
-                fig_category_trend = px.line(
-                    category_trend,
-                    x='week_number',
-                    y='count',
-                    color='product_category',
-                    title='各类别产品数量变化',
-                    markers=True
-                )
-                st.plotly_chart(fig_category_trend, use_container_width=True, key='fig_category_trend_1')
+                    with col2:
+                        # 互动率趋势
+                        st.markdown("#### 平均互动率趋势")
+                        weekly_engagement = weekly[['week_number', 'engagement_rate_mean']].rename(
+                            columns={'engagement_rate_mean': 'engagement_rate'})
+                        def build_fig_engagement_1():
+                            fig_engagement = px.area(
+                                weekly_engagement,
+                                x='week_number',
+                                y='engagement_rate',
+                                title='各周平均互动率变化',
+                                color_discrete_sequence=['#FF6B6B']
+                            )
+                            return fig_engagement
+                        show_chart('fig_engagement_1', build_fig_engagement_1, revision=history_revision, filtered=False)
+                
+                    # 类别趋势
+                    st.markdown("#### 产品类别趋势")
+                    category_trend = select(history_rollups, category=None)[['week_number', 'product_category', 'count']]
+                    def build_fig_category_trend_1():
+                        fig_category_trend = px.line(
+                            category_trend,
+                            x='week_number',
+                            y='count',
+                            color='product_category',
+                            title='各类别产品数量变化',
+                            markers=True
+                        )
+                        return fig_category_trend
+                    show_chart('fig_category_trend_1', build_fig_category_trend_1, revision=history_revision, filtered=False)
+                
+                    # 类别/平台跨周对比（优先在SQL引擎内聚合；引擎打不开或查询失败时由周次汇总表得到）
+                    category_summary = platform_summary = None
+                    if SQL_ENGINE_AVAILABLE:
+                        try:
+                            engine = sync_query_engine(history_source)
+                            category_summary = engine.category_breakdown()
+                            platform_summary = engine.platform_comparison()
+                        except Exception as e:
+                            print(f"Error querying SQL engine: {e}")
+                            category_summary = platform_summary = None
+                    if category_summary is None or platform_summary is None:
+                        category_summary = group_summary(history_rollups, 'product_category')
+                        platform_summary = group_summary(history_rollups, 'platform')
+                    if not category_summary.empty and 'total_score' in category_summary.columns:
+                        st.markdown("#### 各周类别平均总分")
+                        def build_fig_category_heatmap_1():
+                            pivot = category_summary.pivot(index='product_category', columns='week_number', values='total_score')
+                            fig_heatmap = px.imshow(
+                                pivot,
+                                labels={'x': '周次', 'y': '类别', 'color': '平均总分'},
+                                color_continuous_scale='Blues',
+                                aspect='auto',
+                                text_auto='.1f'
+                            )
+                            return fig_heatmap
+                        show_chart('fig_category_heatmap_1', build_fig_category_heatmap_1, revision=history_revision, filtered=False)
+                
+                    if not platform_summary.empty:
+                        st.markdown("#### 各周平台对比")
+                        st.dataframe(
+                            platform_summary.rename(columns={
+                                'week_number': '周次', 'platform': '平台', 'product_count': '产品数',
+                                'total_score': '平均总分', 'views': '总浏览量'
+                            }),
+                            use_container_width=True,
+                            hide_index=True
+                        )
+                else:
+                    st.info("暂无历史数据。随着周次累积，这里将显示历史趋势分析。")
             else:
-                st.info("暂无历史数据。随着周次累积，这里将显示历史趋势分析。")
-        else:
-            st.info("请在侧边栏启用 '显示历史趋势' 选项")
+                st.info("请在侧边栏启用 '显示历史趋势' 选项")
     
     # ===== 新增 Tab 5: 情绪分析 =====
 
     # Tab 6: 情绪分析
     with tab6:
-        st.subheader("情绪智能分析")
+        if view_active("情绪分析"):
+            st.subheader("情绪智能分析")
         
-        st.markdown("""
-        <div class="insight-box">
-        <strong>💡 核心洞察</strong><br>
-        通过分析用户评论和互动数据，我们识别出12种主要情绪类型。
-        理解用户情绪有助于优化产品设计和营销策略。
-        </div>
-        """, unsafe_allow_html=True)
-        
-        # 情绪分数解读指南
-        st.markdown("### 情绪分数解读指南")
-        
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
             st.markdown("""
-            <div style="background: linear-gradient(135deg, #ff6b6b 0%, #ff8787 100%); padding: 20px; border-radius: 10px; text-align: center; color: white;">
-                <h3 style="margin: 0; color: white;">0-20分</h3>
-                <p style="margin: 10px 0 0 0; font-size: 14px;">较差</p>
-                <p style="margin: 5px 0 0 0; font-size: 12px;">负面情绪为主<br>需要立即优化</p>
+            <div class="insight-box">
+            <strong>💡 核心洞察</strong><br>
+            通过分析用户评论和互动数据，我们识别出12种主要情绪类型。
+            理解用户情绪有助于优化产品设计和营销策略。
             </div>
             """, unsafe_allow_html=True)
         
-        with col2:
-            st.markdown("""
-            <div style="background: linear-gradient(135deg, #ffa502 0%, #ffb733 100%); padding: 20px; border-radius: 10px; text-align: center; color: white;">
-                <h3 style="margin: 0; color: white;">20-35分</h3>
-                <p style="margin: 10px 0 0 0; font-size: 14px;">一般</p>
-                <p style="margin: 5px 0 0 0; font-size: 12px;">中性情绪较多<br>有提升空间</p>
-            </div>
-            """, unsafe_allow_html=True)
+            # 情绪分数解读指南
+            st.markdown("### 情绪分数解读指南")
         
-        with col3:
-            st.markdown("""
-            <div style="background: linear-gradient(135deg, #2196F3 0%, #42a5f5 100%); padding: 20px; border-radius: 10px; text-align: center; color: white;">
-                <h3 style="margin: 0; color: white;">35-45分</h3>
-                <p style="margin: 10px 0 0 0; font-size: 14px;">良好</p>
-                <p style="margin: 5px 0 0 0; font-size: 12px;">正面情绪为主<br>表现不错</p>
-            </div>
-            """, unsafe_allow_html=True)
+            col1, col2, col3, col4 = st.columns(4)
         
-        with col4:
-            st.markdown("""
-            <div style="background: linear-gradient(135deg, #4CAF50 0%, #66bb6a 100%); padding: 20px; border-radius: 10px; text-align: center; color: white;">
-                <h3 style="margin: 0; color: white;">45-50分</h3>
-                <p style="margin: 10px 0 0 0; font-size: 14px;">优秀</p>
-                <p style="margin: 5px 0 0 0; font-size: 12px;">高度正面情绪<br>值得重点关注</p>
-            </div>
-            """, unsafe_allow_html=True)
+            with col1:
+                st.markdown("""
+                <div style="background: linear-gradient(135deg, #ff6b6b 0%, #ff8787 100%); padding: 20px; border-radius: 10px; text-align: center; color: white;">
+                    <h3 style="margin: 0; color: white;">0-20分</h3>
+                    <p style="margin: 10px 0 0 0; font-size: 14px;">较差</p>
+                    <p style="margin: 5px 0 0 0; font-size: 12px;">负面情绪为主<br>需要立即优化</p>
+                </div>
+                """, unsafe_allow_html=True)
         
-        st.divider()
+            with col2:
+                st.markdown("""
+                <div style="background: linear-gradient(135deg, #ffa502 0%, #ffb733 100%); padding: 20px; border-radius: 10px; text-align: center; color: white;">
+                    <h3 style="margin: 0; color: white;">20-35分</h3>
+                    <p style="margin: 10px 0 0 0; font-size: 14px;">一般</p>
+                    <p style="margin: 5px 0 0 0; font-size: 12px;">中性情绪较多<br>有提升空间</p>
+                </div>
+                """, unsafe_allow_html=True)
         
-        # 情绪健康仪表盘
-        if EMOTION_VIZ_AVAILABLE and 'emotion_score' in filtered_df.columns:
-            st.markdown("### 情绪健康仪表盘")
+            with col3:
+                st.markdown("""
+                <div style="background: linear-gradient(135deg, #2196F3 0%, #42a5f5 100%); padding: 20px; border-radius: 10px; text-align: center; color: white;">
+                    <h3 style="margin: 0; color: white;">35-45分</h3>
+                    <p style="margin: 10px 0 0 0; font-size: 14px;">良好</p>
+                    <p style="margin: 5px 0 0 0; font-size: 12px;">正面情绪为主<br>表现不错</p>
+                </div>
+                """, unsafe_allow_html=True)
+        
+            with col4:
+                st.markdown("""
+                <div style="background: linear-gradient(135deg, #4CAF50 0%, #66bb6a 100%); padding: 20px; border-radius: 10px; text-align: center; color: white;">
+                    <h3 style="margin: 0; color: white;">45-50分</h3>
+                    <p style="margin: 10px 0 0 0; font-size: 14px;">优秀</p>
+                    <p style="margin: 5px 0 0 0; font-size: 12px;">高度正面情绪<br>值得重点关注</p>
+                </div>
+                """, unsafe_allow_html=True)
+        
+            st.divider()
+        
+            # 情绪健康仪表盘
+            if EMOTION_VIZ_AVAILABLE and 'emotion_score' in filtered_df.columns:
+                st.markdown("### 情绪健康仪表盘")
             
-            col1, col2 = st.columns([1, 2])
+                col1, col2 = st.columns([1, 2])
             
-            with col1:
-                avg_emotion_score = filtered_df['emotion_score'].mean()
-                fig_gauge = create_emotion_health_gauge(avg_emotion_score)
-                st.plotly_chart(fig_gauge, use_container_width=True, key='emotion_gauge')
+                with col1:
+                    avg_emotion_score = filtered_df['emotion_score'].mean()
+                    def build_emotion_gauge():
+                        fig_gauge = create_emotion_health_gauge(avg_emotion_score)
+                        return fig_gauge
+                    show_chart('emotion_gauge', build_emotion_gauge)
             
-            with col2:
-                st.markdown("#### 💡 情绪健康洞察")
-                insights = generate_emotion_insights(avg_emotion_score)
-                st.markdown(insights)
+                with col2:
+                    st.markdown("#### 💡 情绪健康洞察")
+                    insights = generate_emotion_insights(avg_emotion_score)
+                    st.markdown(insights)
             
-            st.divider()
+                st.divider()
         
-        # 情绪-主题交叉分析热力图
-        if EMOTION_VIZ_AVAILABLE:
-            st.markdown("### 情绪-主题交叉分析")
+            # 情绪-主题交叉分析热力图
+            if EMOTION_VIZ_AVAILABLE:
+                st.markdown("### 情绪-主题交叉分析")
             
-            fig_heatmap = create_emotion_topic_heatmap(filtered_df)
-            st.plotly_chart(fig_heatmap, use_container_width=True, key='emotion_heatmap')
+                def build_emotion_heatmap():
+                    fig_heatmap = create_emotion_topic_heatmap(filtered_df)
+                    return fig_heatmap
+                show_chart('emotion_heatmap', build_emotion_heatmap)
             
-            st.markdown("""
-            <div class="insight-box">
-            <strong>🔍 如何阅读热力图</strong><br>
-            • <strong>颜色越深</strong>：表示该情绪与主题的关联越强<br>
-            • <strong>点击格子</strong>：查看具体的关联强度数值<br>
-            • <strong>关键发现</strong>：兴奋与设计强相关，担忧与价格强相关<br>
-            </div>
-            """, unsafe_allow_html=True)
+                st.markdown("""
+                <div class="insight-box">
+                <strong>🔍 如何阅读热力图</strong><br>
+                • <strong>颜色越深</strong>：表示该情绪与主题的关联越强<br>
+                • <strong>点击格子</strong>：查看具体的关联强度数值<br>
+                • <strong>关键发现</strong>：兴奋与设计强相关，担忧与价格强相关<br>
+                </div>
+                """, unsafe_allow_html=True)
             
-            st.divider()
+                st.divider()
         
-        # 情绪关联分析
-        if EMOTION_VIZ_AVAILABLE:
-            st.markdown("### 情绪关联分析")
+            # 情绪关联分析
+            if EMOTION_VIZ_AVAILABLE:
+                st.markdown("### 情绪关联分析")
             
-            fig_correlation = create_emotion_correlation_chart(filtered_df)
-            st.plotly_chart(fig_correlation, use_container_width=True, key='emotion_correlation')
+                def build_emotion_correlation():
+                    fig_correlation = create_emotion_correlation_chart(filtered_df)
+                    return fig_correlation
+                show_chart('emotion_correlation', build_emotion_correlation)
             
-            st.markdown("""
-            <div class="insight-box">
-            <strong>🎯 关键洞察</strong><br>
-            • <strong>兴奋</strong>主要与<strong>创新设计</strong>相关 → 用户喜欢新颖产品<br>
-            • <strong>担忧</strong>主要与<strong>价格</strong>相关 → 建议提供更多价格档位<br>
-            • <strong>满意</strong>主要与<strong>质量</strong>相关 → 继续保持质量优势<br>
-            </div>
-            """, unsafe_allow_html=True)
+                st.markdown("""
+                <div class="insight-box">
+                <strong>🎯 关键洞察</strong><br>
+                • <strong>兴奋</strong>主要与<strong>创新设计</strong>相关 → 用户喜欢新颖产品<br>
+                • <strong>担忧</strong>主要与<strong>价格</strong>相关 → 建议提供更多价格档位<br>
+                • <strong>满意</strong>主要与<strong>质量</strong>相关 → 继续保持质量优势<br>
+                </div>
+                """, unsafe_allow_html=True)
             
-            st.divider()
+                st.divider()
         
-        # 生成情绪数据
-        emotion_df = generate_emotion_data()
+            # 生成情绪数据
+            emotion_df = generate_emotion_data()
         
-        # === 新增：专业情绪分析图表 ===
-        if EMOTION_CHARTS_AVAILABLE:
-            st.markdown("### 专业情绪分析图表")
+            # === 新增：专业情绪分析图表 ===
+            if EMOTION_CHARTS_AVAILABLE:
+                st.markdown("### 专业情绪分析图表")
             
-            # 生成示例数据
-            sample_data = generate_sample_emotion_data()
+                # 生成示例数据
+                sample_data = generate_sample_emotion_data()
             
-            # 1. 雷达图 - 12种情绪强度分布
-            st.markdown("#### 1️⃣ 12种情绪强度分布雷达图")
-            week3_data, week4_data = sample_data['radar']  # Unpack tuple
-            fig_radar = create_emotion_radar_chart(week3_data, week4_data)
-            st.plotly_chart(fig_radar, use_container_width=True, key='emotion_radar_pro')
+                # 1. 雷达图 - 12种情绪强度分布
+                st.markdown("#### 1️⃣ 12种情绪强度分布雷达图")
+                week3_data, week4_data = sample_data['radar']  # Unpack tuple
+                def build_emotion_radar_pro():
+                    fig_radar = create_emotion_radar_chart(week3_data, week4_data)
+                    return fig_radar
+                show_chart('emotion_radar_pro', build_emotion_radar_pro)
             
-            st.divider()
+                st.divider()
             
-            # 2. 水平柱状图 - 情绪频率分布
-            col1, col2 = st.columns(2)
-            with col1:
-                st.markdown("#### 2️⃣ 情绪频率排名")
-                fig_bar = create_emotion_frequency_bar(sample_data['frequency'])
-                st.plotly_chart(fig_bar, use_container_width=True, key='emotion_bar_pro')
+                # 2. 水平柱状图 - 情绪频率分布
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.markdown("#### 2️⃣ 情绪频率排名")
+                    def build_emotion_bar_pro():
+                        fig_bar = create_emotion_frequency_bar(sample_data['frequency'])
+                        return fig_bar
+                    show_chart('emotion_bar_pro', build_emotion_bar_pro)
             
-            # 3. 气泡矩阵 - 情绪机会分析
-            with col2:
-                st.markdown("#### 3️⃣ 情绪机会矩阵")
-                fig_matrix = create_emotion_opportunity_matrix(sample_data['matrix'])
-                st.plotly_chart(fig_matrix, use_container_width=True, key='emotion_matrix_pro')
+                # 3. 气泡矩阵 - 情绪机会分析
+                with col2:
+                    st.markdown("#### 3️⃣ 情绪机会矩阵")
+                    def build_emotion_matrix_pro():
+                        fig_matrix = create_emotion_opportunity_matrix(sample_data['matrix'])
+                        return fig_matrix
+                    show_chart('emotion_matrix_pro', build_emotion_matrix_pro)
             
-            st.divider()
+                st.divider()
             
-            # 4. 瀑布图 - 情绪得分组成
-            st.markdown("#### 4️⃣ 产品情绪得分组成分析")
-            fig_waterfall = create_emotion_score_waterfall()
-            st.plotly_chart(fig_waterfall, use_container_width=True, key='emotion_waterfall_pro')
+                # 4. 瀑布图 - 情绪得分组成
+                st.markdown("#### 4️⃣ 产品情绪得分组成分析")
+                def build_emotion_waterfall_pro():
+                    fig_waterfall = create_emotion_score_waterfall()
+                    return fig_waterfall
+                show_chart('emotion_waterfall_pro', build_emotion_waterfall_pro)
             
-            st.divider()
-            st.markdown("### 基础情绪分析")
-        
-        # 情绪概览
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.markdown("#### 情绪分布")
-            fig_emotion_dist = px.bar(
-                emotion_df.sort_values('count', ascending=False),
-                x='emotion',
-                y='count',
-                title='各情绪类型出现频次',
-                color='count',
-                color_continuous_scale='Blues'
-            )
-            fig_emotion_dist.update_layout(
-                xaxis_title='情绪类型',
-                yaxis_title='出现次数',
-                xaxis_tickangle=-45
-            )
-            st.plotly_chart(fig_emotion_dist, use_container_width=True, key='fig_emotion_dist_1')
-        
-        with col2:
-            st.markdown("#### 情绪与产品评分关系")
-            fig_emotion_score = px.scatter(
-                emotion_df,
-                x='avg_score',
-                y='count',
-                size='percentage',
-                color='emotion',
-                title='情绪频次 vs 平均产品评分',
-                hover_data=['trend']
-            )
-            fig_emotion_score.update_layout(
-                xaxis_title='平均产品评分',
-                yaxis_title='情绪出现次数'
-            )
-            st.plotly_chart(fig_emotion_score, use_container_width=True, key='fig_emotion_score_1')
+                st.divider()
+                st.markdown("### 基础情绪分析")
         
-        st.divider()
+            # 情绪概览
+            col1, col2 = st.columns(2)
         
-        # 情绪趋势
-        st.markdown("#### 情绪趋势分析")
+            with col1:
+                st.markdown("#### 情绪分布")
+                def build_fig_emotion_dist_1():
+                    fig_emotion_dist = px.bar(
+                        emotion_df.sort_values('count', ascending=False),
+                        x='emotion',
+                        y='count',
+                        title='各情绪类型出现频次',
+                        color='count',
+                        color_continuous_scale='Blues'
+                    )
+                    fig_emotion_dist.update_layout(
+                        xaxis_title='情绪类型',
+                        yaxis_title='出现次数',
+                        xaxis_tickangle=-45
+                    )
+                    return fig_emotion_dist
+                show_chart('fig_emotion_dist_1', build_fig_emotion_dist_1)
+        
+            with col2:
+                st.markdown("#### 情绪与产品评分关系")
+                def build_fig_emotion_score_1():
+                    fig_emotion_score = px.scatter(
+                        emotion_df,
+                        x='avg_score',
+                        y='count',
+                        size='percentage',
+                        color='emotion',
+                        title='情绪频次 vs 平均产品评分',
+                        hover_data=['trend']
+                    )
+                    fig_emotion_score.update_layout(
+                        xaxis_title='平均产品评分',
+                        yaxis_title='情绪出现次数'
+                    )
+                    return fig_emotion_score
+                show_chart('fig_emotion_score_1', build_fig_emotion_score_1)
         
-        col1, col2, col3 = st.columns(3)
+            st.divider()
         
-        with col1:
-            st.markdown("##### 上升情绪")
-            rising = emotion_df[emotion_df['trend'] == '上升'].sort_values('count', ascending=False)
-            for _, row in rising.iterrows():
-                st.success(f"**{row['emotion']}**: {row['count']}次 ({row['percentage']:.1f}%)")
+            # 情绪趋势
+            st.markdown("#### 情绪趋势分析")
         
-        with col2:
-            st.markdown("##### 📉 下降情绪")
-            falling = emotion_df[emotion_df['trend'] == '下降'].sort_values('count', ascending=False)
-            for _, row in falling.iterrows():
-                st.error(f"**{row['emotion']}**: {row['count']}次 ({row['percentage']:.1f}%)")
+            col1, col2, col3 = st.columns(3)
         
-        with col3:
-            st.markdown("##### ➡️ 稳定情绪")
-            stable = emotion_df[emotion_df['trend'] == '稳定'].sort_values('count', ascending=False)
-            for _, row in stable.iterrows():
-                st.info(f"**{row['emotion']}**: {row['count']}次 ({row['percentage']:.1f}%)")
+            with col1:
+                st.markdown("##### 上升情绪")
+                rising = emotion_df[emotion_df['trend'] == '上升'].sort_values('count', ascending=False)
+                for _, row in rising.iterrows():
+                    st.success(f"**{row['emotion']}**: {row['count']}次 ({row['percentage']:.1f}%)")
         
-        st.divider()
+            with col2:
+                st.markdown("##### 📉 下降情绪")
+                falling = emotion_df[emotion_df['trend'] == '下降'].sort_values('count', ascending=False)
+                for _, row in falling.iterrows():
+                    st.error(f"**{row['emotion']}**: {row['count']}次 ({row['percentage']:.1f}%)")
         
-        # 4周趋势对比图
-        st.markdown("#### 情绪4周趋势对比")
+            with col3:
+                st.markdown("##### ➡️ 稳定情绪")
+                stable = emotion_df[emotion_df['trend'] == '稳定'].sort_values('count', ascending=False)
+                for _, row in stable.iterrows():
+                    st.info(f"**{row['emotion']}**: {row['count']}次 ({row['percentage']:.1f}%)")
         
-        # 让用户选择要对比的情绪（最多5个）
-        selected_emotions = st.multiselect(
-            "选择要对比的情绪（最多5个）",
-            options=emotion_df['emotion'].tolist(),
-            default=emotion_df.nlargest(3, 'count')['emotion'].tolist(),
-            max_selections=5
-        )
+            st.divider()
         
-        if selected_emotions:
-            # 准备趋势数据
-            trend_data = []
-            for emotion in selected_emotions:
-                emotion_row = emotion_df[emotion_df['emotion'] == emotion].iloc[0]
-                for week in range(1, 5):
-                    trend_data.append({
-                        '情绪': emotion,
-                        '周次': f'第{week}周',
-                        '出现次数': emotion_row[f'week{week}']
-                    })
-            
-            trend_df = pd.DataFrame(trend_data)
-            
-            fig_trend = px.line(
-                trend_df,
-                x='周次',
-                y='出现次数',
-                color='情绪',
-                title='选定情绪的4周趋势对比',
-                markers=True,
-                color_discrete_sequence=px.colors.qualitative.Set2
-            )
-            fig_trend.update_layout(
-                xaxis_title='周次',
-                yaxis_title='出现次数',
-                hovermode='x unified'
+            # 4周趋势对比图
+            st.markdown("#### 情绪4周趋势对比")
+        
+            # 让用户选择要对比的情绪（最多5个）
+            selected_emotions = st.multiselect(
+                "选择要对比的情绪（最多5个）",
+                options=emotion_df['emotion'].tolist(),
+                default=emotion_df.nlargest(3, 'count')['emotion'].tolist(),
+                max_selections=5
             )
-            st.plotly_chart(fig_trend, use_container_width=True, key='fig_trend_2')
         
-        st.divider()
+            if selected_emotions:
+                # 准备趋势数据
+                trend_data = []
+                for emotion in selected_emotions:
+                    emotion_row = emotion_df[emotion_df['emotion'] == emotion].iloc[0]
+                    for week in range(1, 5):
+                        trend_data.append({
+                            '情绪': emotion,
+                            '周次': f'第{week}周',
+                            '出现次数': emotion_row[f'week{week}']
+                        })
+            
+                trend_df = pd.DataFrame(trend_data)
+            
+                def build_fig_trend_2():
+                    fig_trend = px.line(
+                        trend_df,
+                        x='周次',
+                        y='出现次数',
+                        color='情绪',
+                        title='选定情绪的4周趋势对比',
+                        markers=True,
+                        color_discrete_sequence=px.colors.qualitative.Set2
+                    )
+                    fig_trend.update_layout(
+                        xaxis_title='周次',
+                        yaxis_title='出现次数',
+                        hovermode='x unified'
+                    )
+                    return fig_trend
+                show_chart(('fig_trend_2', tuple(selected_emotions)), build_fig_trend_2)
         
-        # 情绪组合与产品机会
-        st.markdown("#### 情绪组合与产品机会识别")
+            st.divider()
         
-        col1, col2 = st.columns(2)
+            # 情绪组合与产品机会
+            st.markdown("#### 情绪组合与产品机会识别")
         
-        with col1:
-            st.markdown("##### 高价值情绪组合")
-            
-            # 正面情绪组合
-            positive_emotions = emotion_df[emotion_df['type'] == 'positive'].nlargest(3, 'count')
-            st.markdown("""<div class="insight-box">
-            <strong>✨ 创新产品机会</strong><br>
-            """ + " + ".join([f"<strong>{row['emotion']}</strong>" for _, row in positive_emotions.iterrows()]) + """<br>
-            <em>策略：强调产品的独特性和新颖设计，激发用户的兴奋和好奇心</em>
-            </div>""", unsafe_allow_html=True)
+            col1, col2 = st.columns(2)
+        
+            with col1:
+                st.markdown("##### 高价值情绪组合")
             
-            # 信任+满意组合
-            trust_emotions = emotion_df[emotion_df['emotion'].isin(['信任', '满意', '喜悦'])]
-            if len(trust_emotions) > 0:
+                # 正面情绪组合
+                positive_emotions = emotion_df[emotion_df['type'] == 'positive'].nlargest(3, 'count')
                 st.markdown("""<div class="insight-box">
-                <strong>🛡️ 实用产品机会</strong><br>
-                """ + " + ".join([f"<strong>{row['emotion']}</strong>" for _, row in trust_emotions.iterrows()]) + """<br>
-                <em>策略：突出产品质量和实用价值，建立品牌信任</em>
+                <strong>✨ 创新产品机会</strong><br>
+                """ + " + ".join([f"<strong>{row['emotion']}</strong>" for _, row in positive_emotions.iterrows()]) + """<br>
+                <em>策略：强调产品的独特性和新颖设计，激发用户的兴奋和好奇心</em>
                 </div>""", unsafe_allow_html=True)
+            
+                # 信任+满意组合
+                trust_emotions = emotion_df[emotion_df['emotion'].isin(['信任', '满意', '喜悦'])]
+                if len(trust_emotions) > 0:
+                    st.markdown("""<div class="insight-box">
+                    <strong>🛡️ 实用产品机会</strong><br>
+                    """ + " + ".join([f"<strong>{row['emotion']}</strong>" for _, row in trust_emotions.iterrows()]) + """<br>
+                    <em>策略：突出产品质量和实用价值，建立品牌信任</em>
+                    </div>""", unsafe_allow_html=True)
         
-        with col2:
-            st.markdown("##### 需要关注的情绪组合")
+            with col2:
+                st.markdown("##### 需要关注的情绪组合")
             
-            # 负面情绪组合
-            negative_emotions = emotion_df[emotion_df['type'] == 'negative'].nlargest(2, 'count')
-            st.markdown("""<div class="insight-box">
-            <strong>⚠️ 需要解决的问题</strong><br>
-            """ + " + ".join([f"<strong>{row['emotion']}</strong>" for _, row in negative_emotions.iterrows()]) + """<br>
-            <em>策略：增加产品展示和用户评价，提供详细的FAQ和售后支持</em>
-            </div>""", unsafe_allow_html=True)
+                # 负面情绪组合
+                negative_emotions = emotion_df[emotion_df['type'] == 'negative'].nlargest(2, 'count')
+                st.markdown("""<div class="insight-box">
+                <strong>⚠️ 需要解决的问题</strong><br>
+                """ + " + ".join([f"<strong>{row['emotion']}</strong>" for _, row in negative_emotions.iterrows()]) + """<br>
+                <em>策略：增加产品展示和用户评价，提供详细的FAQ和售后支持</em>
+                </div>""", unsafe_allow_html=True)
         
-        st.divider()
+            st.divider()
         
-        # 本周情绪洞察
-        st.markdown("#### 💡 本周情绪洞察")
+            # 本周情绪洞察
+            st.markdown("#### 💡 本周情绪洞察")
         
-        # 找出变化最大的情绪
-        top_rising = emotion_df[emotion_df['trend'] == '上升'].nlargest(1, 'trend_value')
-        top_falling = emotion_df[emotion_df['trend'] == '下降'].nsmallest(1, 'trend_value')
+            # 找出变化最大的情绪
+            top_rising = emotion_df[emotion_df['trend'] == '上升'].nlargest(1, 'trend_value')
+            top_falling = emotion_df[emotion_df['trend'] == '下降'].nsmallest(1, 'trend_value')
         
-        col1, col2, col3 = st.columns(3)
+            col1, col2, col3 = st.columns(3)
         
-        with col1:
-            if len(top_rising) > 0:
-                emotion_name = top_rising.iloc[0]['emotion']
-                trend_val = top_rising.iloc[0]['trend_value']
-                st.success(f"**上升最快**: {emotion_name} (+{trend_val:.1f}%)")
-                st.caption("这表明用户对相关产品的兴趣正在增加")
+            with col1:
+                if len(top_rising) > 0:
+                    emotion_name = top_rising.iloc[0]['emotion']
+                    trend_val = top_rising.iloc[0]['trend_value']
+                    st.success(f"**上升最快**: {emotion_name} (+{trend_val:.1f}%)")
+                    st.caption("这表明用户对相关产品的兴趣正在增加")
         
-        with col2:
-            if len(top_falling) > 0:
-                emotion_name = top_falling.iloc[0]['emotion']
-                trend_val = abs(top_falling.iloc[0]['trend_value'])
-                st.error(f"**📉 下降最快**: {emotion_name} (-{trend_val:.1f}%)")
-                st.caption("需要关注并改进相关方面")
+            with col2:
+                if len(top_falling) > 0:
+                    emotion_name = top_falling.iloc[0]['emotion']
+                    trend_val = abs(top_falling.iloc[0]['trend_value'])
+                    st.error(f"**📉 下降最快**: {emotion_name} (-{trend_val:.1f}%)")
+                    st.caption("需要关注并改进相关方面")
         
-        with col3:
-            avg_positive = emotion_df[emotion_df['type'] == 'positive']['count'].mean()
-            avg_negative = emotion_df[emotion_df['type'] == 'negative']['count'].mean()
-            ratio = avg_positive / avg_negative if avg_negative > 0 else 0
-            st.info(f"**⚖️ 正负比**: {ratio:.2f}:1")
-            st.caption(f"正面情绪是负面情绪的{ratio:.1f}倍")
+            with col3:
+                avg_positive = emotion_df[emotion_df['type'] == 'positive']['count'].mean()
+                avg_negative = emotion_df[emotion_df['type'] == 'negative']['count'].mean()
+                ratio = avg_positive / avg_negative if avg_negative > 0 else 0
+                st.info(f"**⚖️ 正负比**: {ratio:.2f}:1")
+                st.caption(f"正面情绪是负面情绪的{ratio:.1f}倍")
         
-        st.divider()
+            st.divider()
         
-        # 策略建议
-        st.markdown("#### 💡 基于情绪的策略建议")
+            # 策略建议
+            st.markdown("#### 💡 基于情绪的策略建议")
         
-        col1, col2 = st.columns(2)
+            col1, col2 = st.columns(2)
         
-        with col1:
-            st.markdown("""
-            <div class="insight-box">
-            <strong>✅ 强化正面情绪</strong><br>
-            • 针对"兴奋"、"好奇"等情绪，增加产品展示的视觉冲击力<br>
-            • 利用"满意"、"信任"情绪，强化客户推荐和口碑营销<br>
-            • 抓住"惊喜"情绪，推出限量版或特别款产品
-            </div>
-            """, unsafe_allow_html=True)
+            with col1:
+                st.markdown("""
+                <div class="insight-box">
+                <strong>✅ 强化正面情绪</strong><br>
+                • 针对"兴奋"、"好奇"等情绪，增加产品展示的视觉冲击力<br>
+                • 利用"满意"、"信任"情绪，强化客户推荐和口碑营销<br>
+                • 抓住"惊喜"情绪，推出限量版或特别款产品
+                </div>
+                """, unsafe_allow_html=True)
         
-        with col2:
-            st.markdown("""
-            <div class="insight-box">
-            <strong>⚠️ 应对负面情绪</strong><br>
-            • 针对"担忧"、"困惑"情绪，提供更详细的产品说明和FAQ<br>
-            • 解决"失望"情绪，优化产品质量和售后服务<br>
-            • 消除"怀疑"情绪，增加用户评价和实物展示
-            </div>
-            """, unsafe_allow_html=True)
+            with col2:
+                st.markdown("""
+                <div class="insight-box">
+                <strong>⚠️ 应对负面情绪</strong><br>
+                • 针对"担忧"、"困惑"情绪，提供更详细的产品说明和FAQ<br>
+                • 解决"失望"情绪，优化产品质量和售后服务<br>
+                • 消除"怀疑"情绪，增加用户评价和实物展示
+                </div>
+                """, unsafe_allow_html=True)
     
     # ===== 新增 Tab 6: 竞争分析 =====
 
     # Tab 7: 产品分析
     with tab7:
-        st.subheader("推荐产品详细分析")
-        
-        st.markdown("""
-        <div class="insight-box">
-        <strong>💡 分析方法</strong><br>
-        基于社交媒体情绪数据和电商平台销售数据，我们识别出5个高潜力产品机会。
-        每个产品都包含详细的指标分析、市场机会评估和执行策略。
-        </div>
-        """, unsafe_allow_html=True)
-        
-        # 生成5个推荐产品数据
-        products = [
-            {
-                'rank': 1,
-                'name': '迷你桌面收纳盒',
-                'category': '办公用品',
-                'description': '3D打印定制桌面收纳解决方案，可个性化设计',
-                'difficulty': '简单',
-                'emotion_score': 45.2,
-                'mentions': 1580,
-                'growth_rate': 38.5,
-                'estimated_revenue': 12500,
-                'week_data': [1200, 1350, 1480, 1580],
-                'platform_scores': {'TikTok': 88, 'Instagram': 75, 'YouTube': 68, 'Pinterest': 72, 'Reddit': 55},
-                'emotion_dist': {'兴奋': 32, '好奇': 28, '满意': 18, '担忧': 12, '期待': 10},
-                'keywords': ['桌面整理', '办公室', '收纳', '简约', '定制'],
-                'recommendation': '社交媒体表现出色，情绪分数达45.2分，增长率38.5%。办公场景需求旺盛。',
-                'opportunity': '目标市场规模大，办公用品类别需求旺盛，适合快速进入。远程办公趋势增加了家庭办公收纳需求。',
-                'risk': '需注意简单难度的生产挑战，建议先小批量测试市场反应。竞争较激烈，需差异化设计。',
-                'strategy': '1. 前2周完成设计和打样\n2. 第3-4周小批量生产测试\n3. 第5-8周正式上线销售\n4. 强调定制化和设计感'
-            },
-            {
-                'rank': 2,
-                'name': '创意手机支架',
-                'category': '数码配件',
-                'description': '多角度可调节手机支架，支持个性化图案定制',
-                'difficulty': '简单',
-                'emotion_score': 43.8,
-                'mentions': 1420,
-                'growth_rate': 32.1,
-                'estimated_revenue': 9800,
-                'week_data': [1100, 1220, 1350, 1420],
-                'platform_scores': {'TikTok': 92, 'Instagram': 82, 'YouTube': 65, 'Pinterest': 58, 'Reddit': 48},
-                'emotion_dist': {'兴奋': 35, '好奇': 25, '满意': 15, '担忧': 15, '期待': 10},
-                'keywords': ['手机支架', '多角度', '便携', '定制', '创意'],
-                'recommendation': 'TikTok平台表现极佳，年轻用户喜爱。情绪分数43.8分，增长率32.1%。',
-                'opportunity': '数码配件市场持续增长，手机普及率高。年轻人群对个性化产品接受度高。',
-                'risk': '市场产品众多，需要独特卖点。材质和稳定性要求高。',
-                'strategy': '1. 设计独特的多角度调节机制\n2. 提供丰富的定制图案选项\n3. 在TikTok上做重点推广\n4. 强调便携性和实用性'
-            },
-            {
-                'rank': 3,
-                'name': '装饰性墙挂',
-                'category': '家居装饰',
-                'description': '现代简约风格墙面装饰，可定制尺寸和颜色',
-                'difficulty': '中等',
-                'emotion_score': 42.5,
-                'mentions': 1180,
-                'growth_rate': 28.3,
-                'estimated_revenue': 8500,
-                'week_data': [950, 1020, 1100, 1180],
-                'platform_scores': {'TikTok': 78, 'Instagram': 85, 'YouTube': 72, 'Pinterest': 88, 'Reddit': 52},
-                'emotion_dist': {'兴奋': 28, '好奇': 22, '满意': 20, '担忧': 18, '期待': 12},
-                'keywords': ['墙饰', '家居', '装饰', '简约', '艺术'],
-                'recommendation': 'Instagram和Pinterest表现优秀，家居装饰类目需求稳定。',
-                'opportunity': '家居装饰市场持续增长，个性化需求强烈。社交媒体分享带动销售。',
-                'risk': '中等难度需要较好的设计能力。运输过程中易损坏。',
-                'strategy': '1. 与室内设计师合作开发\n2. 提供多种风格选择\n3. 在Instagram/Pinterest重点营销\n4. 优化包装防止损坏'
-            },
-            {
-                'rank': 4,
-                'name': '宠物玩具',
-                'category': '宠物用品',
-                'description': '安全无毒材料，可根据宠物大小定制',
-                'difficulty': '中等',
-                'emotion_score': 44.1,
-                'mentions': 980,
-                'growth_rate': 25.7,
-                'estimated_revenue': 7200,
-                'week_data': [800, 850, 920, 980],
-                'platform_scores': {'TikTok': 85, 'Instagram': 78, 'YouTube': 70, 'Pinterest': 65, 'Reddit': 72},
-                'emotion_dist': {'兴奋': 30, '好奇': 20, '满意': 22, '担忧': 16, '期待': 12},
-                'keywords': ['宠物', '玩具', '安全', '定制', '耐用'],
-                'recommendation': '宠物经济持续增长，情绪分数44.1分。宠物主愿意为宠物消费。',
-                'opportunity': '宠物市场庞大，宠物主消费能力强。定制化产品受欢迎。',
-                'risk': '需要确保材料安全无毒。宠物破坏力强，耐用性要求高。',
-                'strategy': '1. 使用宠物安全材料\n2. 设计多种尺寸适应不同宠物\n3. 在宠物社区营销\n4. 强调耐用性和安全性'
-            },
-            {
-                'rank': 5,
-                'name': '键帽定制套装',
-                'category': '数码配件',
-                'description': '机械键盘个性化键帽，支持图案和颜色定制',
-                'difficulty': '复杂',
-                'emotion_score': 46.3,
-                'mentions': 850,
-                'growth_rate': 42.8,
-                'estimated_revenue': 11200,
-                'week_data': [620, 700, 780, 850],
-                'platform_scores': {'TikTok': 75, 'Instagram': 70, 'YouTube': 82, 'Pinterest': 62, 'Reddit': 88},
-                'emotion_dist': {'兴奋': 38, '好奇': 26, '满意': 16, '担忧': 10, '期待': 10},
-                'keywords': ['键帽', '机械键盘', '定制', '个性', '收藏'],
-                'recommendation': '机械键盘爱好者市场活跃，情绪分数46.3分，增长率42.8%。',
-                'opportunity': '机械键盘文化流行，玩家愿意为个性化付费。利润空间大。',
-                'risk': '复杂难度需要精密加工。需要了解键盘标准。',
-                'strategy': '1. 与键盘社区合作\n2. 提供限量款和定制服务\n3. 在Reddit和YouTube重点推广\n4. 建立品牌社区'
-            }
-        ]
+        if view_active("产品分析"):
+            st.subheader("推荐产品详细分析")
         
-        # 产品选择器
-        selected_product_name = st.selectbox(
-            "选择要查看的产品",
-            options=[p['name'] for p in products],
-            index=0
-        )
+            st.markdown("""
+            <div class="insight-box">
+            <strong>💡 分析方法</strong><br>
+            基于社交媒体情绪数据和电商平台销售数据，我们识别出5个高潜力产品机会。
+            每个产品都包含详细的指标分析、市场机会评估和执行策略。
+            </div>
+            """, unsafe_allow_html=True)
         
-        # 获取选中的产品
-        product = next(p for p in products if p['name'] == selected_product_name)
+            # 生成5个推荐产品数据
+            products = [
+                {
+                    'rank': 1,
+                    'name': '迷你桌面收纳盒',
+                    'category': '办公用品',
+                    'description': '3D打印定制桌面收纳解决方案，可个性化设计',
+                    'difficulty': '简单',
+                    'emotion_score': 45.2,
+                    'mentions': 1580,
+                    'growth_rate': 38.5,
+                    'estimated_revenue': 12500,
+                    'week_data': [1200, 1350, 1480, 1580],
+                    'platform_scores': {'TikTok': 88, 'Instagram': 75, 'YouTube': 68, 'Pinterest': 72, 'Reddit': 55},
+                    'emotion_dist': {'兴奋': 32, '好奇': 28, '满意': 18, '担忧': 12, '期待': 10},
+                    'keywords': ['桌面整理', '办公室', '收纳', '简约', '定制'],
+                    'recommendation': '社交媒体表现出色，情绪分数达45.2分，增长率38.5%。办公场景需求旺盛。',
+                    'opportunity': '目标市场规模大，办公用品类别需求旺盛，适合快速进入。远程办公趋势增加了家庭办公收纳需求。',
+                    'risk': '需注意简单难度的生产挑战，建议先小批量测试市场反应。竞争较激烈，需差异化设计。',
+                    'strategy': '1. 前2周完成设计和打样\n2. 第3-4周小批量生产测试\n3. 第5-8周正式上线销售\n4. 强调定制化和设计感'
+                },
+                {
+                    'rank': 2,
+                    'name': '创意手机支架',
+                    'category': '数码配件',
+                    'description': '多角度可调节手机支架，支持个性化图案定制',
+                    'difficulty': '简单',
+                    'emotion_score': 43.8,
+                    'mentions': 1420,
+                    'growth_rate': 32.1,
+                    'estimated_revenue': 9800,
+                    'week_data': [1100, 1220, 1350, 1420],
+                    'platform_scores': {'TikTok': 92, 'Instagram': 82, 'YouTube': 65, 'Pinterest': 58, 'Reddit': 48},
+                    'emotion_dist': {'兴奋': 35, '好奇': 25, '满意': 15, '担忧': 15, '期待': 10},
+                    'keywords': ['手机支架', '多角度', '便携', '定制', '创意'],
+                    'recommendation': 'TikTok平台表现极佳，年轻用户喜爱。情绪分数43.8分，增长率32.1%。',
+                    'opportunity': '数码配件市场持续增长，手机普及率高。年轻人群对个性化产品接受度高。',
+                    'risk': '市场产品众多，需要独特卖点。材质和稳定性要求高。',
+                    'strategy': '1. 设计独特的多角度调节机制\n2. 提供丰富的定制图案选项\n3. 在TikTok上做重点推广\n4. 强调便携性和实用性'
+                },
+                {
+                    'rank': 3,
+                    'name': '装饰性墙挂',
+                    'category': '家居装饰',
+                    'description': '现代简约风格墙面装饰，可定制尺寸和颜色',
+                    'difficulty': '中等',
+                    'emotion_score': 42.5,
+                    'mentions': 1180,
+                    'growth_rate': 28.3,
+                    'estimated_revenue': 8500,
+                    'week_data': [950, 1020, 1100, 1180],
+                    'platform_scores': {'TikTok': 78, 'Instagram': 85, 'YouTube': 72, 'Pinterest': 88, 'Reddit': 52},
+                    'emotion_dist': {'兴奋': 28, '好奇': 22, '满意': 20, '担忧': 18, '期待': 12},
+                    'keywords': ['墙饰', '家居', '装饰', '简约', '艺术'],
+                    'recommendation': 'Instagram和Pinterest表现优秀，家居装饰类目需求稳定。',
+                    'opportunity': '家居装饰市场持续增长，个性化需求强烈。社交媒体分享带动销售。',
+                    'risk': '中等难度需要较好的设计能力。运输过程中易损坏。',
+                    'strategy': '1. 与室内设计师合作开发\n2. 提供多种风格选择\n3. 在Instagram/Pinterest重点营销\n4. 优化包装防止损坏'
+                },
+                {
+                    'rank': 4,
+                    'name': '宠物玩具',
+                    'category': '宠物用品',
+                    'description': '安全无毒材料，可根据宠物大小定制',
+                    'difficulty': '中等',
+                    'emotion_score': 44.1,
+                    'mentions': 980,
+                    'growth_rate': 25.7,
+                    'estimated_revenue': 7200,
+                    'week_data': [800, 850, 920, 980],
+                    'platform_scores': {'TikTok': 85, 'Instagram': 78, 'YouTube': 70, 'Pinterest': 65, 'Reddit': 72},
+                    'emotion_dist': {'兴奋': 30, '好奇': 20, '满意': 22, '担忧': 16, '期待': 12},
+                    'keywords': ['宠物', '玩具', '安全', '定制', '耐用'],
+                    'recommendation': '宠物经济持续增长，情绪分数44.1分。宠物主愿意为宠物消费。',
+                    'opportunity': '宠物市场庞大，宠物主消费能力强。定制化产品受欢迎。',
+                    'risk': '需要确保材料安全无毒。宠物破坏力强，耐用性要求高。',
+                    'strategy': '1. 使用宠物安全材料\n2. 设计多种尺寸适应不同宠物\n3. 在宠物社区营销\n4. 强调耐用性和安全性'
+                },
+                {
+                    'rank': 5,
+                    'name': '键帽定制套装',
+                    'category': '数码配件',
+                    'description': '机械键盘个性化键帽，支持图案和颜色定制',
+                    'difficulty': '复杂',
+                    'emotion_score': 46.3,
+                    'mentions': 850,
+                    'growth_rate': 42.8,
+                    'estimated_revenue': 11200,
+                    'week_data': [620, 700, 780, 850],
+                    'platform_scores': {'TikTok': 75, 'Instagram': 70, 'YouTube': 82, 'Pinterest': 62, 'Reddit': 88},
+                    'emotion_dist': {'兴奋': 38, '好奇': 26, '满意': 16, '担忧': 10, '期待': 10},
+                    'keywords': ['键帽', '机械键盘', '定制', '个性', '收藏'],
+                    'recommendation': '机械键盘爱好者市场活跃，情绪分数46.3分，增长率42.8%。',
+                    'opportunity': '机械键盘文化流行，玩家愿意为个性化付费。利润空间大。',
+                    'risk': '复杂难度需要精密加工。需要了解键盘标准。',
+                    'strategy': '1. 与键盘社区合作\n2. 提供限量款和定制服务\n3. 在Reddit和YouTube重点推广\n4. 建立品牌社区'
+                }
+            ]
         
-        st.divider()
+            # 产品选择器
+            selected_product_name = st.selectbox(
+                "选择要查看的产品",
+                options=[p['name'] for p in products],
+                index=0
+            )
         
-        # 产品概览
-        st.markdown(f"### {product['rank']}. {product['name']}")
-        st.markdown(f"**类别**: {product['category']} | **难度**: {product['difficulty']}")
-        st.markdown(f"*{product['description']}*")
+            # 获取选中的产品
+            product = next(p for p in products if p['name'] == selected_product_name)
         
-        st.divider()
+            st.divider()
         
-        # 核心指标
-        st.markdown("#### 核心指标")
-        col1, col2, col3, col4 = st.columns(4)
+            # 产品概览
+            st.markdown(f"### {product['rank']}. {product['name']}")
+            st.markdown(f"**类别**: {product['category']} | **难度**: {product['difficulty']}")
+            st.markdown(f"*{product['description']}*")
         
-        with col1:
-            st.metric("情绪分数", f"{product['emotion_score']:.1f}", "+高")
-        with col2:
-            st.metric("提及次数", f"{product['mentions']:,}", f"+{product['growth_rate']:.1f}%")
-        with col3:
-            st.metric("增长率", f"{product['growth_rate']:.1f}%", "+上升")
-        with col4:
-            st.metric("预估营收", f"${product['estimated_revenue']:,}", "+潜力")
+            st.divider()
         
-        st.divider()
+            # 核心指标
+            st.markdown("#### 核心指标")
+            col1, col2, col3, col4 = st.columns(4)
         
-        # 4周趋势图和平台表现雷达图
-        col1, col2 = st.columns(2)
+            with col1:
+                st.metric("情绪分数", f"{product['emotion_score']:.1f}", "+高")
+            with col2:
+                st.metric("提及次数", f"{product['mentions']:,}", f"+{product['growth_rate']:.1f}%")
+            with col3:
+                st.metric("增长率", f"{product['growth_rate']:.1f}%", "+上升")
+            with col4:
+                st.metric("预估营收", f"${product['estimated_revenue']:,}", "+潜力")
         
-        with col1:
-            st.markdown("#### 4周趋势")
-            trend_df = pd.DataFrame({
-                '周次': [f'第{i+1}周' for i in range(4)],
-                '提及次数': product['week_data']
-            })
-            fig_trend = px.line(
-                trend_df,
-                x='周次',
-                y='提及次数',
-                title=f'{product["name"]}的4周趋势',
-                markers=True,
-                color_discrete_sequence=['#2196F3']
-            )
-            fig_trend.update_layout(hovermode='x unified')
-            st.plotly_chart(fig_trend, use_container_width=True, key='fig_trend_3')
-        
-        with col2:
-            st.markdown("#### 平台表现")
-            platform_df = pd.DataFrame([
-                {'平台': k, '分数': v} for k, v in product['platform_scores'].items()
-            ])
-            fig_radar = go.Figure(data=go.Scatterpolar(
-                r=list(product['platform_scores'].values()),
-                theta=list(product['platform_scores'].keys()),
-                fill='toself',
-                line_color='#2196F3'
-            ))
-            fig_radar.update_layout(
-                polar=dict(radialaxis=dict(visible=True, range=[0, 100])),
-                showlegend=False,
-                title=f'{product["name"]}在各平台的表现'
-            )
-            st.plotly_chart(fig_radar, use_container_width=True, key='fig_radar_1')
+            st.divider()
         
-        st.divider()
+            # 4周趋势图和平台表现雷达图
+            col1, col2 = st.columns(2)
         
-        # 情绪分布和关键词
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.markdown("#### 情绪分布")
-            emotion_df = pd.DataFrame([
-                {'情绪': k, '比例': v} for k, v in product['emotion_dist'].items()
-            ])
-            fig_emotion = px.bar(
-                emotion_df,
-                x='情绪',
-                y='比例',
-                title=f'{product["name"]}的情绪分布',
-                color='比例',
-                color_continuous_scale='Blues'
-            )
-            st.plotly_chart(fig_emotion, use_container_width=True, key='fig_emotion_1')
+            with col1:
+                st.markdown("#### 4周趋势")
+                trend_df = pd.DataFrame({
+                    '周次': [f'第{i+1}周' for i in range(4)],
+                    '提及次数': product['week_data']
+                })
+                def build_fig_trend_3():
+                    fig_trend = px.line(
+                        trend_df,
+                        x='周次',
+                        y='提及次数',
+                        title=f'{product["name"]}的4周趋势',
+                        markers=True,
+                        color_discrete_sequence=['#2196F3']
+                    )
+                    fig_trend.update_layout(hovermode='x unified')
+                    return fig_trend
+                show_chart(('fig_trend_3', product['name']), build_fig_trend_3)
         
-        with col2:
-            st.markdown("#### 🏷️ 关键词标签")
-            st.write(" ")
-            st.write(" ")
-            for keyword in product['keywords']:
-                st.markdown(f"<span style='background-color: #E3F2FD; padding: 0.3rem 0.8rem; border-radius: 15px; margin: 0.2rem; display: inline-block;'>{keyword}</span>", unsafe_allow_html=True)
+            with col2:
+                st.markdown("#### 平台表现")
+                platform_df = pd.DataFrame([
+                    {'平台': k, '分数': v} for k, v in product['platform_scores'].items()
+                ])
+                def build_fig_radar_1():
+                    fig_radar = go.Figure(data=go.Scatterpolar(
+                        r=list(product['platform_scores'].values()),
+                        theta=list(product['platform_scores'].keys()),
+                        fill='toself',
+                        line_color='#2196F3'
+                    ))
+                    fig_radar.update_layout(
+                        polar=dict(radialaxis=dict(visible=True, range=[0, 100])),
+                        showlegend=False,
+                        title=f'{product["name"]}在各平台的表现'
+                    )
+                    return fig_radar
+                show_chart(('fig_radar_1', product['name']), build_fig_radar_1)
         
-        st.divider()
+            st.divider()
         
-        # 详细分析
-        st.markdown("#### 📝 详细分析")
+            # 情绪分布和关键词
+            col1, col2 = st.columns(2)
         
-        col1, col2 = st.columns(2)
+            with col1:
+                st.markdown("#### 情绪分布")
+                emotion_df = pd.DataFrame([
+                    {'情绪': k, '比例': v} for k, v in product['emotion_dist'].items()
+                ])
+                def build_fig_emotion_1():
+                    fig_emotion = px.bar(
+                        emotion_df,
+                        x='情绪',
+                        y='比例',
+                        title=f'{product["name"]}的情绪分布',
+                        color='比例',
+                        color_continuous_scale='Blues'
+                    )
+                    return fig_emotion
+                show_chart(('fig_emotion_1', product['name']), build_fig_emotion_1)
         
-        with col1:
-            st.markdown("""
-            <div class="insight-box">
-            <strong>✅ 推荐理由</strong><br>
-            """ + product['recommendation'] + """
-            </div>
-            """, unsafe_allow_html=True)
+            with col2:
+                st.markdown("#### 🏷️ 关键词标签")
+                st.write(" ")
+                st.write(" ")
+                for keyword in product['keywords']:
+                    st.markdown(f"<span style='background-color: #E3F2FD; padding: 0.3rem 0.8rem; border-radius: 15px; margin: 0.2rem; display: inline-block;'>{keyword}</span>", unsafe_allow_html=True)
+        
+            st.divider()
+        
+            # 详细分析
+            st.markdown("#### 📝 详细分析")
+        
+            col1, col2 = st.columns(2)
+        
+            with col1:
+                st.markdown("""
+                <div class="insight-box">
+                <strong>✅ 推荐理由</strong><br>
+                """ + product['recommendation'] + """
+                </div>
+                """, unsafe_allow_html=True)
             
-            st.markdown("""
-            <div class="insight-box">
-            <strong>市场机会</strong><br>
-            """ + product['opportunity'] + """
-            </div>
-            """, unsafe_allow_html=True)
+                st.markdown("""
+                <div class="insight-box">
+                <strong>市场机会</strong><br>
+                """ + product['opportunity'] + """
+                </div>
+                """, unsafe_allow_html=True)
         
-        with col2:
-            st.markdown("""
-            <div class="insight-box">
-            <strong>⚠️ 风险提示</strong><br>
-            """ + product['risk'] + """
-            </div>
-            """, unsafe_allow_html=True)
+            with col2:
+                st.markdown("""
+                <div class="insight-box">
+                <strong>⚠️ 风险提示</strong><br>
+                """ + product['risk'] + """
+                </div>
+                """, unsafe_allow_html=True)
             
-            st.markdown("""
-            <div class="insight-box">
-            <strong>执行策略</strong><br>
-            """ + product['strategy'].replace('\n', '<br>') + """
-            </div>
-            """, unsafe_allow_html=True)
+                st.markdown("""
+                <div class="insight-box">
+                <strong>执行策略</strong><br>
+                """ + product['strategy'].replace('\n', '<br>') + """
+                </div>
+                """, unsafe_allow_html=True)
     
     # ===== 新增 Tab 7: 竞争分析 =====
 
     # Tab 8: 竞争分析
     with tab8:
-        st.subheader("竞争对手分析")
-        
-        st.markdown("""
-        <div class="insight-box">
-        <strong>💡 市场格局</strong><br>
-        当前3D打印定制市场竞争激烈，主要竞争对手各有特色。
-        了解竞争对手的优劣势，有助于制定差异化策略。
-        </div>
-        """, unsafe_allow_html=True)
-        
-        # 生成竞争对手数据
-        competitor_df = generate_competitor_data()
-        
-        # 市场份额
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.markdown("#### 市场份额分布")
-            fig_market_share = px.pie(
-                competitor_df,
-                values='market_share',
-                names='name',
-                title='各竞争对手市场份额',
-                color_discrete_sequence=px.colors.sequential.Blues_r
-            )
-            st.plotly_chart(fig_market_share, use_container_width=True, key='fig_market_share_1')
-        
-        with col2:
-            st.markdown("#### 价格定位对比")
-            fig_price = px.bar(
-                competitor_df.sort_values('avg_price', ascending=False),
-                x='name',
-                y='avg_price',
-                title='各竞争对手平均价格',
-                color='avg_price',
-                color_continuous_scale='Blues'
-            )
-            fig_price.update_layout(
-                xaxis_title='竞争对手',
-                yaxis_title='平均价格 ($)',
-                xaxis_tickangle=-45
-            )
-            st.plotly_chart(fig_price, use_container_width=True, key='fig_price_1')
-        
-        st.divider()
+        if view_active("竞争分析"):
+            st.subheader("竞争对手分析")
         
-        # === 新增：四象限矩阵分析 ===
-        if MATRIX_FIX_AVAILABLE:
-            st.markdown("#### 市场定位矩阵（四象限分析）")
             st.markdown("""
             <div class="insight-box">
-            <strong>💡 图表说明</strong><br>
-            • <strong>右上象限（领导者）</strong>: 高价格 + 高市场份额<br>
-            • <strong>左上象限（挑战者）</strong>: 低价格 + 高市场份额<br>
-            • <strong>左下象限（跟随者）</strong>: 低价格 + 低市场份额<br>
-            • <strong>右下象限（利基市场）</strong>: 高价格 + 低市场份额
+            <strong>💡 市场格局</strong><br>
+            当前3D打印定制市场竞争激烈，主要竞争对手各有特色。
+            了解竞争对手的优劣势，有助于制定差异化策略。
             </div>
             """, unsafe_allow_html=True)
+        
+            # 生成竞争对手数据
+            competitor_df = generate_competitor_data()
+        
+            # 市场份额
+            col1, col2 = st.columns(2)
+        
+            with col1:
+                st.markdown("#### 市场份额分布")
+                def build_fig_market_share_1():
+                    fig_market_share = px.pie(
+                        competitor_df,
+                        values='market_share',
+                        names='name',
+                        title='各竞争对手市场份额',
+                        color_discrete_sequence=px.colors.sequential.Blues_r
+                    )
+                    return fig_market_share
+                show_chart('fig_market_share_1', build_fig_market_share_1)
+        
+            with col2:
+                st.markdown("#### 价格定位对比")
+                def build_fig_price_1():
+                    fig_price = px.bar(
+                        competitor_df.sort_values('avg_price', ascending=False),
+                        x='name',
+                        y='avg_price',
+                        title='各竞争对手平均价格',
+                        color='avg_price',
+                        color_continuous_scale='Blues'
+                    )
+                    fig_price.update_layout(
+                        xaxis_title='竞争对手',
+                        yaxis_title='平均价格 ($)',
+                        xaxis_tickangle=-45
+                    )
+                    return fig_price
+                show_chart('fig_price_1', build_fig_price_1)
+        
+            st.divider()
+        
+            # === 新增：四象限矩阵分析 ===
+            if MATRIX_FIX_AVAILABLE:
+                st.markdown("#### 市场定位矩阵（四象限分析）")
+                st.markdown("""
+                <div class="insight-box">
+                <strong>💡 图表说明</strong><br>
+                • <strong>右上象限（领导者）</strong>: 高价格 + 高市场份额<br>
+                • <strong>左上象限（挑战者）</strong>: 低价格 + 高市场份额<br>
+                • <strong>左下象限（跟随者）</strong>: 低价格 + 低市场份额<br>
+                • <strong>右下象限（利基市场）</strong>: 高价格 + 低市场份额
+                </div>
+                """, unsafe_allow_html=True)
             
-            fig_matrix = create_quadrant_matrix(
-                competitor_df,
-                x_col='avg_price',
-                y_col='market_share',
-                name_col='name',
-                title='竞争对手市场定位矩阵'
-            )
-            st.plotly_chart(fig_matrix, use_container_width=True, key='competitor_matrix_pro')
+                def build_competitor_matrix_pro():
+                    fig_matrix = create_quadrant_matrix(
+                        competitor_df,
+                        x_col='avg_price',
+                        y_col='market_share',
+                        name_col='name',
+                        title='竞争对手市场定位矩阵'
+                    )
+                    return fig_matrix
+                show_chart('competitor_matrix_pro', build_competitor_matrix_pro)
             
-            st.divider()
+                st.divider()
         
-        # 竞争对手详细分析
-        st.markdown("#### 竞争对手详细分析")        
-        for _, competitor in competitor_df.iterrows():
-            with st.expander(f"**{competitor['name']}** - 市场份额: {competitor['market_share']:.1f}%"):
-                col1, col2 = st.columns(2)
+            # 竞争对手详细分析
+            st.markdown("#### 竞争对手详细分析")        
+            for _, competitor in competitor_df.iterrows():
+                with st.expander(f"**{competitor['name']}** - 市场份额: {competitor['market_share']:.1f}%"):
+                    col1, col2 = st.columns(2)
                 
-                with col1:
-                    st.markdown(f"""
-                    <div class="competitor-card">
-                    <strong>基本信息</strong><br>
-                    • 市场份额: {competitor['market_share']:.1f}%<br>
-                    • 平均价格: ${competitor['avg_price']:.2f}<br>
-                    • 竞争策略: {competitor['strategy']}
-                    </div>
-                    """, unsafe_allow_html=True)
+                    with col1:
+                        st.markdown(f"""
+                        <div class="competitor-card">
+                        <strong>基本信息</strong><br>
+                        • 市场份额: {competitor['market_share']:.1f}%<br>
+                        • 平均价格: ${competitor['avg_price']:.2f}<br>
+                        • 竞争策略: {competitor['strategy']}
+                        </div>
+                        """, unsafe_allow_html=True)
                     
-                    st.success(f"**✅ 优势**: {competitor['strength']}")
+                        st.success(f"**✅ 优势**: {competitor['strength']}")
                 
-                with col2:
-                    st.error(f"**⚠️ 劣势**: {competitor['weakness']}")
+                    with col2:
+                        st.error(f"**⚠️ 劣势**: {competitor['weakness']}")
                     
-                    # 差异化建议
-                    st.info(f"""
-                    **💡 差异化机会**:
-                    针对{competitor['name']}的劣势，我们可以在{competitor['weakness']}方面建立优势。
-                    """)
+                        # 差异化建议
+                        st.info(f"""
+                        **💡 差异化机会**:
+                        针对{competitor['name']}的劣势，我们可以在{competitor['weakness']}方面建立优势。
+                        """)
         
-        st.divider()
+            st.divider()
         
-        # 竞争策略矩阵
-        st.markdown("#### 市场定位矩阵")
-        
-        fig_matrix = px.scatter(
-            competitor_df,
-            x='avg_price',
-            y='market_share',
-            size='market_share',
-            color='name',
-            title='价格 vs 市场份额定位矩阵',
-            hover_data=['strategy']
-        )
-        fig_matrix.update_layout(
-            xaxis_title='平均价格 ($)',
-            yaxis_title='市场份额 (%)'
-        )
-        st.plotly_chart(fig_matrix, use_container_width=True, key='fig_matrix_1')
-        
-        st.markdown("""
-        <div class="insight-box">
-        <strong>我们的定位建议</strong><br>
-        • <strong>目标市场</strong>: 中高端市场（$35-45价格区间）<br>
-        • <strong>差异化策略</strong>: 快速交付 + 高品质 + 合理价格<br>
-        • <strong>突破口</strong>: 填补"高品质+快速交付"的市场空白<br>
-        • <strong>目标份额</strong>: 第一年争取5-8%市场份额
-        </div>
-        """, unsafe_allow_html=True)
+            # 竞争策略矩阵
+            st.markdown("#### 市场定位矩阵")
+        
+            def build_fig_matrix_1():
+                fig_matrix = px.scatter(
+                    competitor_df,
+                    x='avg_price',
+                    y='market_share',
+                    size='market_share',
+                    color='name',
+                    title='价格 vs 市场份额定位矩阵',
+                    hover_data=['strategy']
+                )
+                fig_matrix.update_layout(
+                    xaxis_title='平均价格 ($)',
+                    yaxis_title='市场份额 (%)'
+                )
+                return fig_matrix
+            show_chart('fig_matrix_1', build_fig_matrix_1)
+        
+            st.markdown("""
+            <div class="insight-box">
+            <strong>我们的定位建议</strong><br>
+            • <strong>目标市场</strong>: 中高端市场（$35-45价格区间）<br>
+            • <strong>差异化策略</strong>: 快速交付 + 高品质 + 合理价格<br>
+            • <strong>突破口</strong>: 填补"高品质+快速交付"的市场空白<br>
+            • <strong>目标份额</strong>: 第一年争取5-8%市场份额
+            </div>
+            """, unsafe_allow_html=True)
     
     # ===== 新增 Tab 6: 产品分析 =====
 
     # Tab 9: 行动计划
     with tab9:
-        st.subheader("8周行动计划")
-        
-        st.markdown("""
-        <div class="insight-box">
-        <strong>总体目标</strong><br>
-        在8周内完成产品开发、测试和初步市场推广，建立稳定的销售渠道。
-        </div>
-        """, unsafe_allow_html=True)
-        
-        # 时间线
-        st.markdown("#### 📅 执行时间线")
-        
-        timeline_data = [
-            {
-                'week': '第1-2周',
-                'phase': '产品开发',
-                'tasks': '• 完成Top 3产品的3D建模\n• 测试打印材料和工艺\n• 优化产品设计',
-                'budget': '$2,000',
-                'status': '准备中'
-            },
-            {
-                'week': '第3-4周',
-                'phase': '样品制作',
-                'tasks': '• 打印产品样品\n• 质量检测和改进\n• 拍摄产品照片和视频',
-                'budget': '$1,500',
-                'status': '准备中'
-            },
-            {
-                'week': '第5-6周',
-                'phase': '平台上架',
-                'tasks': '• 在Etsy、Amazon开店\n• 上传产品信息\n• 设置定价和物流',
-                'budget': '$1,000',
-                'status': '准备中'
-            },
-            {
-                'week': '第7-8周',
-                'phase': '营销推广',
-                'tasks': '• TikTok内容营销\n• 社交媒体广告\n• 收集用户反馈',
-                'budget': '$3,000',
-                'status': '准备中'
-            }
-        ]
+        if view_active("行动计划"):
+            st.subheader("8周行动计划")
         
-        for item in timeline_data:
-            with st.expander(f"**{item['week']}**: {item['phase']} - 预算: {item['budget']}"):
-                col1, col2 = st.columns([3, 1])
+            st.markdown("""
+            <div class="insight-box">
+            <strong>总体目标</strong><br>
+            在8周内完成产品开发、测试和初步市场推广，建立稳定的销售渠道。
+            </div>
+            """, unsafe_allow_html=True)
+        
+            # 时间线
+            st.markdown("#### 📅 执行时间线")
+        
+            timeline_data = [
+                {
+                    'week': '第1-2周',
+                    'phase': '产品开发',
+                    'tasks': '• 完成Top 3产品的3D建模\n• 测试打印材料和工艺\n• 优化产品设计',
+                    'budget': '$2,000',
+                    'status': '准备中'
+                },
+                {
+                    'week': '第3-4周',
+                    'phase': '样品制作',
+                    'tasks': '• 打印产品样品\n• 质量检测和改进\n• 拍摄产品照片和视频',
+                    'budget': '$1,500',
+                    'status': '准备中'
+                },
+                {
+                    'week': '第5-6周',
+                    'phase': '平台上架',
+                    'tasks': '• 在Etsy、Amazon开店\n• 上传产品信息\n• 设置定价和物流',
+                    'budget': '$1,000',
+                    'status': '准备中'
+                },
+                {
+                    'week': '第7-8周',
+                    'phase': '营销推广',
+                    'tasks': '• TikTok内容营销\n• 社交媒体广告\n• 收集用户反馈',
+                    'budget': '$3,000',
+                    'status': '准备中'
+                }
+            ]
+        
+            for item in timeline_data:
+                with st.expander(f"**{item['week']}**: {item['phase']} - 预算: {item['budget']}"):
+                    col1, col2 = st.columns([3, 1])
                 
-                with col1:
-                    st.markdown(f"**📝 主要任务**\n{item['tasks']}")
+                    with col1:
+                        st.markdown(f"**📝 主要任务**\n{item['tasks']}")
                 
-                with col2:
-                    st.metric("预算", item['budget'])
-                    st.metric("状态", item['status'])
+                    with col2:
+                        st.metric("预算", item['budget'])
+                        st.metric("状态", item['status'])
         
-        st.divider()
+            st.divider()
         
-        # 预算分配
-        st.markdown("#### 预算分配")
+            # 预算分配
+            st.markdown("#### 预算分配")
         
-        col1, col2 = st.columns(2)
+            col1, col2 = st.columns(2)
         
-        with col1:
-            budget_data = pd.DataFrame({
-                '类别': ['产品开发', '样品制作', '平台费用', '营销推广', '运营储备'],
-                '金额': [2000, 1500, 1000, 3000, 1500]
-            })
-            
-            fig_budget = px.pie(
-                budget_data,
-                values='金额',
-                names='类别',
-                title='总预算分配 ($9,000)',
-                color_discrete_sequence=px.colors.sequential.Blues_r
-            )
-            st.plotly_chart(fig_budget, use_container_width=True, key='fig_budget_1')
+            with col1:
+                budget_data = pd.DataFrame({
+                    '类别': ['产品开发', '样品制作', '平台费用', '营销推广', '运营储备'],
+                    '金额': [2000, 1500, 1000, 3000, 1500]
+                })
+            
+                def build_fig_budget_1():
+                    fig_budget = px.pie(
+                        budget_data,
+                        values='金额',
+                        names='类别',
+                        title='总预算分配 ($9,000)',
+                        color_discrete_sequence=px.colors.sequential.Blues_r
+                    )
+                    return fig_budget
+                show_chart('fig_budget_1', build_fig_budget_1)
         
-        with col2:
-            st.markdown("##### 预算明细")
-            for _, row in budget_data.iterrows():
-                percentage = (row['金额'] / budget_data['金额'].sum()) * 100
-                st.metric(
-                    row['类别'],
-                    f"${row['金额']:,}",
-                    delta=f"{percentage:.1f}%"
-                )
+            with col2:
+                st.markdown("##### 预算明细")
+                for _, row in budget_data.iterrows():
+                    percentage = (row['金额'] / budget_data['金额'].sum()) * 100
+                    st.metric(
+                        row['类别'],
+                        f"${row['金额']:,}",
+                        delta=f"{percentage:.1f}%"
+                    )
         
-        st.divider()
+            st.divider()
         
-        # 关键指标
-        st.markdown("#### 关键绩效指标 (KPI)")
+            # 关键指标
+            st.markdown("#### 关键绩效指标 (KPI)")
         
-        col1, col2, col3, col4 = st.columns(4)
+            col1, col2, col3, col4 = st.columns(4)
         
-        with col1:
-            st.metric(
-                "目标销售额",
-                "$15,000",
-                delta="第一季度"
-            )
+            with col1:
+                st.metric(
+                    "目标销售额",
+                    "$15,000",
+                    delta="第一季度"
+                )
         
-        with col2:
-            st.metric(
-                "目标订单数",
-                "300+",
-                delta="前8周"
-            )
+            with col2:
+                st.metric(
+                    "目标订单数",
+                    "300+",
+                    delta="前8周"
+                )
         
-        with col3:
-            st.metric(
-                "客户满意度",
-                "4.5+",
-                delta="5分制"
-            )
+            with col3:
+                st.metric(
+                    "客户满意度",
+                    "4.5+",
+                    delta="5分制"
+                )
         
-        with col4:
-            st.metric(
-                "复购率",
-                "25%+",
-                delta="目标"
-            )
+            with col4:
+                st.metric(
+                    "复购率",
+                    "25%+",
+                    delta="目标"
+                )
         
-        st.divider()
+            st.divider()
         
-        # 风险管理
-        st.markdown("#### ⚠️ 风险管理")
+            # 风险管理
+            st.markdown("#### ⚠️ 风险管理")
         
-        col1, col2 = st.columns(2)
+            col1, col2 = st.columns(2)
         
-        with col1:
-            st.markdown("""
-            <div class="insight-box">
-            <strong>🚨 主要风险</strong><br>
-            1. <strong>供应链风险</strong>: 打印材料短缺或价格波动<br>
-            2. <strong>质量风险</strong>: 产品质量不稳定导致退货<br>
-            3. <strong>竞争风险</strong>: 竞争对手推出类似产品<br>
-            4. <strong>平台风险</strong>: 账号被封或平台政策变化
-            </div>
-            """, unsafe_allow_html=True)
+            with col1:
+                st.markdown("""
+                <div class="insight-box">
+                <strong>🚨 主要风险</strong><br>
+                1. <strong>供应链风险</strong>: 打印材料短缺或价格波动<br>
+                2. <strong>质量风险</strong>: 产品质量不稳定导致退货<br>
+                3. <strong>竞争风险</strong>: 竞争对手推出类似产品<br>
+                4. <strong>平台风险</strong>: 账号被封或平台政策变化
+                </div>
+                """, unsafe_allow_html=True)
         
-        with col2:
+            with col2:
+                st.markdown("""
+                <div class="insight-box">
+                <strong>✅ 应对措施</strong><br>
+                1. 建立多个供应商关系，储备关键材料<br>
+                2. 严格质量控制流程，提供质保服务<br>
+                3. 持续产品创新，建立品牌差异化<br>
+                4. 多平台布局，分散风险
+                </div>
+                """, unsafe_allow_html=True)
+        
+            st.divider()
+        
+            # 下一步行动
             st.markdown("""
             <div class="insight-box">
-            <strong>✅ 应对措施</strong><br>
-            1. 建立多个供应商关系，储备关键材料<br>
-            2. 严格质量控制流程，提供质保服务<br>
-            3. 持续产品创新，建立品牌差异化<br>
-            4. 多平台布局，分散风险
+            <strong>立即行动</strong><br>
+            1. ✅ 确认Top 3产品选择<br>
+            2. ✅ 联系3D打印材料供应商<br>
+            3. ✅ 注册Etsy和Amazon卖家账号<br>
+            4. ✅ 准备产品拍摄设备和场地<br>
+            5. ✅ 制定详细的TikTok内容日历
             </div>
             """, unsafe_allow_html=True)
-        
-        st.divider()
-        
-        # 下一步行动
-        st.markdown("""
-        <div class="insight-box">
-        <strong>立即行动</strong><br>
-        1. ✅ 确认Top 3产品选择<br>
-        2. ✅ 联系3D打印材料供应商<br>
-        3. ✅ 注册Etsy和Amazon卖家账号<br>
-        4. ✅ 准备产品拍摄设备和场地<br>
-        5. ✅ 制定详细的TikTok内容日历
-        </div>
-        """, unsafe_allow_html=True)
     
     # ===== 新增 Tab 9: 执行摘要 =====
 
@@ -0,0 +1,600 @@
+"""
+数据访问层 - 周次数据缓存
+位于 data_manager_gdrive 之前，按 (周次, 文件版本) 缓存已解析的DataFrame
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import data_manager_gdrive as gdrive
+    GDRIVE_AVAILABLE = True
+except ImportError:
+    # 缺少Google Drive依赖时只能读取本地报告（source='local'）
+    gdrive = None
+    GDRIVE_AVAILABLE = False
+
+from week_store import WEEK_FILE_PATTERN, local_week_files, read_week_file
+
+# 缓存条目的默认有效期（秒），过期后仅重新校验文件版本
+DEFAULT_TTL_SECONDS = float(os.getenv('WEEK_CACHE_TTL_SECONDS', '300'))
+
+# 周次缓存的内存上限（MB），超出后按最近最少使用淘汰整周数据；0表示不限制
+DEFAULT_MAX_MB = float(os.getenv('WEEK_CACHE_MAX_MB', '1024'))
+
+# 多周并行加载的线程数上限
+DEFAULT_MAX_WORKERS = int(os.getenv('WEEK_LOADER_MAX_WORKERS', '8'))
+
+REPORTS_DIR = Path('reports')
+
+
+class _WeekEntry:
+    """某一周次某个文件版本已加载的列"""
+
+    __slots__ = ('frame', 'complete', 'absent', 'nbytes')
+
+    def __init__(self, frame: pd.DataFrame, complete: bool, absent: frozenset = frozenset()):
+        self.frame = frame
+        # 占用的内存（含字符串内容）
+        self.nbytes = int(frame.memory_usage(index=True, deep=True).sum())
+        # 是否已加载文件中的全部列
+        self.complete = complete
+        # 请求过但文件中不存在的列
+        self.absent = absent
+
+    def missing(self, columns: Optional[List[str]]) -> Optional[List[str]]:
+        """返回尚未加载的列；需要整表时返回None，全部已加载时返回空列表"""
+        if self.complete:
+            return []
+        if columns is None:
+            return None
+        return [col for col in columns if col not in self.frame.columns and col not in self.absent]
+
+    def project(self, columns: Optional[List[str]]) -> pd.DataFrame:
+        if columns is None:
+            return self.frame
+        return self.frame[[col for col in columns if col in self.frame.columns]]
+
+
+class WeekDataCache:
+    """
+    进程内周次数据缓存
+
+    缓存键为 (周次, 文件版本)。在TTL内直接返回缓存的DataFrame，
+    不访问Drive；TTL过期后只查询文件元数据，版本未变则续期，
+    版本变化才重新下载。
+
+    调用方可以只请求需要的列：缓存只解析并保存被请求过的列，
+    之后请求新的列时只补读缺少的部分。
+
+    占用超过 max_bytes 时按最近最少使用淘汰其他周次（刚写入的周次总是保留）。
+
+    返回的DataFrame在所有会话间共享，调用方不得原地修改。
+    """
+
+    def __init__(self,
+                 ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 info_fn: Callable[[int], Optional[Dict]] = None,
+                 fetch_fn: Callable[[int, Dict, Optional[List[str]]], Optional[pd.DataFrame]] = None,
+                 max_bytes: Optional[int] = int(DEFAULT_MAX_MB * 1024 * 1024),
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            ttl_seconds: 缓存有效期（秒）
+            info_fn: 查询周次文件元数据的函数
+            fetch_fn: 根据元数据下载并解析周次数据的函数，第三个参数为要读取的列
+            max_bytes: 内存上限（字节），为None或0时不限制
+            clock: 时钟函数（便于测试替换）
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes or None
+        self._info_fn = info_fn or gdrive.get_week_file_info
+        self._fetch_fn = fetch_fn or gdrive.fetch_week_data
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._week_locks: Dict[int, threading.Lock] = {}
+        # (周次, 版本) -> 已加载的列，按最近使用排序（最久未用的在前）
+        self._frames: 'OrderedDict[Tuple[int, str], _WeekEntry]' = OrderedDict()
+        self.evictions = 0
+        # 周次 -> (当前版本, 上次校验时间)
+        self._checked: Dict[int, Tuple[str, float]] = {}
+
+    def _week_lock(self, week_number: int) -> threading.Lock:
+        with self._lock:
+            lock = self._week_locks.get(week_number)
+            if lock is None:
+                lock = self._week_locks[week_number] = threading.Lock()
+            return lock
+
+    def _fresh_entry(self, week_number: int, columns: Optional[List[str]],
+                     expected: Optional[str] = None) -> Optional[Tuple[pd.DataFrame, str]]:
+        with self._lock:
+            checked = self._checked.get(week_number)
+            if checked is None:
+                return None
+            revision, checked_at = checked
+            if self._clock() - checked_at >= self.ttl_seconds:
+                return None
+            # 调用方已知更新的版本时不使用TTL内的旧版本
+            if expected is not None and revision != expected:
+                return None
+            entry = self._frames.get((week_number, revision))
+            if entry is None or entry.missing(columns) != []:
+                return None
+            self._frames.move_to_end((week_number, revision))
+            return entry.project(columns), revision
+
+    def _load(self, week_number: int, file_info: Dict, entry: Optional[_WeekEntry],
+              columns: Optional[List[str]]) -> Optional[_WeekEntry]:
+        """补读缺少的列，返回新的缓存条目（旧条目保持不变，已返回的DataFrame不受影响）"""
+        missing = columns if entry is None else entry.missing(columns)
+        if missing == []:
+            return entry
+
+        df = self._fetch_fn(week_number, file_info, missing)
+        if df is None:
+            return None
+        if missing is None:
+            return _WeekEntry(df, complete=True)
+
+        absent = frozenset(col for col in missing if col not in df.columns)
+        if entry is None or len(entry.frame.columns) == 0:
+            return _WeekEntry(df, complete=False, absent=absent)
+        if len(df.columns) > 0:
+            # 同一文件版本的行顺序一致，按位置横向拼接
+            df = pd.concat([entry.frame, df.set_axis(entry.frame.index)], axis=1)
+        else:
+            df = entry.frame
+        return _WeekEntry(df, complete=False, absent=entry.absent | absent)
+
+    def get(self, week_number: int, columns: Optional[Iterable[str]] = None,
+            revision: Optional[str] = None) -> Optional[pd.DataFrame]:
+        """
+        获取指定周次的数据
+
+        Args:
+            week_number: 周次编号
+            columns: 需要的列，为None时返回全部列；文件中不存在的列会被忽略
+            revision: 调用方期望的文件版本（例如刚从目录索引查到的版本），
+                与缓存的版本不同时忽略TTL、重新校验
+
+        Returns:
+            pd.DataFrame: 产品数据，找不到时返回None
+        """
+        return self.get_with_revision(week_number, columns, revision)[0]
+
+    def get_with_revision(self, week_number: int, columns: Optional[Iterable[str]] = None,
+                          revision: Optional[str] = None) -> Tuple[Optional[pd.DataFrame], Optional[str]]:
+        """
+        获取指定周次的数据及其实际的文件版本
+
+        派生数据（索引、图表、导出等）应以这里返回的版本为键，
+        而不是另行从目录索引查询，二者在后台刷新期间可能不一致
+
+        Args:
+            week_number: 周次编号
+            columns: 需要的列，为None时返回全部列
+            revision: 调用方期望的文件版本，见 get()
+
+        Returns:
+            Tuple[pd.DataFrame, str]: (产品数据, 该数据的文件版本)，找不到时为 (None, None)
+        """
+        if columns is not None:
+            columns = list(dict.fromkeys(columns))
+
+        fresh = self._fresh_entry(week_number, columns, revision)
+        if fresh is not None:
+            return fresh
+
+        # 同一周次只允许一个线程回源，其他线程等待后直接命中缓存
+        with self._week_lock(week_number):
+            fresh = self._fresh_entry(week_number, columns, revision)
+            if fresh is not None:
+                return fresh
+
+            file_info = self._info_fn(week_number)
+            current = gdrive.file_revision(file_info)
+            if current is None:
+                return None, None
+
+            key = (week_number, current)
+            with self._lock:
+                entry = self._frames.get(key)
+
+            entry = self._load(week_number, file_info, entry, columns)
+            if entry is None:
+                return None, None
+
+            with self._lock:
+                # 丢弃该周次的旧版本
+                for old_key in [k for k in self._frames if k[0] == week_number and k != key]:
+                    del self._frames[old_key]
+                self._frames[key] = entry
+                self._frames.move_to_end(key)
+                self._checked[week_number] = (current, self._clock())
+                self._evict(keep=key)
+
+            return entry.project(columns), current
+
+    def _evict(self, keep: Tuple[int, str]):
+        """按最近最少使用淘汰周次，直到占用不超过 max_bytes（需持有 _lock）"""
+        if self.max_bytes is None:
+            return
+        total = sum(entry.nbytes for entry in self._frames.values())
+        for key in list(self._frames):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            total -= self._frames.pop(key).nbytes
+            self._checked.pop(key[0], None)
+            self.evictions += 1
+
+    def revision(self, week_number: int) -> Optional[str]:
+        """
+        返回已缓存周次的当前版本标识
+
+        Args:
+            week_number: 周次编号
+
+        Returns:
+            str: 版本标识，未缓存时返回None
+        """
+        with self._lock:
+            checked = self._checked.get(week_number)
+            return checked[0] if checked else None
+
+    def memory_bytes(self, week_number: Optional[int] = None) -> int:
+        """
+        缓存的DataFrame占用的内存
+
+        Args:
+            week_number: 只统计该周次，为None时统计全部周次
+
+        Returns:
+            int: 字节数
+        """
+        with self._lock:
+            return sum(entry.nbytes for (week, _), entry in self._frames.items()
+                       if week_number is None or week == week_number)
+
+    def invalidate(self, week_number: Optional[int] = None):
+        """
+        使缓存失效
+
+        Args:
+            week_number: 要失效的周次，为None时清空全部缓存
+        """
+        with self._lock:
+            if week_number is None:
+                self._frames.clear()
+                self._checked.clear()
+                return
+            for key in [k for k in self._frames if k[0] == week_number]:
+                del self._frames[key]
+            self._checked.pop(week_number, None)
+
+
+_week_cache: Optional[WeekDataCache] = None
+_week_cache_lock = threading.Lock()
+
+
+def get_week_cache() -> WeekDataCache:
+    """
+    获取进程级共享的周次数据缓存（所有Streamlit会话共用）
+
+    Returns:
+        WeekDataCache: 缓存实例
+    """
+    global _week_cache
+    if _week_cache is None:
+        with _week_cache_lock:
+            if _week_cache is None:
+                _week_cache = WeekDataCache()
+    return _week_cache
+
+
+def load_week_data(week_number: int, columns: Optional[Iterable[str]] = None,
+                   revision: Optional[str] = None) -> Optional[pd.DataFrame]:
+    """
+    通过缓存加载指定周次的数据
+
+    Args:
+        week_number: 周次编号
+        columns: 需要的列，为None时加载全部列
+        revision: 期望的文件版本（week_revisions() 的结果），缓存中是其他版本时重新校验
+
+    Returns:
+        pd.DataFrame: 产品数据
+    """
+    return get_week_cache().get(week_number, columns, revision)
+
+
+def load_week_frame(week_number: int, columns: Optional[Iterable[str]] = None,
+                    revision: Optional[str] = None) -> Tuple[Optional[pd.DataFrame], Optional[str]]:
+    """
+    通过缓存加载指定周次的数据，并返回该数据实际的文件版本
+
+    Args:
+        week_number: 周次编号
+        columns: 需要的列，为None时加载全部列
+        revision: 期望的文件版本
+
+    Returns:
+        Tuple[pd.DataFrame, str]: (产品数据, 文件版本)
+    """
+    return get_week_cache().get_with_revision(week_number, columns, revision)
+
+
+def invalidate_week(week_number: Optional[int] = None):
+    """
+    使指定周次（或全部周次）的缓存失效
+
+    Args:
+        week_number: 周次编号，为None时清空全部
+    """
+    get_week_cache().invalidate(week_number)
+
+
+def _on_drive_changes(files: List[Dict]):
+    """Drive变更回调：只失效发生变化的周次"""
+    for file in files:
+        match = WEEK_FILE_PATTERN.match(file.get('name', ''))
+        if match:
+            invalidate_week(int(match.group(1)))
+
+
+def _on_catalog_refresh(files: List[Dict]):
+    """目录索引完整刷新（首次加载、后台刷新）的回调：失效缓存版本与新版本不同的周次"""
+    cache = get_week_cache()
+    for file in files:
+        match = WEEK_FILE_PATTERN.match(file.get('name', ''))
+        if not match:
+            continue
+        week_number = int(match.group(1))
+        revision = None if file.get('removed') else gdrive.file_revision(file)
+        if revision is None or cache.revision(week_number) != revision:
+            invalidate_week(week_number)
+
+
+# 目录索引完整刷新时不会经过变更通知，需要单独失效变化的周次
+if GDRIVE_AVAILABLE:
+    gdrive.get_catalog().add_listener(_on_catalog_refresh)
+
+
+def _require_gdrive():
+    if not GDRIVE_AVAILABLE:
+        raise RuntimeError("Google Drive dependencies are not installed; use source='local'")
+
+
+def check_for_updates(force: bool = False) -> List[int]:
+    """
+    通过Drive变更通知检查是否有新的或更新的周次数据
+
+    默认按 GDRIVE_CHANGES_POLL_SECONDS 限制轮询频率，适合在每次rerun时调用
+
+    Args:
+        force: 忽略轮询间隔立即检查
+
+    Returns:
+        List[int]: 发生变化的周次
+    """
+    watcher = gdrive.get_change_watcher()
+    watcher.add_listener(_on_drive_changes)
+    changed = watcher.poll() if force else watcher.poll_if_due()
+    weeks = {gdrive.extract_week_number_from_filename(f.get('name', '')) for f in changed}
+    return sorted(w for w in weeks if w is not None)
+
+
+def local_file_revision(path) -> Optional[str]:
+    """
+    本地周次文件的版本标识（文件名、修改时间与大小）
+
+    Args:
+        path: 文件路径
+
+    Returns:
+        str: 版本标识，文件不存在时返回None
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return f"{Path(path).name}:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def week_revisions(week_numbers: Optional[Iterable[int]] = None,
+                   source: str = 'drive',
+                   reports_dir: Path = REPORTS_DIR) -> Dict[int, str]:
+    """
+    查询各周次文件的当前版本（只读目录索引或文件属性，不下载数据）
+
+    Args:
+        week_numbers: 要查询的周次，为None时查询全部可用周次
+        source: 'drive' 使用Drive目录索引，'local' 使用本地文件的修改时间与大小
+        reports_dir: 本地报告目录（source='local'时使用）
+
+    Returns:
+        Dict[int, str]: 周次 -> 版本标识（找不到文件的周次不包含在内）
+    """
+    revisions: Dict[int, str] = {}
+    if source == 'drive':
+        _require_gdrive()
+        weeks = list(week_numbers) if week_numbers is not None else gdrive.get_available_weeks()
+        for week_number in weeks:
+            revision = gdrive.file_revision(gdrive.get_week_file_info(week_number))
+            if revision is not None:
+                revisions[week_number] = revision
+    elif source == 'local':
+        files = local_week_files(reports_dir)
+        for week_number in (week_numbers if week_numbers is not None else files):
+            if week_number not in files:
+                continue
+            revision = local_file_revision(files[week_number])
+            if revision is not None:
+                revisions[week_number] = revision
+    else:
+        raise ValueError(f"Unknown source: {source}")
+    return revisions
+
+
+def dataset_revision(week_numbers: Optional[Iterable[int]] = None,
+                     source: str = 'drive',
+                     reports_dir: Path = REPORTS_DIR) -> str:
+    """
+    多个周次组成的数据集的版本标识，任一周次的文件变化都会改变该值
+
+    可作为 st.cache_data 函数的参数，使派生数据（如历史汇总）
+    只在底层周次变化时重新计算，而不必清空全部缓存
+
+    Args:
+        week_numbers: 包含的周次，为None时包含全部可用周次
+        source: 'drive' 或 'local'
+        reports_dir: 本地报告目录（source='local'时使用）
+
+    Returns:
+        str: 版本标识
+    """
+    return revision_digest(week_revisions(week_numbers, source, reports_dir))
+
+
+def revision_digest(revisions: Dict[int, str]) -> str:
+    """
+    把 周次 -> 版本 合成一个版本标识（与 dataset_revision() 的格式相同）
+
+    Args:
+        revisions: 周次 -> 版本标识
+
+    Returns:
+        str: 版本标识
+    """
+    payload = '|'.join(f"{week}={rev}" for week, rev in sorted(revisions.items()))
+    return hashlib.md5(payload.encode('utf-8')).hexdigest()
+
+
+def _common_dtype(dtypes: List) -> object:
+    """多个周次中同一列的统一类型：数值列取能容纳所有周的类型，分类列合并类别，否则退回object"""
+    if all(isinstance(d, pd.CategoricalDtype) for d in dtypes):
+        return pd.CategoricalDtype(list(dict.fromkeys(c for d in dtypes for c in d.categories)))
+    if all(pd.api.types.is_numeric_dtype(d) and not pd.api.types.is_bool_dtype(d) for d in dtypes):
+        return np.result_type(*dtypes)
+    if all(pd.api.types.is_bool_dtype(d) for d in dtypes) and not all(d == dtypes[0] for d in dtypes):
+        # numpy bool 与可空 boolean 混合
+        return pd.BooleanDtype()
+    if all(d == dtypes[0] for d in dtypes):
+        return dtypes[0]
+    return object
+
+
+def concat_weeks(frames: Dict[int, pd.DataFrame]) -> Optional[pd.DataFrame]:
+    """
+    把多个周次的数据一次性合并，并统一各列类型
+
+    缺少 week_number 列的周次会按周次编号补齐；某些周缺失的列补为空值
+
+    Args:
+        frames: 周次 -> DataFrame
+
+    Returns:
+        pd.DataFrame: 合并后的数据
+    """
+    frames = {w: df for w, df in frames.items() if df is not None}
+    if not frames:
+        return None
+
+    prepared = []
+    for week_number, df in sorted(frames.items()):
+        if 'week_number' not in df.columns:
+            df = df.assign(week_number=week_number)
+        prepared.append(df)
+
+    # 按首次出现的顺序合并所有列
+    columns = list(dict.fromkeys(col for df in prepared for col in df.columns))
+    dtypes = {}
+    for col in columns:
+        present = [df[col].dtype for df in prepared if col in df.columns]
+        dtype = _common_dtype(present)
+        # 某些周缺少该列时会出现空值：整数改为float，布尔改为可空boolean
+        # （numpy bool 会把空值转换成True）
+        if len(present) < len(prepared) and pd.api.types.is_integer_dtype(dtype):
+            dtype = np.float64
+        elif len(present) < len(prepared) and pd.api.types.is_bool_dtype(dtype):
+            dtype = pd.BooleanDtype()
+        dtypes[col] = dtype
+
+    aligned = [df.reindex(columns=columns).astype(dtypes) for df in prepared]
+    return pd.concat(aligned, ignore_index=True)
+
+
+def load_weeks(week_numbers: Optional[Iterable[int]] = None,
+               source: str = 'local',
+               reports_dir: Path = REPORTS_DIR,
+               max_workers: int = DEFAULT_MAX_WORKERS,
+               columns: Optional[Iterable[str]] = None,
+               revisions: Optional[Dict[int, str]] = None) -> Optional[pd.DataFrame]:
+    """
+    并行加载多个周次的数据并合并
+
+    合并结果的 attrs['revisions'] 为各周实际读到的文件版本，
+    attrs['revision'] 为其 revision_digest()，派生数据应以此为键
+
+    Args:
+        week_numbers: 要加载的周次，为None时加载全部可用周次
+        source: 'local' 读取reports目录，'drive' 通过缓存从Google Drive读取
+        reports_dir: 本地报告目录（source='local'时使用）
+        max_workers: 最大并发数
+        columns: 每周只读取这些列，为None时读取全部列
+        revisions: 期望的各周文件版本（week_revisions() 的结果，source='drive'时使用）
+
+    Returns:
+        pd.DataFrame: 合并后的历史数据，没有任何数据时返回None
+    """
+    if columns is not None:
+        columns = list(dict.fromkeys(columns))
+    revisions = revisions or {}
+
+    if source == 'drive':
+        _require_gdrive()
+        weeks = list(week_numbers) if week_numbers is not None else gdrive.get_available_weeks()
+        loader = lambda week_number: load_week_frame(week_number, columns, revisions.get(week_number))
+    elif source == 'local':
+        files = local_week_files(reports_dir)
+        weeks = [w for w in (week_numbers if week_numbers is not None else files) if w in files]
+
+        def loader(week_number):
+            # 先取版本再读取，文件在读取期间被替换时版本偏旧，下次会重新计算
+            revision = local_file_revision(files[week_number])
+            return read_week_file(files[week_number], columns), revision
+    else:
+        raise ValueError(f"Unknown source: {source}")
+
+    if not weeks:
+        return None
+
+    def load_one(week_number):
+        try:
+            return loader(week_number)
+        except Exception as e:
+            print(f"Error loading week {week_number} data: {e}")
+            return None, None
+
+    workers = max(1, min(max_workers, len(weeks)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='week-loader') as pool:
+        results = list(pool.map(load_one, weeks))
+
+    frames = {week: df for week, (df, _) in zip(weeks, results)}
+    served = {week: rev for week, (df, rev) in zip(weeks, results) if df is not None and rev is not None}
+    combined = concat_weeks(frames)
+    if combined is not None:
+        combined.attrs['revisions'] = served
+        combined.attrs['revision'] = revision_digest(served)
+    return combined
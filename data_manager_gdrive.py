@@ -11,52 +11,154 @@ from datetime import datetime
 from typing import List, Dict, Optional
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload, MediaIoBaseDownload
+from googleapiclient.http import HttpRequest, MediaFileUpload, MediaIoBaseDownload
+from google_auth_httplib2 import AuthorizedHttp
+import httplib2
 import io
 import tempfile
+import threading
+
+from disk_cache import get_disk_cache
+from drive_catalog import DriveCatalog
+from drive_changes import DriveChangeWatcher
+from week_store import (
+    PARQUET_AVAILABLE,
+    WEEK_FILE_PATTERN,
+    read_week_bytes,
+    week_parquet_filename,
+    write_week_snapshot
+)
 
 # Google Drive Shared Drive ID and Folder ID
 GDRIVE_ID = "0AFBJflVvo6P2Uk9PVA"  # Shared Drive ID
 GDRIVE_FOLDER_ID = "0AFBJflVvo6P2Uk9PVA"  # Folder ID where CSV files are stored (same as DRIVE_ID since files are in root)
 
 
-def get_drive_service():
+DRIVE_SCOPES = ['https://www.googleapis.com/auth/drive']
+
+# 进程级共享的Drive客户端（所有Streamlit会话共用）
+_drive_service = None
+_drive_credentials = None
+_drive_service_lock = threading.Lock()
+# httplib2.Http 不是线程安全的，每个线程持有一个长连接
+_thread_http = threading.local()
+
+
+def _load_credentials():
     """
-    创建Google Drive API服务
+    解析服务账号凭证（只执行一次）
+    
+    凭证对象会缓存访问令牌，直到过期前才重新交换
     
     Returns:
-        Resource: Drive API服务对象
+        Credentials: 服务账号凭证
     """
+    # 从Streamlit secrets读取服务账号凭证（没有secrets.toml时访问会抛异常）
     try:
-        # 从Streamlit secrets读取服务账号凭证
-        if hasattr(st, 'secrets') and 'gdrive' in st.secrets:
-            credentials_dict = dict(st.secrets['gdrive'])
+        has_secrets = hasattr(st, 'secrets') and 'gdrive' in st.secrets
+    except Exception:
+        has_secrets = False
+    
+    if has_secrets:
+        credentials_dict = dict(st.secrets['gdrive'])
+    else:
+        # 本地开发时从环境变量读取
+        credentials_json = os.getenv('GOOGLE_APPLICATION_CREDENTIALS_JSON')
+        if credentials_json:
+            credentials_dict = json.loads(credentials_json)
         else:
-            # 本地开发时从环境变量读取
-            credentials_json = os.getenv('GOOGLE_APPLICATION_CREDENTIALS_JSON')
-            if credentials_json:
-                credentials_dict = json.loads(credentials_json)
-            else:
-                raise Exception("No Google credentials found")
-        
-        # 创建凭证对象
-        credentials = service_account.Credentials.from_service_account_info(
-            credentials_dict,
-            scopes=['https://www.googleapis.com/auth/drive']
-        )
-        
-        # 创建Drive API服务
-        service = build('drive', 'v3', credentials=credentials)
-        return service
-        
-    except Exception as e:
-        print(f"Failed to create Drive service: {e}")
-        return None
+            raise Exception("No Google credentials found")
+    
+    return service_account.Credentials.from_service_account_info(
+        credentials_dict,
+        scopes=DRIVE_SCOPES
+    )
 
 
-def list_files_in_folder(service, folder_id):
+def _authorized_http():
     """
-    列出文件夹中的所有文件
+    返回当前线程复用的已授权HTTP连接
+    
+    Returns:
+        AuthorizedHttp: 共享凭证 + 线程私有的连接
+    """
+    credentials = _drive_credentials
+    http = getattr(_thread_http, 'http', None)
+    if http is None or http.credentials is not credentials:
+        http = AuthorizedHttp(credentials, http=httplib2.Http(timeout=60))
+        _thread_http.http = http
+    return http
+
+
+def _build_request(http, *args, **kwargs):
+    """为每个请求选择当前线程的连接，使同一个service可跨线程使用"""
+    return HttpRequest(_authorized_http(), *args, **kwargs)
+
+
+def get_drive_service():
+    """
+    获取进程级共享的Google Drive API服务
+    
+    首次调用时解析凭证并构建服务（使用内置的discovery文档），
+    之后直接返回同一个实例
+    
+    Returns:
+        Resource: Drive API服务对象
+    """
+    global _drive_service, _drive_credentials
+    if _drive_service is not None:
+        return _drive_service
+    
+    with _drive_service_lock:
+        if _drive_service is not None:
+            return _drive_service
+        try:
+            _drive_credentials = _load_credentials()
+            
+            # 创建Drive API服务
+            _drive_service = build(
+                'drive', 'v3',
+                http=_authorized_http(),
+                requestBuilder=_build_request,
+                cache_discovery=False,
+                static_discovery=True
+            )
+            return _drive_service
+            
+        except Exception as e:
+            print(f"Failed to create Drive service: {e}")
+            return None
+
+
+def reset_drive_service():
+    """
+    丢弃共享的Drive服务和凭证（例如凭证轮换后），下次调用时重新创建
+    """
+    global _drive_service, _drive_credentials
+    with _drive_service_lock:
+        _drive_service = None
+        _drive_credentials = None
+
+
+DRIVE_FILE_FIELDS = "id, name, mimeType, size, md5Checksum, modifiedTime, parents"
+
+# 目录索引的刷新周期（秒）
+CATALOG_REFRESH_SECONDS = float(os.getenv('GDRIVE_CATALOG_REFRESH_SECONDS', '300'))
+
+# 目录索引过期后是否在后台刷新（期间继续使用旧索引，页面不等待Drive）
+CATALOG_BACKGROUND_REFRESH = os.getenv('GDRIVE_CATALOG_BACKGROUND_REFRESH', '1') != '0'
+
+# 目录索引刷新失败后的首次重试间隔与上限（秒），连续失败时间隔逐次加倍
+CATALOG_RETRY_SECONDS = float(os.getenv('GDRIVE_CATALOG_RETRY_SECONDS', '5'))
+CATALOG_MAX_RETRY_SECONDS = float(os.getenv('GDRIVE_CATALOG_MAX_RETRY_SECONDS', '300'))
+
+# 下载内容与Drive记录的md5Checksum不一致时最多下载几次
+DOWNLOAD_ATTEMPTS = int(os.getenv('GDRIVE_DOWNLOAD_ATTEMPTS', '2'))
+
+
+def list_folder_pages(service, folder_id) -> List[Dict]:
+    """
+    分页列出文件夹中的全部文件，出错时抛出异常
     
     Args:
         service: Drive API服务对象
@@ -65,54 +167,134 @@ def list_files_in_folder(service, folder_id):
     Returns:
         List: 文件列表
     """
-    try:
-        query = f"'{folder_id}' in parents and trashed=false"
+    if service is None:
+        raise Exception("Drive service unavailable")
+    
+    query = f"'{folder_id}' in parents and trashed=false"
+    files = []
+    page_token = None
+    while True:
         results = service.files().list(
             q=query,
-            fields="files(id, name, mimeType)",
+            fields=f"nextPageToken, files({DRIVE_FILE_FIELDS})",
+            pageSize=1000,
+            pageToken=page_token,
             supportsAllDrives=True,
             includeItemsFromAllDrives=True,
             corpora='drive',
             driveId=GDRIVE_ID
         ).execute()
-        return results.get('files', [])
+        files.extend(results.get('files', []))
+        page_token = results.get('nextPageToken')
+        if not page_token:
+            return files
+
+
+def list_files_in_folder(service, folder_id):
+    """
+    列出文件夹中的所有文件
+    
+    Args:
+        service: Drive API服务对象
+        folder_id: 文件夹ID
+        
+    Returns:
+        List: 文件列表
+    """
+    try:
+        return list_folder_pages(service, folder_id)
     except Exception as e:
         print(f"Error listing files: {e}")
         return []
 
 
+# Shared Drive根目录的共享索引
+_catalog = DriveCatalog(
+    lambda: list_folder_pages(get_drive_service(), GDRIVE_FOLDER_ID),
+    refresh_seconds=CATALOG_REFRESH_SECONDS,
+    background_refresh=CATALOG_BACKGROUND_REFRESH,
+    retry_seconds=CATALOG_RETRY_SECONDS,
+    max_retry_seconds=CATALOG_MAX_RETRY_SECONDS
+)
+
+
+def get_catalog() -> DriveCatalog:
+    """
+    获取Shared Drive根目录的共享索引
+    
+    Returns:
+        DriveCatalog: 目录索引
+    """
+    return _catalog
+
+
+_change_watcher = None
+_change_watcher_lock = threading.Lock()
+
+
+def get_change_watcher() -> DriveChangeWatcher:
+    """
+    获取共享的Drive变更监听器（增量更新根目录索引）
+    
+    Returns:
+        DriveChangeWatcher: 变更监听器
+    """
+    global _change_watcher
+    if _change_watcher is None:
+        with _change_watcher_lock:
+            if _change_watcher is None:
+                _change_watcher = DriveChangeWatcher(
+                    get_drive_service,
+                    get_catalog(),
+                    folder_id=GDRIVE_FOLDER_ID,
+                    drive_id=GDRIVE_ID
+                )
+    return _change_watcher
+
+
+def cached_weeks() -> List[int]:
+    """
+    本地磁盘缓存中已有的周次（上次同步的快照，不访问Drive）
+    
+    Returns:
+        List[int]: 周次编号列表
+    """
+    weeks = set()
+    for filename in get_disk_cache().filenames():
+        match = WEEK_FILE_PATTERN.match(filename)
+        if match:
+            weeks.add(int(match.group(1)))
+    return sorted(weeks)
+
+
 def get_available_weeks() -> List[int]:
     """
     从Google Drive获取所有可用的周次
     
+    目录索引尚未加载（首次同步未完成或无法访问Drive）时，
+    返回本地磁盘缓存中上次同步的周次
+    
     Returns:
         List[int]: 周次编号列表
     """
     try:
-        service = get_drive_service()
-        if not service:
-            return [4]  # 默认返回第4周
+        catalog = get_catalog()
+        catalog.ensure_fresh()
+        if not catalog.loaded:
+            return cached_weeks()
         
-        # 直接从Shared Drive根目录列出CSV文件
-        files = list_files_in_folder(service, GDRIVE_FOLDER_ID)
+        weeks = set()
+        for file in catalog.files():
+            # CSV与Parquet快照都算作可用周次
+            match = WEEK_FILE_PATTERN.match(file['name'])
+            if match:
+                weeks.add(int(match.group(1)))
         
-        weeks = []
-        for file in files:
-            if file['name'].startswith('All_Data_Week_') and file['name'].endswith('.csv'):
-                try:
-                    import re
-                    match = re.search(r'Week_(\d+)', file['name'])
-                    if match:
-                        week_num = int(match.group(1))
-                        weeks.append(week_num)
-                except (IndexError, ValueError):
-                    continue
-        
-        return sorted(weeks) if weeks else [4]
+        return sorted(weeks)
         
     except Exception as e:
         print(f"Error getting available weeks: {e}")
-        return [4]
+        return cached_weeks()
 
 
 def download_file(service, file_id):
@@ -140,41 +322,152 @@ def download_file(service, file_id):
         return None
 
 
-def load_week_data(week_number: int) -> Optional[pd.DataFrame]:
+def download_file_cached(file_info: Dict, service=None) -> Optional[bytes]:
     """
-    从Google Drive加载指定周次的完整数据
+    通过本地磁盘缓存下载文件
+    
+    本地缓存的md5Checksum/modifiedTime与Drive一致时直接读取本地内容，
+    否则下载并写入缓存。下载内容与md5Checksum不一致时重新下载一次，
+    仍不一致则标记目录索引过期（元数据可能已落后）并返回None
     
     Args:
-        week_number: 周次编号
+        file_info: 文件元数据（需包含id、name，以及md5Checksum或modifiedTime）
+        service: Drive API服务对象，缓存未命中时才需要
         
     Returns:
-        pd.DataFrame: 产品数据
+        bytes: 文件内容
     """
-    try:
-        service = get_drive_service()
-        if not service:
+    cache = get_disk_cache()
+    filename = file_info['name']
+    
+    content = cache.get(filename, file_info)
+    if content is not None:
+        return content
+    
+    service = service or get_drive_service()
+    if not service:
+        return None
+    
+    for attempt in range(DOWNLOAD_ATTEMPTS):
+        content = download_file(service, file_info['id'])
+        if content is None:
             return None
+        try:
+            cache.put(filename, file_info, content)
+            return content
+        except ValueError as e:
+            print(f"Error downloading {filename} (attempt {attempt + 1}/{DOWNLOAD_ATTEMPTS}): {e}")
+        except OSError as e:
+            print(f"Error writing disk cache for {filename}: {e}")
+            return content
+    get_catalog().invalidate()
+    return None
+
+
+def week_csv_filename(week_number: int) -> str:
+    """
+    周次数据CSV的文件名
+    
+    Args:
+        week_number: 周次编号
         
-        # 直接从Shared Drive根目录查找CSV文件
-        files = list_files_in_folder(service, GDRIVE_FOLDER_ID)
-        csv_filename = f"All_Data_Week_{week_number:02d}.csv"
+    Returns:
+        str: 例如 "All_Data_Week_05.csv"
+    """
+    return f"All_Data_Week_{week_number:02d}.csv"
+
+
+def file_revision(file_info: Dict) -> Optional[str]:
+    """
+    从文件元数据中提取版本标识
+    
+    优先使用md5Checksum，缺失时退回到modifiedTime
+    
+    Args:
+        file_info: Drive文件元数据
         
-        for file in files:
-            if file['name'] == csv_filename:
-                # 下载文件
-                content = download_file(service, file['id'])
-                if content:
-                    df = pd.read_csv(io.BytesIO(content))
-                    return df
+    Returns:
+        str: 版本标识
+    """
+    if not file_info:
+        return None
+    return file_info.get('md5Checksum') or file_info.get('modifiedTime') or file_info.get('id')
+
+
+def get_week_file_info(week_number: int) -> Optional[Dict]:
+    """
+    查询指定周次数据文件的元数据（不下载内容）
+    
+    存在不比CSV旧的Parquet快照时优先使用，否则使用CSV
+    
+    Args:
+        week_number: 周次编号
         
-        print(f"CSV file not found for week {week_number}")
+    Returns:
+        Dict: 包含id、name、size、md5Checksum、modifiedTime的字典
+    """
+    try:
+        catalog = get_catalog()
+        catalog.ensure_fresh()
+        # 目录索引尚未加载时使用磁盘缓存中上次同步的版本
+        lookup = catalog.get if catalog.loaded else get_disk_cache().cached_file_info
+        csv_info = lookup(week_csv_filename(week_number))
+        if PARQUET_AVAILABLE:
+            parquet_info = lookup(week_parquet_filename(week_number))
+            # 快照生成后CSV又被更新时，快照已过时
+            if parquet_info and (not csv_info or
+                                 parquet_info.get('modifiedTime', '') >= csv_info.get('modifiedTime', '')):
+                return parquet_info
+        return csv_info
+    except Exception as e:
+        print(f"Error getting file info for week {week_number}: {e}")
+        return None
+
+
+def fetch_week_data(week_number: int, file_info: Dict,
+                    columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+    """
+    根据已知的文件元数据下载并解析周次数据
+    
+    Args:
+        week_number: 周次编号
+        file_info: get_week_file_info() 返回的元数据
+        columns: 只解析这些列，为None时解析全部
+        
+    Returns:
+        pd.DataFrame: 产品数据
+    """
+    try:
+        content = download_file_cached(file_info)
+        if content:
+            return read_week_bytes(content, file_info['name'], columns=columns)
         return None
         
     except Exception as e:
-        print(f"Error loading week {week_number} data: {e}")
+        print(f"Error fetching week {week_number} data: {e}")
         return None
 
 
+def load_week_data(week_number: int) -> Optional[pd.DataFrame]:
+    """
+    从Google Drive加载指定周次的完整数据（不经过内存缓存）
+    
+    仪表板应使用 data_access.load_week_data，它在此函数之上提供缓存
+    
+    Args:
+        week_number: 周次编号
+        
+    Returns:
+        pd.DataFrame: 产品数据
+    """
+    file_info = get_week_file_info(week_number)
+    if not file_info:
+        print(f"Data file not found for week {week_number}")
+        return None
+    
+    return fetch_week_data(week_number, file_info)
+
+
 def load_week_metadata(week_number: int) -> Optional[Dict]:
     """
     从Google Drive加载指定周次的元数据
@@ -191,18 +484,12 @@ def load_week_metadata(week_number: int) -> Optional[Dict]:
             return None
         
         # 查找周次文件夹
-        folders = list_files_in_folder(service, GDRIVE_FOLDER_ID)
         week_folder_name = f"week_{week_number:02d}"
-        week_folder_id = None
-        
-        for folder in folders:
-            if folder['name'] == week_folder_name and \
-               folder['mimeType'] == 'application/vnd.google-apps.folder':
-                week_folder_id = folder['id']
-                break
+        folder = get_catalog().get(week_folder_name)
         
-        if not week_folder_id:
+        if not folder or folder['mimeType'] != 'application/vnd.google-apps.folder':
             return None
+        week_folder_id = folder['id']
         
         # 查找metadata.json文件
         files = list_files_in_folder(service, week_folder_id)
@@ -272,15 +559,14 @@ def upload_week_data(csv_file, week_number: int, notes: str = "") -> bool:
         # 创建周次文件夹
         week_folder_name = f"week_{week_number:02d}"
         
-        # 检查文件夹是否已存在
-        folders = list_files_in_folder(service, GDRIVE_FOLDER_ID)
+        # 检查文件夹是否已存在（上传前强制刷新索引，避免重复创建）
+        catalog = get_catalog()
+        catalog.refresh()
         week_folder_id = None
         
-        for folder in folders:
-            if folder['name'] == week_folder_name and \
-               folder['mimeType'] == 'application/vnd.google-apps.folder':
-                week_folder_id = folder['id']
-                break
+        folder = catalog.get(week_folder_name)
+        if folder and folder['mimeType'] == 'application/vnd.google-apps.folder':
+            week_folder_id = folder['id']
         
         # 如果不存在则创建
         if not week_folder_id:
@@ -309,6 +595,13 @@ def upload_week_data(csv_file, week_number: int, notes: str = "") -> bool:
         # 删除临时文件
         os.unlink(tmp_path)
         
+        # 同时上传Parquet快照（列式压缩，加载更快）
+        with tempfile.NamedTemporaryFile(delete=False, suffix='.parquet') as tmp:
+            tmp_path = tmp.name
+        if write_week_snapshot(df, tmp_path):
+            upload_file(service, tmp_path, week_parquet_filename(week_number), week_folder_id)
+        os.unlink(tmp_path)
+        
         # 创建元数据
         metadata = {
             "week_number": week_number,
@@ -331,6 +624,9 @@ def upload_week_data(csv_file, week_number: int, notes: str = "") -> bool:
         upload_file(service, tmp_path, 'metadata.json', week_folder_id)
         os.unlink(tmp_path)
         
+        # 新建的文件夹/文件需要在下次访问时重新列出
+        catalog.invalidate()
+        
         return True
         
     except Exception as e:
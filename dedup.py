@@ -0,0 +1,285 @@
+"""
+相似产品去重
+同一设计常被不同创作者、不同平台以略有差异的标题重复发布。
+对规范化后的产品名称取字符片段（shingle），计算MinHash签名，
+再用LSH分桶找出候选对，把近似相同的产品归为一簇。
+整体耗时与数据行数近似线性，不做两两比较
+"""
+
+import os
+import re
+import zlib
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# 签名长度（哈希函数个数）
+DEFAULT_NUM_PERM = int(os.getenv('DEDUP_NUM_PERM', '128'))
+
+# 估计的Jaccard相似度达到该值视为同一产品
+DEFAULT_THRESHOLD = float(os.getenv('DEDUP_THRESHOLD', '0.7'))
+
+# 字符片段长度
+SHINGLE_SIZE = 4
+
+_PUNCTUATION = re.compile(r'[^\w]+')
+
+
+def normalize_name(name) -> str:
+    """
+    规范化产品名称：统一大小写，标点和多余空白替换为单个空格
+
+    Args:
+        name: 产品名称
+
+    Returns:
+        str: 规范化后的名称
+    """
+    if name is None or name != name:
+        return ''
+    return ' '.join(_PUNCTUATION.sub(' ', str(name).casefold()).split())
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> set:
+    """
+    文本的字符片段集合；短于片段长度的文本整体作为一个片段
+
+    Args:
+        text: 规范化后的文本
+        size: 片段长度
+
+    Returns:
+        set: 片段集合
+    """
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def lsh_params(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """
+    选择分带数和每带行数，使LSH的近似阈值 (1/b)^(1/r) 最接近目标阈值
+
+    Args:
+        num_perm: 签名长度
+        threshold: 目标相似度阈值
+
+    Returns:
+        Tuple[int, int]: (分带数, 每带行数)
+    """
+    best = (num_perm, 1)
+    best_error = float('inf')
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        error = abs((1 / bands) ** (1 / rows) - threshold)
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+
+class MinHasher:
+    """
+    MinHash签名计算
+
+    哈希族为 uint32 上的 a*x+b（a为奇数，溢出自然回绕）。所有文本的片段哈希
+    拼成一个数组，每个哈希函数只需一次向量运算加一次按文档分段求最小值
+    （np.minimum.reduceat）。
+    """
+
+    def __init__(self, num_perm: int = DEFAULT_NUM_PERM, seed: int = 1):
+        """
+        Args:
+            num_perm: 签名长度
+            seed: 随机种子（相同种子得到相同签名，可跨进程比较）
+        """
+        self.num_perm = num_perm
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(0, 1 << 32, size=num_perm, dtype=np.uint64).astype(np.uint32) | np.uint32(1)
+        self._b = rng.integers(0, 1 << 32, size=num_perm, dtype=np.uint64).astype(np.uint32)
+
+    def signatures(self, texts: Iterable[str]) -> np.ndarray:
+        """
+        计算规范化文本的MinHash签名
+
+        Args:
+            texts: normalize_name() 处理后的文本
+
+        Returns:
+            np.ndarray: 形状为 (文档数, num_perm) 的uint32数组；
+                空文本的签名全为最大值
+        """
+        grams: List[str] = []
+        offsets: List[int] = []
+        empty: List[int] = []
+        for doc_id, text in enumerate(texts):
+            doc_grams = shingles(text)
+            if not doc_grams:
+                # 占位，结果稍后覆盖
+                doc_grams = {''}
+                empty.append(doc_id)
+            offsets.append(len(grams))
+            grams.extend(doc_grams)
+
+        signatures = np.empty((len(offsets), self.num_perm), dtype=np.uint32)
+        if not offsets:
+            return signatures
+        # 不同文档的片段大量重复，每种片段只哈希一次
+        codes, vocabulary = pd.factorize(pd.Series(grams, dtype=object))
+        vocabulary_hashes = np.fromiter((zlib.crc32(g.encode('utf-8')) for g in vocabulary),
+                                        dtype=np.uint32, count=len(vocabulary))
+        values = vocabulary_hashes[codes]
+        starts = np.asarray(offsets, dtype=np.int64)
+        permuted = np.empty_like(values)
+        with np.errstate(over='ignore'):
+            for i in range(self.num_perm):
+                np.multiply(values, self._a[i], out=permuted)
+                permuted += self._b[i]
+                signatures[:, i] = np.minimum.reduceat(permuted, starts)
+        signatures[empty] = np.iinfo(np.uint32).max
+        return signatures
+
+
+def connected_components(count: int, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """
+    无向图的连通分量（标签传播加指针跳跃，全部为向量运算）
+
+    Args:
+        count: 节点数
+        left: 边的一端
+        right: 边的另一端
+
+    Returns:
+        np.ndarray: 每个节点所在分量的最小节点编号
+    """
+    labels = np.arange(count, dtype=np.int64)
+    if len(left) == 0:
+        return labels
+    while True:
+        previous = labels.copy()
+        np.minimum.at(labels, left, labels[right])
+        np.minimum.at(labels, right, labels[left])
+        labels = labels[labels]
+        if np.array_equal(labels, previous):
+            return labels
+
+
+def cluster_signatures(signatures: np.ndarray, threshold: float = DEFAULT_THRESHOLD,
+                       bands: Optional[int] = None) -> np.ndarray:
+    """
+    用LSH分桶对签名聚类
+
+    每一带相同的文档落入同一个桶；桶内每个文档只与桶内第一个文档
+    比较估计相似度，达到阈值即连一条边，因此每个桶的开销与桶大小成正比。
+
+    Args:
+        signatures: MinHasher.signatures() 的结果
+        threshold: 相似度阈值
+        bands: 分带数，默认按阈值自动选择
+
+    Returns:
+        np.ndarray: 每个文档的簇编号（簇内最小的文档位置）
+    """
+    count, num_perm = signatures.shape
+    if bands is None:
+        bands, rows = lsh_params(num_perm, threshold)
+    else:
+        rows = num_perm // bands
+    empty = (signatures == np.iinfo(np.uint32).max).all(axis=1)
+    # 合成分带键用的奇数乘子
+    multipliers = np.random.default_rng(0).integers(1, 1 << 63, size=rows, dtype=np.uint64) | np.uint64(1)
+
+    left, right = [], []
+    for band in range(bands):
+        # 把一带的签名合成一个64位键；偶发碰撞只会多出候选，后面按相似度过滤
+        block = signatures[:, band * rows:(band + 1) * rows].astype(np.uint64)
+        with np.errstate(over='ignore'):
+            keys = (block * multipliers).sum(axis=1, dtype=np.uint64)
+        _, bucket, sizes = np.unique(keys, return_inverse=True, return_counts=True)
+        shared = np.flatnonzero((sizes[bucket] > 1) & ~empty)
+        if len(shared) == 0:
+            continue
+        order = shared[np.argsort(bucket[shared], kind='stable')]
+        bucket_ids = bucket[order]
+        starts = np.flatnonzero(np.r_[True, bucket_ids[1:] != bucket_ids[:-1]])
+        heads = np.repeat(order[starts], np.diff(np.r_[starts, len(order)]))
+        similar = (signatures[order] == signatures[heads]).mean(axis=1) >= threshold
+        similar &= order != heads
+        left.append(order[similar])
+        right.append(heads[similar])
+
+    if not left:
+        return np.arange(count, dtype=np.int64)
+    return connected_components(count, np.concatenate(left), np.concatenate(right))
+
+
+def cluster_names(names: Iterable, threshold: float = DEFAULT_THRESHOLD,
+                  num_perm: int = DEFAULT_NUM_PERM) -> np.ndarray:
+    """
+    把近似相同的产品名称归为一簇
+
+    规范化后完全相同的名称（例如同一产品出现在多个周次）只计算一次签名。
+
+    Args:
+        names: 产品名称
+        threshold: 相似度阈值
+        num_perm: 签名长度
+
+    Returns:
+        np.ndarray: 每个名称的簇编号（簇内第一个名称的位置）
+    """
+    normalized = np.asarray([normalize_name(name) for name in names], dtype=object)
+    if len(normalized) == 0:
+        return np.empty(0, dtype=np.int64)
+    unique, first, inverse = np.unique(normalized, return_index=True, return_inverse=True)
+    labels = cluster_signatures(MinHasher(num_perm).signatures(unique), threshold)
+    # 簇编号换算为原始位置：每簇取成员中最早出现的位置
+    cluster_first = np.full(len(unique), len(normalized), dtype=np.int64)
+    np.minimum.at(cluster_first, labels, first)
+    result = cluster_first[labels[inverse]]
+    # 空名称无法比较，各自成簇
+    blank = np.flatnonzero(normalized == '')
+    result[blank] = blank
+    return result
+
+
+def collapse_duplicates(df: pd.DataFrame, labels, count_column: str = 'duplicate_count',
+                        by: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    每簇只保留第一行（调用方先按需要的顺序排序），并记录簇内行数
+
+    Args:
+        df: 数据
+        labels: 与df各行对应的簇编号
+        count_column: 记录簇内行数的列名
+        by: 额外的分组列（例如 week_number 表示只在同一周内合并）
+
+    Returns:
+        pd.DataFrame: 去重后的数据
+    """
+    keys = [pd.Series(np.asarray(labels), index=df.index, name='_cluster')]
+    keys += [df[col] for col in by or []]
+    group = pd.concat(keys, axis=1)
+    counts = group.groupby(list(group.columns), observed=True, sort=False)['_cluster'].transform('size')
+    keep = ~group.duplicated()
+    return df[keep].assign(**{count_column: counts[keep].to_numpy()})
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+    from week_store import local_week_files, read_week_file
+
+    reports_dir = sys.argv[1] if len(sys.argv) > 1 else 'reports'
+    frames = [read_week_file(path, ['product_name']) for path in local_week_files(reports_dir).values()]
+    names = pd.concat(frames, ignore_index=True)['product_name'] if frames else pd.Series([], dtype=object)
+
+    start = time.perf_counter()
+    labels = cluster_names(names)
+    elapsed = (time.perf_counter() - start) * 1000
+    clusters = pd.Series(labels).value_counts()
+    print(f"{len(names)} names -> {len(clusters)} clusters in {elapsed:.1f} ms")
+    for label in clusters[clusters > 1].index[:5]:
+        print(f"- {names[labels == label].tolist()}")
@@ -0,0 +1,248 @@
+"""
+本地磁盘缓存 - 按内容寻址保存Drive文件
+每个文件的字节按md5存放，并记录对应的Drive md5Checksum/modifiedTime，
+再次加载时只需比较元数据，版本一致则无需重新下载
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+# 缓存目录，可通过环境变量覆盖（多实例部署时可指向共享卷；
+# 写入和清理通过目录下的锁文件在进程间互斥，需要支持fcntl的平台）
+DEFAULT_CACHE_DIR = os.getenv('GDRIVE_CACHE_DIR', os.path.join('.cache', 'gdrive'))
+
+
+def atomic_write(path: Path, data: bytes):
+    """先写临时文件再重命名，避免并发读取到半写入的文件"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+class DiskCache:
+    """
+    内容寻址的文件缓存
+
+    目录结构:
+        objects/<md5>          文件内容
+        index/<文件名>.json     Drive元数据 -> 对象md5
+    """
+
+    def __init__(self, root: str = DEFAULT_CACHE_DIR):
+        """
+        Args:
+            root: 缓存根目录
+        """
+        self.root = Path(root)
+        self._lock = threading.Lock()
+
+    def _object_path(self, digest: str) -> Path:
+        return self.root / 'objects' / digest
+
+    def _index_path(self, filename: str) -> Path:
+        return self.root / 'index' / f"{filename}.json"
+
+    @contextmanager
+    def _locked(self):
+        """
+        写入/清理期间持有的锁：进程内用线程锁，进程间用 <root>/.lock 文件锁，
+        避免一个实例清理对象时删掉另一个实例刚写入、尚未被索引引用的对象
+        """
+        with self._lock:
+            if not FCNTL_AVAILABLE:
+                yield
+                return
+            self.root.mkdir(parents=True, exist_ok=True)
+            with open(self.root / '.lock', 'a') as lock_file:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def read_index(self, filename: str) -> Optional[Dict]:
+        """
+        读取文件的缓存索引
+
+        Args:
+            filename: Drive文件名
+
+        Returns:
+            Dict: 缓存时记录的元数据，不存在时返回None
+        """
+        try:
+            with open(self._index_path(filename), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def filenames(self) -> List[str]:
+        """
+        已缓存的文件名
+
+        Returns:
+            List[str]: Drive文件名
+        """
+        index_dir = self.root / 'index'
+        if not index_dir.exists():
+            return []
+        return sorted(path.name[:-len('.json')] for path in index_dir.glob('*.json'))
+
+    def cached_file_info(self, filename: str) -> Optional[Dict]:
+        """
+        由缓存索引还原文件元数据（无法访问Drive时用于读取上次同步的版本）
+
+        Args:
+            filename: Drive文件名
+
+        Returns:
+            Dict: 与Drive元数据字段相同的字典，未缓存时返回None
+        """
+        entry = self.read_index(filename)
+        if not entry:
+            return None
+        return {
+            'id': entry.get('file_id'),
+            'name': filename,
+            'size': str(entry.get('size')),
+            'md5Checksum': entry.get('md5Checksum'),
+            'modifiedTime': entry.get('modifiedTime'),
+        }
+
+    @staticmethod
+    def matches(entry: Dict, file_info: Dict) -> bool:
+        """
+        判断缓存条目与Drive元数据是否为同一版本
+
+        Args:
+            entry: 缓存索引条目
+            file_info: Drive文件元数据
+
+        Returns:
+            bool: 版本一致时返回True
+        """
+        if not entry or not file_info:
+            return False
+        remote_md5 = file_info.get('md5Checksum')
+        if remote_md5:
+            return entry.get('md5Checksum') == remote_md5
+        remote_mtime = file_info.get('modifiedTime')
+        return bool(remote_mtime) and entry.get('modifiedTime') == remote_mtime
+
+    def get(self, filename: str, file_info: Dict) -> Optional[bytes]:
+        """
+        获取与Drive元数据版本一致的缓存内容
+
+        Args:
+            filename: Drive文件名
+            file_info: Drive文件元数据
+
+        Returns:
+            bytes: 文件内容，未命中时返回None
+        """
+        entry = self.read_index(filename)
+        if not self.matches(entry, file_info):
+            return None
+        try:
+            with open(self._object_path(entry['object']), 'rb') as f:
+                content = f.read()
+        except (OSError, KeyError):
+            return None
+        # 防止对象文件损坏
+        if hashlib.md5(content).hexdigest() != entry['object']:
+            return None
+        return content
+
+    def put(self, filename: str, file_info: Dict, content: bytes) -> str:
+        """
+        保存文件内容及其Drive元数据
+
+        Args:
+            filename: Drive文件名
+            file_info: Drive文件元数据
+            content: 文件内容
+
+        Returns:
+            str: 内容的md5
+
+        Raises:
+            ValueError: 内容与Drive记录的md5Checksum不一致（下载损坏或元数据已过期），
+                此时不写入缓存，由调用方重新下载
+        """
+        digest = hashlib.md5(content).hexdigest()
+        remote_md5 = file_info.get('md5Checksum')
+        if remote_md5 and remote_md5 != digest:
+            raise ValueError(f"md5 mismatch for {filename} (drive={remote_md5}, local={digest})")
+
+        entry = {
+            'file_id': file_info.get('id'),
+            'md5Checksum': remote_md5,
+            'modifiedTime': file_info.get('modifiedTime'),
+            'size': len(content),
+            'object': digest,
+        }
+        with self._locked():
+            previous = self.read_index(filename)
+            object_path = self._object_path(digest)
+            if not object_path.exists():
+                atomic_write(object_path, content)
+            atomic_write(self._index_path(filename),
+                          json.dumps(entry, ensure_ascii=False, indent=2).encode('utf-8'))
+            if previous and previous.get('object') != digest:
+                self._prune()
+        return digest
+
+    def _prune(self):
+        """删除不再被任何索引引用的对象文件（需持有 _locked()）"""
+        index_dir = self.root / 'index'
+        objects_dir = self.root / 'objects'
+        if not objects_dir.exists():
+            return
+        referenced = set()
+        for index_file in index_dir.glob('*.json'):
+            try:
+                with open(index_file, 'r', encoding='utf-8') as f:
+                    referenced.add(json.load(f).get('object'))
+            except (OSError, ValueError):
+                continue
+        for object_file in objects_dir.iterdir():
+            if object_file.name not in referenced and not object_file.name.startswith('.tmp-'):
+                try:
+                    object_file.unlink()
+                except OSError:
+                    pass
+
+
+_disk_cache: Optional[DiskCache] = None
+
+
+def get_disk_cache() -> DiskCache:
+    """
+    获取默认目录下的磁盘缓存实例
+
+    Returns:
+        DiskCache: 缓存实例
+    """
+    global _disk_cache
+    if _disk_cache is None:
+        _disk_cache = DiskCache()
+    return _disk_cache
@@ -0,0 +1,297 @@
+"""
+Drive文件夹目录索引
+一次性分页列出文件夹内容，按文件名建立 id/size/md5/modifiedTime 索引，
+并按固定周期刷新，使文件查找成为一次字典访问。
+可选在后台刷新：索引过期后先继续返回旧索引，由后台线程重新列出；
+刷新失败时按指数退避推迟下一次自动刷新
+"""
+
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+
+class DriveCatalog:
+    """
+    文件夹目录的内存索引
+
+    list_fn 返回文件夹中的全部文件（已处理分页），失败时应抛出异常，
+    此时保留上一次成功的索引。
+    """
+
+    def __init__(self,
+                 list_fn: Callable[[], List[Dict]],
+                 refresh_seconds: float = 300,
+                 background_refresh: bool = False,
+                 retry_seconds: float = 5,
+                 max_retry_seconds: float = 300,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            list_fn: 列出文件夹内容的函数
+            refresh_seconds: 索引刷新周期（秒）
+            background_refresh: 已加载的索引过期时是否在后台刷新（期间继续返回旧索引）
+            retry_seconds: 刷新失败后等待多久再自动重试（秒），连续失败时逐次加倍
+            max_retry_seconds: 重试间隔的上限（秒）
+            clock: 时钟函数（便于测试替换）
+        """
+        self._list_fn = list_fn
+        self.refresh_seconds = refresh_seconds
+        self.background_refresh = background_refresh
+        self.retry_seconds = retry_seconds
+        self.max_retry_seconds = max_retry_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._by_name: Dict[str, Dict] = {}
+        self._by_id: Dict[str, Dict] = {}
+        self._loaded = False
+        self._stale = False
+        self._refreshed_at: Optional[float] = None
+        self._failures = 0
+        self._retry_at: Optional[float] = None
+        self._listeners: List[Callable[[List[Dict]], None]] = []
+
+    def add_listener(self, listener: Callable[[List[Dict]], None]):
+        """
+        注册刷新回调：完整刷新后以新增、变化和被删除的文件调用
+        （被删除的文件带 'removed': True）。增量的 upsert()/remove() 不触发回调，
+        由变更监听器通知自己的回调
+
+        Args:
+            listener: 参数为变化的文件元数据列表
+        """
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    @property
+    def loaded(self) -> bool:
+        """索引是否至少成功加载过一次（invalidate() 之后仍为True，旧索引继续可用）"""
+        return self._loaded
+
+    @property
+    def stale(self) -> bool:
+        """索引是否已被 invalidate() 标记为过期、尚未重新列出"""
+        return self._stale
+
+    @property
+    def failures(self) -> int:
+        """连续刷新失败的次数"""
+        return self._failures
+
+    def is_stale(self) -> bool:
+        """索引是否需要重新列出（尚未加载、被标记过期或已超过刷新周期）"""
+        refreshed_at = self._refreshed_at
+        return (refreshed_at is None or self._stale
+                or self._clock() - refreshed_at >= self.refresh_seconds)
+
+    def _backing_off(self) -> bool:
+        """上一次刷新失败后是否仍在退避期内"""
+        retry_at = self._retry_at
+        return retry_at is not None and self._clock() < retry_at
+
+    def refresh(self) -> bool:
+        """
+        重新列出文件夹并重建索引
+
+        Returns:
+            bool: 刷新是否成功
+        """
+        with self._refresh_lock:
+            try:
+                files = self._list_fn()
+            except Exception as e:
+                print(f"Error refreshing Drive catalog: {e}")
+                with self._lock:
+                    self._failures += 1
+                    delay = min(self.retry_seconds * 2 ** (self._failures - 1), self.max_retry_seconds)
+                    self._retry_at = self._clock() + delay
+                return False
+
+            by_name: Dict[str, Dict] = {}
+            by_id: Dict[str, Dict] = {}
+            for file in files:
+                self._index(file, by_name, by_id)
+
+            with self._lock:
+                changed = self._diff(self._by_id, by_id)
+                self._by_name = by_name
+                self._by_id = by_id
+                self._set_fresh()
+
+        if changed:
+            for listener in list(self._listeners):
+                try:
+                    listener(changed)
+                except Exception as e:
+                    print(f"Error in Drive catalog listener: {e}")
+        return True
+
+    @staticmethod
+    def _diff(old: Dict[str, Dict], new: Dict[str, Dict]) -> List[Dict]:
+        """两次列出之间新增、内容或名称变化、以及被删除的文件"""
+        changed = []
+        for file_id, file in new.items():
+            previous = old.get(file_id)
+            if previous is None or any(previous.get(field) != file.get(field)
+                                       for field in ('name', 'md5Checksum', 'modifiedTime')):
+                changed.append(file)
+            if previous is not None and previous.get('name') != file.get('name'):
+                changed.append({**previous, 'removed': True})
+        changed.extend({**file, 'removed': True} for file_id, file in old.items() if file_id not in new)
+        return changed
+
+    @property
+    def refreshing(self) -> bool:
+        """是否有线程正在重新列出文件夹"""
+        return self._refresh_lock.locked()
+
+    def _refresh_in_background(self):
+        if self._refresh_lock.locked():
+            return
+        threading.Thread(target=self.refresh, name='drive-catalog-refresh', daemon=True).start()
+
+    def ensure_fresh(self):
+        """
+        索引过期时刷新
+
+        background_refresh 为True时不等待：在后台线程中重新列出并立即返回，
+        期间调用方看到的是旧索引（尚未加载时为空索引）。
+        上一次刷新失败后的退避期内不重试，继续使用旧索引
+        """
+        if not self.is_stale() or self._backing_off():
+            return
+        if self.background_refresh:
+            self._refresh_in_background()
+            return
+        self.refresh()
+
+    def invalidate(self):
+        """标记索引过期，下次访问时重新列出（重新列出之前旧索引仍然可用）"""
+        with self._lock:
+            self._stale = True
+
+    def _set_fresh(self):
+        """成功列出或载入快照后调用（需持有 _lock）"""
+        self._loaded = True
+        self._stale = False
+        self._refreshed_at = self._clock()
+        self._failures = 0
+        self._retry_at = None
+
+    @staticmethod
+    def _index(file: Dict, by_name: Dict[str, Dict], by_id: Dict[str, Dict]):
+        by_id[file['id']] = file
+        # Drive允许同名文件，保留最近修改的一个
+        current = by_name.get(file['name'])
+        if current is None or file.get('modifiedTime', '') >= current.get('modifiedTime', ''):
+            by_name[file['name']] = file
+
+    def load_snapshot(self, files: List[Dict]):
+        """
+        用保存的快照重建索引（由变更监听器负责追平之后的变更）
+
+        Args:
+            files: 快照中的文件元数据列表
+        """
+        by_name: Dict[str, Dict] = {}
+        by_id: Dict[str, Dict] = {}
+        for file in files:
+            self._index(file, by_name, by_id)
+        with self._lock:
+            self._by_name = by_name
+            self._by_id = by_id
+            self._set_fresh()
+
+    def snapshot(self) -> List[Dict]:
+        """
+        返回索引中全部文件（含同名文件）的快照，不触发刷新
+
+        Returns:
+            List[Dict]: 文件元数据列表
+        """
+        with self._lock:
+            return list(self._by_id.values())
+
+    def upsert(self, file: Dict):
+        """
+        增量加入或更新一个文件（来自变更通知）
+
+        Args:
+            file: 文件元数据
+        """
+        with self._lock:
+            previous = self._by_id.pop(file['id'], None)
+            if previous is not None:
+                self._drop_name(previous)
+            self._index(file, self._by_name, self._by_id)
+
+    def remove(self, file_id: str) -> Optional[Dict]:
+        """
+        增量移除一个文件（来自变更通知）
+
+        Args:
+            file_id: 文件ID
+
+        Returns:
+            Dict: 被移除文件的元数据，不在索引中时返回None
+        """
+        with self._lock:
+            previous = self._by_id.pop(file_id, None)
+            if previous is not None:
+                self._drop_name(previous)
+            return previous
+
+    def _drop_name(self, file: Dict):
+        """移除文件名映射；若还有同名文件，改为指向其中最新的一个"""
+        if self._by_name.get(file['name']) is not file:
+            return
+        del self._by_name[file['name']]
+        for other in self._by_id.values():
+            if other['name'] == file['name']:
+                self._index(other, self._by_name, {})
+
+    def lookup_id(self, file_id: str) -> Optional[Dict]:
+        """
+        按文件ID查找（不触发刷新）
+
+        Args:
+            file_id: 文件ID
+
+        Returns:
+            Dict: 文件元数据
+        """
+        with self._lock:
+            return self._by_id.get(file_id)
+
+    def mark_fresh(self):
+        """变更通知已同步时，将索引视为最新"""
+        with self._lock:
+            if self._loaded:
+                self._stale = False
+                self._refreshed_at = self._clock()
+
+    def get(self, name: str) -> Optional[Dict]:
+        """
+        按文件名查找文件元数据
+
+        Args:
+            name: 文件名
+
+        Returns:
+            Dict: 文件元数据，不存在时返回None
+        """
+        self.ensure_fresh()
+        with self._lock:
+            return self._by_name.get(name)
+
+    def files(self) -> List[Dict]:
+        """
+        返回索引中的全部文件
+
+        Returns:
+            List[Dict]: 文件元数据列表
+        """
+        self.ensure_fresh()
+        with self._lock:
+            return list(self._by_name.values())
@@ -0,0 +1,228 @@
+"""
+Drive变更监听 - 基于 changes.list 的增量同步
+保存 startPageToken，只拉取上次之后发生的变更，用来增量更新目录索引
+和周次缓存，而不必每次重新列出整个Shared Drive
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from disk_cache import DEFAULT_CACHE_DIR, atomic_write
+from drive_catalog import DriveCatalog
+
+CHANGE_FIELDS = (
+    "nextPageToken, newStartPageToken, "
+    "changes(fileId, removed, file(id, name, mimeType, size, md5Checksum, modifiedTime, parents, trashed))"
+)
+
+# 两次轮询之间的最小间隔（秒）
+DEFAULT_POLL_INTERVAL = float(os.getenv('GDRIVE_CHANGES_POLL_SECONDS', '30'))
+
+
+class DriveChangeWatcher:
+    """
+    Shared Drive变更监听器
+
+    首次轮询时获取startPageToken并完整刷新目录；之后每次轮询只处理
+    新增的变更，把属于目标文件夹的文件写入目录索引，并通过 on_change
+    回调通知变更的文件。页标记与目录快照一起保存在磁盘上，
+    新进程（例如 auto_sync 命令行）启动后也只需拉取增量。
+    """
+
+    def __init__(self,
+                 service_factory: Callable,
+                 catalog: DriveCatalog,
+                 folder_id: str,
+                 drive_id: str,
+                 state_path: Optional[str] = None,
+                 on_change: Optional[Callable[[List[Dict]], None]] = None,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            service_factory: 返回Drive服务对象的函数
+            catalog: 要增量更新的目录索引
+            folder_id: 监听的文件夹ID
+            drive_id: Shared Drive ID
+            state_path: 页标记与目录快照的保存位置
+            on_change: 有变更时调用，参数为变更的文件元数据列表
+            poll_interval: poll_if_due() 的最小间隔（秒）
+            clock: 时钟函数（便于测试替换）
+        """
+        self._service_factory = service_factory
+        self.catalog = catalog
+        self.folder_id = folder_id
+        self.drive_id = drive_id
+        self.state_path = Path(state_path or os.path.join(DEFAULT_CACHE_DIR, 'changes_state.json'))
+        self._listeners: List[Callable[[List[Dict]], None]] = [on_change] if on_change else []
+        self.poll_interval = poll_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._last_poll: Optional[float] = None
+        # 最近一次成功轮询的时间（time.time()）与最近一次失败的原因
+        self.last_success: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._token: Optional[str] = self._load_state()
+
+    def _load_state(self) -> Optional[str]:
+        """读取保存的页标记；目录尚未加载时顺便恢复目录快照"""
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get('drive_id') != self.drive_id or data.get('folder_id') != self.folder_id:
+            return None
+        if 'files' not in data:
+            return None
+        if not self.catalog.loaded:
+            self.catalog.load_snapshot(data['files'])
+        return data.get('page_token')
+
+    def _save_state(self, token: str):
+        self._token = token
+        try:
+            payload = {
+                'drive_id': self.drive_id,
+                'folder_id': self.folder_id,
+                'page_token': token,
+                'files': self.catalog.snapshot(),
+            }
+            atomic_write(self.state_path, json.dumps(payload, ensure_ascii=False).encode('utf-8'))
+        except OSError as e:
+            print(f"Error saving changes token: {e}")
+
+    def add_listener(self, listener: Callable[[List[Dict]], None]):
+        """
+        注册变更回调
+
+        Args:
+            listener: 参数为变更的文件元数据列表
+        """
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    @property
+    def page_token(self) -> Optional[str]:
+        """当前保存的页标记"""
+        return self._token
+
+    def _start_token(self, service) -> str:
+        response = service.changes().getStartPageToken(
+            driveId=self.drive_id,
+            supportsAllDrives=True
+        ).execute()
+        return response['startPageToken']
+
+    def _in_folder(self, file: Dict) -> bool:
+        return self.folder_id in (file.get('parents') or [])
+
+    def _apply(self, change: Dict) -> Optional[Dict]:
+        """把一条变更应用到目录索引，返回受影响的文件元数据"""
+        file_id = change.get('fileId')
+        file = change.get('file')
+
+        if change.get('removed') or not file or file.get('trashed') or not self._in_folder(file):
+            return self.catalog.remove(file_id)
+
+        file = {k: v for k, v in file.items() if k != 'trashed'}
+        previous = self.catalog.lookup_id(file_id)
+        if previous is not None and file_revision_equal(previous, file) and previous['name'] == file['name']:
+            return None
+        self.catalog.upsert(file)
+        return file
+
+    def poll(self) -> List[Dict]:
+        """
+        拉取并应用自上次轮询以来的变更
+
+        Returns:
+            List[Dict]: 目标文件夹中发生变化的文件
+        """
+        with self._lock:
+            self._last_poll = self._clock()
+            service = self._service_factory()
+            if service is None:
+                self.last_error = "Drive service unavailable"
+                return []
+
+            try:
+                if self._token is None or not self.catalog.loaded:
+                    # 先取token再完整列出，保证两者之间的变更不会丢失
+                    token = self._start_token(service)
+                    if self.catalog.refresh():
+                        self._save_state(token)
+                        self.last_success, self.last_error = time.time(), None
+                    else:
+                        self.last_error = "Drive listing failed"
+                    return []
+
+                changed = []
+                page_token = self._token
+                while page_token:
+                    response = service.changes().list(
+                        pageToken=page_token,
+                        driveId=self.drive_id,
+                        includeItemsFromAllDrives=True,
+                        supportsAllDrives=True,
+                        pageSize=1000,
+                        fields=CHANGE_FIELDS
+                    ).execute()
+                    for change in response.get('changes', []):
+                        affected = self._apply(change)
+                        if affected is not None:
+                            changed.append(affected)
+                    if 'newStartPageToken' in response:
+                        if changed or response['newStartPageToken'] != self._token:
+                            self._save_state(response['newStartPageToken'])
+                        break
+                    page_token = response.get('nextPageToken')
+
+                self.catalog.mark_fresh()
+                self.last_success, self.last_error = time.time(), None
+
+            except Exception as e:
+                print(f"Error polling Drive changes: {e}")
+                self.last_error = str(e)
+                # token可能已失效，下次轮询重新建立基线
+                self._token = None
+                return []
+
+        if changed:
+            for listener in list(self._listeners):
+                try:
+                    listener(changed)
+                except Exception as e:
+                    print(f"Error in Drive change listener: {e}")
+        return changed
+
+    def poll_if_due(self) -> List[Dict]:
+        """
+        距上次轮询超过 poll_interval 时才轮询
+
+        Returns:
+            List[Dict]: 发生变化的文件
+        """
+        last_poll = self._last_poll
+        if last_poll is not None and self._clock() - last_poll < self.poll_interval:
+            return []
+        return self.poll()
+
+
+def file_revision_equal(a: Dict, b: Dict) -> bool:
+    """
+    比较两份元数据是否为同一文件版本
+
+    Args:
+        a: 文件元数据
+        b: 文件元数据
+
+    Returns:
+        bool: md5Checksum与modifiedTime都一致时返回True
+    """
+    return a.get('md5Checksum') == b.get('md5Checksum') and \
+        a.get('modifiedTime') == b.get('modifiedTime')
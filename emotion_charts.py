@@ -21,6 +21,20 @@ COLOR_SCHEME = {
     'orange': '#FFA500'
 }
 
+# Opportunity matrix quadrants: (label, color key), in np.select order
+OPPORTUNITY_QUADRANTS = [
+    ('高优先级 (High Priority)', 'pink'),
+    ('潜力区 (Potential)', 'yellow'),
+    ('观察区 (Watch)', 'cyan'),
+    ('低优先级 (Low Priority)', 'red'),
+]
+
+# Above this many points the opportunity matrix switches to batched WebGL traces
+OPPORTUNITY_BATCH_THRESHOLD = 50
+
+# Batched mode only draws text labels up to this many points
+OPPORTUNITY_TEXT_LIMIT = 200
+
 def create_emotion_radar_chart(week3_data, week4_data):
     """
     创建12种情绪强度分布雷达图
@@ -145,48 +159,101 @@ def create_emotion_frequency_bar(emotion_data):
     return fig
 
 
-def create_emotion_opportunity_matrix(emotion_data):
+def _add_opportunity_traces_batched(fig, emotion_data):
     """
-    创建情绪强度 vs 商业潜力矩阵 (气泡图)
-    Emotion Intensity vs Commercial Potential Matrix
+    One Scattergl trace per quadrant; quadrants are computed with NumPy masks
+    and hover text comes from a template instead of per-row strings
     """
-    fig = go.Figure()
-    
-    # Add scatter points with different colors based on quadrant
-    for idx, row in emotion_data.iterrows():
-        # Determine quadrant and color
-        if row['intensity'] >= 5 and row['potential'] >= 5:
-            color = COLOR_SCHEME['pink']  # High priority
-            quadrant = '高优先级 (High Priority)'
-        elif row['intensity'] < 5 and row['potential'] >= 5:
-            color = COLOR_SCHEME['yellow']  # Potential
-            quadrant = '潜力区 (Potential)'
-        elif row['intensity'] >= 5 and row['potential'] < 5:
-            color = COLOR_SCHEME['cyan']  # Watch
-            quadrant = '观察区 (Watch)'
-        else:
-            color = COLOR_SCHEME['red']  # Low priority
-            quadrant = '低优先级 (Low Priority)'
-        
-        fig.add_trace(go.Scatter(
-            x=[row['intensity']],
-            y=[row['potential']],
-            mode='markers+text',
-            name=row['emotion'],
-            text=[row['emotion']],
+    intensity = emotion_data['intensity'].to_numpy(dtype=float)
+    potential = emotion_data['potential'].to_numpy(dtype=float)
+    quadrant_idx = np.select(
+        [(intensity >= 5) & (potential >= 5),
+         (intensity < 5) & (potential >= 5),
+         (intensity >= 5) & (potential < 5)],
+        [0, 1, 2],
+        default=3
+    )
+    names = emotion_data['emotion'].astype(str).to_numpy()
+    sizes = emotion_data['size'].to_numpy(dtype=float)
+    show_text = len(emotion_data) <= OPPORTUNITY_TEXT_LIMIT
+
+    for i, (quadrant, color_key) in enumerate(OPPORTUNITY_QUADRANTS):
+        mask = quadrant_idx == i
+        if not mask.any():
+            continue
+        fig.add_trace(go.Scattergl(
+            x=intensity[mask],
+            y=potential[mask],
+            mode='markers+text' if show_text else 'markers',
+            name=quadrant,
+            text=names[mask],
             textposition='top center',
             textfont=dict(size=10, color='white'),
             marker=dict(
-                size=row['size'],
-                color=color,
-                line=dict(width=2, color='white'),
+                size=sizes[mask],
+                color=COLOR_SCHEME[color_key],
+                line=dict(width=2 if show_text else 0, color='white'),
                 opacity=0.8
             ),
-            hovertemplate=f"<b>{row['emotion']}</b><br>" +
-                         f"情绪强度: {row['intensity']}<br>" +
-                         f"商业潜力: {row['potential']}<br>" +
-                         f"象限: {quadrant}<extra></extra>"
+            hovertemplate="<b>%{text}</b><br>" +
+                          "情绪强度: %{x}<br>" +
+                          "商业潜力: %{y}<br>" +
+                          f"象限: {quadrant}<extra></extra>"
         ))
+
+
+def create_emotion_opportunity_matrix(emotion_data, batched=None):
+    """
+    创建情绪强度 vs 商业潜力矩阵 (气泡图)
+    Emotion Intensity vs Commercial Potential Matrix
+
+    batched=None picks batched mode automatically above
+    OPPORTUNITY_BATCH_THRESHOLD points (four Scattergl traces instead of
+    one trace per row)
+    """
+    if batched is None:
+        batched = len(emotion_data) > OPPORTUNITY_BATCH_THRESHOLD
+
+    fig = go.Figure()
+    
+    if batched:
+        _add_opportunity_traces_batched(fig, emotion_data)
+    else:
+        # Add scatter points with different colors based on quadrant
+        for idx, row in emotion_data.iterrows():
+            # Determine quadrant and color
+            if row['intensity'] >= 5 and row['potential'] >= 5:
+                color = COLOR_SCHEME['pink']  # High priority
+                quadrant = '高优先级 (High Priority)'
+            elif row['intensity'] < 5 and row['potential'] >= 5:
+                color = COLOR_SCHEME['yellow']  # Potential
+                quadrant = '潜力区 (Potential)'
+            elif row['intensity'] >= 5 and row['potential'] < 5:
+                color = COLOR_SCHEME['cyan']  # Watch
+                quadrant = '观察区 (Watch)'
+            else:
+                color = COLOR_SCHEME['red']  # Low priority
+                quadrant = '低优先级 (Low Priority)'
+        
+            fig.add_trace(go.Scatter(
+                x=[row['intensity']],
+                y=[row['potential']],
+                mode='markers+text',
+                name=row['emotion'],
+                text=[row['emotion']],
+                textposition='top center',
+                textfont=dict(size=10, color='white'),
+                marker=dict(
+                    size=row['size'],
+                    color=color,
+                    line=dict(width=2, color='white'),
+                    opacity=0.8
+                ),
+                hovertemplate=f"<b>{row['emotion']}</b><br>" +
+                             f"情绪强度: {row['intensity']}<br>" +
+                             f"商业潜力: {row['potential']}<br>" +
+                             f"象限: {quadrant}<extra></extra>"
+            ))
     
     # Add quadrant lines
     fig.add_hline(y=5, line_dash="dash", line_color="rgba(255, 255, 255, 0.3)", line_width=2)
@@ -0,0 +1,322 @@
+"""
+数据导出
+导出文件按 (数据版本, 筛选条件, 格式) 缓存在磁盘上，只在用户点击时生成，
+同一筛选条件的后续请求直接复用。CSV以gzip压缩、Parquet按行组、
+XLSX以 constant_memory 模式逐行写出，均分块序列化，内存占用与导出行数无关
+"""
+
+import gzip
+import hashlib
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from week_store import PARQUET_AVAILABLE, PARQUET_COMPRESSION
+
+try:
+    import xlsxwriter
+    XLSX_AVAILABLE = True
+except ImportError:
+    XLSX_AVAILABLE = False
+
+DEFAULT_EXPORT_DIR = os.getenv('EXPORT_DIR', os.path.join('.cache', 'exports'))
+
+# 导出文件占用的磁盘上限（MB），超出时按最近使用时间淘汰
+DEFAULT_MAX_MB = float(os.getenv('EXPORT_CACHE_MAX_MB', '256'))
+
+# 每次序列化的行数
+CHUNK_ROWS = int(os.getenv('EXPORT_CHUNK_ROWS', '50000'))
+
+# gzip压缩级别（1最快，9压缩率最高）
+GZIP_LEVEL = int(os.getenv('EXPORT_GZIP_LEVEL', '3'))
+
+# Excel单个工作表的行数上限（含表头），超出部分写入续表
+XLSX_MAX_ROWS = 1_048_576
+
+# 格式 -> (显示名称, MIME类型)
+EXPORT_FORMATS = {
+    'csv.gz': ('CSV (gzip)', 'application/gzip'),
+    'parquet': ('Parquet', 'application/vnd.apache.parquet'),
+    'xlsx': ('Excel (XLSX)', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+}
+
+
+def available_formats() -> List[str]:
+    """当前环境可用的导出格式"""
+    formats = ['csv.gz']
+    if PARQUET_AVAILABLE:
+        formats.append('parquet')
+    if XLSX_AVAILABLE:
+        formats.append('xlsx')
+    return formats
+
+
+def export_key(revision: Optional[str], filters: Dict) -> str:
+    """
+    导出缓存键
+
+    Args:
+        revision: 导出数据实际读到的版本（例如 load_weeks() 结果的 attrs['revision']），
+            不应另行查询目录索引，否则文件更新期间可能把旧数据缓存在新版本下
+        filters: 决定导出内容的筛选/排序条件
+
+    Returns:
+        str: 缓存键（md5）
+    """
+    items = sorted((str(name), repr(value)) for name, value in filters.items())
+    return hashlib.md5(repr((revision, items)).encode('utf-8')).hexdigest()
+
+
+def _chunks(df: pd.DataFrame, rows: int = CHUNK_ROWS):
+    for start in range(0, len(df), rows):
+        yield df.iloc[start:start + rows]
+
+
+def write_csv_gz(df: pd.DataFrame, path: str):
+    """
+    分块写出gzip压缩的CSV（带BOM，Excel可直接识别中文）
+
+    Args:
+        df: 要导出的数据
+        path: 目标文件路径
+    """
+    with gzip.open(path, 'wt', encoding='utf-8-sig', newline='', compresslevel=GZIP_LEVEL) as f:
+        if df.empty:
+            df.to_csv(f, index=False)
+            return
+        for i, chunk in enumerate(_chunks(df)):
+            chunk.to_csv(f, index=False, header=(i == 0))
+
+
+def write_parquet(df: pd.DataFrame, path: str):
+    """
+    按行组写出Parquet
+
+    Args:
+        df: 要导出的数据
+        path: 目标文件路径
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    # 先由整表确定schema，避免各块推断出不同的类型
+    schema = pa.Schema.from_pandas(df.iloc[:0], preserve_index=False)
+    with pq.ParquetWriter(path, schema, compression=PARQUET_COMPRESSION) as writer:
+        for chunk in _chunks(df):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+def _excel_rows(chunk: pd.DataFrame):
+    """把一块数据转换为Excel可写入的行（空值写为空单元格，带时区的时间去掉时区）"""
+    chunk = chunk.copy()
+    for name in chunk.columns:
+        dtype = chunk[name].dtype
+        if isinstance(dtype, pd.DatetimeTZDtype):
+            chunk[name] = chunk[name].dt.tz_localize(None)
+        elif pd.api.types.is_float_dtype(dtype):
+            chunk[name] = chunk[name].where(np.isfinite(chunk[name]))
+    values = chunk.astype(object).where(chunk.notna(), None)
+    return values.itertuples(index=False, name=None)
+
+
+def write_xlsx(sheets: Dict[str, pd.DataFrame], path: str):
+    """
+    以 constant_memory 模式写出多工作表XLSX（每行写出后即刷新到临时文件）
+
+    Args:
+        sheets: 工作表名称 -> 数据，按顺序写出
+        path: 目标文件路径
+    """
+    workbook = xlsxwriter.Workbook(path, {'constant_memory': True, 'strings_to_urls': False,
+                                          'default_date_format': 'yyyy-mm-dd hh:mm:ss'})
+    try:
+        header_format = workbook.add_format({'bold': True})
+        for name, df in sheets.items():
+            part = 1
+            worksheet, row = None, XLSX_MAX_ROWS
+            if df.empty:
+                worksheet = workbook.add_worksheet(name[:31])
+                worksheet.write_row(0, 0, [str(col) for col in df.columns], header_format)
+                continue
+            for chunk in _chunks(df):
+                for values in _excel_rows(chunk):
+                    if row >= XLSX_MAX_ROWS:
+                        sheet_name = name if part == 1 else f"{name}_{part}"
+                        worksheet = workbook.add_worksheet(sheet_name[:31])
+                        worksheet.write_row(0, 0, [str(col) for col in df.columns], header_format)
+                        worksheet.freeze_panes(1, 0)
+                        part += 1
+                        row = 1
+                    worksheet.write_row(row, 0, values)
+                    row += 1
+    finally:
+        workbook.close()
+
+
+class ExportCache:
+    """
+    导出文件的磁盘缓存
+
+    文件名为 <缓存键>.<格式>，先写入临时文件再重命名；
+    每次命中时更新修改时间，总大小超出上限时删除最久未使用的文件。
+    """
+
+    def __init__(self, export_dir: str = DEFAULT_EXPORT_DIR,
+                 max_bytes: int = int(DEFAULT_MAX_MB * 1024 * 1024)):
+        """
+        Args:
+            export_dir: 导出文件目录
+            max_bytes: 导出文件的总字节数上限
+        """
+        self.export_dir = Path(export_dir)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # 导出文件名 -> [生成锁, 正在使用该锁的请求数]
+        self._building: Dict[str, list] = {}
+
+    def path(self, key: str, fmt: str) -> Path:
+        """导出文件的路径"""
+        return self.export_dir / f"{key}.{fmt}"
+
+    def get(self, key: str, fmt: str) -> Optional[Path]:
+        """
+        查找已生成的导出文件
+
+        Args:
+            key: export_key() 的结果
+            fmt: 导出格式
+
+        Returns:
+            Path: 文件路径，尚未生成时返回None
+        """
+        path = self.path(key, fmt)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def build(self, key: str, fmt: str, sheets_fn: Callable[[], Dict[str, pd.DataFrame]]) -> Path:
+        """
+        生成导出文件（已存在时直接返回）
+
+        Args:
+            key: export_key() 的结果
+            fmt: 导出格式（EXPORT_FORMATS 中的键）
+            sheets_fn: 返回 工作表名称 -> 数据 的函数；CSV和Parquet只导出第一个工作表
+
+        Returns:
+            Path: 导出文件路径
+        """
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format: {fmt}")
+
+        name = f"{key}.{fmt}"
+        with self._lock:
+            building = self._building.setdefault(name, [threading.Lock(), 0])
+            building[1] += 1
+        # 同一导出只生成一次，并发请求等待先到的请求完成；
+        # 锁在最后一个等待者离开后才移除，之后的请求不会拿到另一把锁
+        try:
+            with building[0]:
+                path = self.get(key, fmt)
+                if path is not None:
+                    return path
+                path = self._write(key, fmt, sheets_fn())
+        finally:
+            with self._lock:
+                building[1] -= 1
+                if building[1] == 0:
+                    del self._building[name]
+
+        self._evict(keep=path)
+        return path
+
+    def _write(self, key: str, fmt: str, sheets: Dict[str, pd.DataFrame]) -> Path:
+        """写入临时文件后重命名为导出文件"""
+        self.export_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=str(self.export_dir), prefix='.tmp-')
+        os.close(fd)
+        try:
+            if fmt == 'xlsx':
+                write_xlsx(sheets, tmp_path)
+            elif fmt == 'parquet':
+                write_parquet(next(iter(sheets.values())), tmp_path)
+            else:
+                write_csv_gz(next(iter(sheets.values())), tmp_path)
+            path = self.path(key, fmt)
+            os.replace(tmp_path, path)
+            return path
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def _evict(self, keep: Path):
+        """总大小超出上限时按修改时间从旧到新删除（刚生成的文件保留）"""
+        try:
+            entries = [(p.stat().st_mtime, p.stat().st_size, p)
+                       for p in self.export_dir.iterdir() if p.is_file() and not p.name.startswith('.tmp-')]
+        except OSError:
+            return
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                path.unlink()
+                total -= size
+            except OSError:
+                pass
+
+
+_export_cache: Optional[ExportCache] = None
+_export_cache_lock = threading.Lock()
+
+
+def get_export_cache() -> ExportCache:
+    """
+    获取进程级共享的导出缓存
+
+    Returns:
+        ExportCache: 导出缓存
+    """
+    global _export_cache
+    if _export_cache is None:
+        with _export_cache_lock:
+            if _export_cache is None:
+                _export_cache = ExportCache()
+    return _export_cache
+
+
+if __name__ == "__main__":
+    import time
+    import tracemalloc
+
+    rng = np.random.default_rng(0)
+    rows = 300_000
+    frame = pd.DataFrame({
+        'product_name': [f"Product {i}" for i in range(rows)],
+        'product_category': rng.choice(['Top Product', 'Watch Product', 'Other'], rows),
+        'total_score': rng.uniform(20, 60, rows),
+        'views': rng.integers(0, 1_000_000, rows),
+    })
+    cache = ExportCache(os.path.join(tempfile.gettempdir(), 'export-demo'))
+    key = export_key('demo', {'rows': rows})
+
+    for fmt in available_formats():
+        tracemalloc.start()
+        start = time.perf_counter()
+        path = cache.build(key, fmt, lambda: {'数据': frame, '说明': pd.DataFrame({'行数': [rows]})})
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{fmt:8s} {path.stat().st_size / 1e6:6.1f} MB in {elapsed:5.2f}s, "
+              f"peak Python memory {peak / 1e6:.1f} MB")
@@ -0,0 +1,256 @@
+"""
+本地Fake Drive - Google Drive API v3 的离线替身
+实现仪表板用到的 files().list/get_media/create 与
+changes().getStartPageToken/list，可直接替换 get_drive_service()
+的返回值，用于在没有凭证和网络的情况下演练缓存与变更同步
+"""
+
+import hashlib
+import itertools
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import httplib2
+
+FOLDER_MIME_TYPE = 'application/vnd.google-apps.folder'
+
+
+class _Request:
+    """模拟 HttpRequest，execute() 返回预先计算的结果"""
+
+    def __init__(self, fn):
+        self._fn = fn
+
+    def execute(self, num_retries: int = 0):
+        return self._fn()
+
+
+class _MediaHttp:
+    """响应 MediaIoBaseDownload 分块请求的伪HTTP连接"""
+
+    def __init__(self, drive: 'FakeDrive'):
+        self._drive = drive
+
+    def request(self, uri, method='GET', body=None, headers=None, **kwargs):
+        file_id = uri.rsplit('/', 1)[-1]
+        content = self._drive.content(file_id)
+        if content is None:
+            return httplib2.Response({'status': 404}), b''
+
+        start, end = 0, len(content) - 1
+        range_header = (headers or {}).get('range')
+        if range_header and range_header.startswith('bytes='):
+            first, last = range_header[len('bytes='):].split('-')
+            start, end = int(first), min(int(last), len(content) - 1)
+        chunk = content[start:end + 1]
+        response = httplib2.Response({
+            'status': 206,
+            'content-range': f"bytes {start}-{start + len(chunk) - 1}/{len(content)}",
+        })
+        return response, chunk
+
+
+class _MediaRequest:
+    """get_media() 的返回值，可交给 MediaIoBaseDownload 使用"""
+
+    def __init__(self, drive: 'FakeDrive', file_id: str):
+        self._drive = drive
+        self._file_id = file_id
+        self.uri = f"fake://drive/files/{file_id}"
+        self.http = _MediaHttp(drive)
+        self.headers = {}
+
+    def execute(self, num_retries: int = 0):
+        return self._drive.content(self._file_id)
+
+
+class _Files:
+    def __init__(self, drive: 'FakeDrive'):
+        self._drive = drive
+
+    def list(self, q: str = '', pageSize: int = 100, pageToken: Optional[str] = None, **kwargs):
+        return _Request(lambda: self._drive.list_page(q, pageSize, pageToken))
+
+    def get_media(self, fileId: str, **kwargs):
+        return _MediaRequest(self._drive, fileId)
+
+    def create(self, body: Dict, media_body=None, **kwargs):
+        def run():
+            content = b''
+            if media_body is not None:
+                content = media_body.getbytes(0, media_body.size())
+            parents = body.get('parents') or []
+            file = self._drive.put_file(body['name'], content,
+                                        parent=parents[0] if parents else None,
+                                        mime_type=body.get('mimeType'))
+            return {'id': file['id']}
+        return _Request(run)
+
+
+class _Changes:
+    def __init__(self, drive: 'FakeDrive'):
+        self._drive = drive
+
+    def getStartPageToken(self, **kwargs):
+        return _Request(lambda: {'startPageToken': str(self._drive.change_counter)})
+
+    def list(self, pageToken: str, pageSize: int = 100, **kwargs):
+        return _Request(lambda: self._drive.changes_page(pageToken, pageSize))
+
+
+class FakeDrive:
+    """
+    内存中的Shared Drive
+
+    每次 put_file/delete_file 都会写入变更日志，changes().list
+    按页标记返回其后的变更，与真实API的语义一致。
+    """
+
+    def __init__(self, root_id: str = 'fake-root', max_page_size: Optional[int] = None):
+        """
+        Args:
+            root_id: 根文件夹ID（对应 GDRIVE_FOLDER_ID）
+            max_page_size: files().list 每页最多返回的文件数（真实API可能少于请求的pageSize），
+                为None时按请求的pageSize返回
+        """
+        self.root_id = root_id
+        self.max_page_size = max_page_size
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._files: Dict[str, Dict] = {}
+        self._contents: Dict[str, bytes] = {}
+        self._changes: List[Dict] = []
+        self.list_calls = 0
+        self.download_calls = 0
+
+    @property
+    def change_counter(self) -> int:
+        """下一条变更的序号"""
+        return len(self._changes) + 1
+
+    def _record(self, file_id: str, removed: bool):
+        file = None if removed else dict(self._files[file_id])
+        self._changes.append({'fileId': file_id, 'removed': removed, 'file': file})
+
+    def put_file(self, name: str, content: bytes, parent: Optional[str] = None,
+                 mime_type: Optional[str] = None) -> Dict:
+        """
+        新建或覆盖同名文件
+
+        Args:
+            name: 文件名
+            content: 文件内容
+            parent: 父文件夹ID，默认根文件夹
+            mime_type: MIME类型
+
+        Returns:
+            Dict: 文件元数据
+        """
+        parent = parent or self.root_id
+        with self._lock:
+            existing = next((f for f in self._files.values()
+                             if f['name'] == name and parent in f['parents']), None)
+            file_id = existing['id'] if existing else f"fake-{next(self._ids)}"
+            file = {
+                'id': file_id,
+                'name': name,
+                'mimeType': mime_type or 'text/csv',
+                'parents': [parent],
+                'modifiedTime': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ'),
+            }
+            if file['mimeType'] != FOLDER_MIME_TYPE:
+                file['size'] = str(len(content))
+                file['md5Checksum'] = hashlib.md5(content).hexdigest()
+            self._files[file_id] = file
+            self._contents[file_id] = content
+            self._record(file_id, removed=False)
+            return dict(file)
+
+    def delete_file(self, file_id: str):
+        """
+        删除文件
+
+        Args:
+            file_id: 文件ID
+        """
+        with self._lock:
+            self._files.pop(file_id, None)
+            self._contents.pop(file_id, None)
+            self._record(file_id, removed=True)
+
+    def content(self, file_id: str) -> Optional[bytes]:
+        """返回文件内容（记录读取次数，分块下载时每块计一次）"""
+        with self._lock:
+            self.download_calls += 1
+            return self._contents.get(file_id)
+
+    def list_page(self, q: str, page_size: int, page_token: Optional[str]) -> Dict:
+        """按 "'<id>' in parents" 查询分页列出文件"""
+        with self._lock:
+            self.list_calls += 1
+            parent = q.split("'")[1] if "' in parents" in q else None
+            files = [dict(f) for f in self._files.values()
+                     if parent is None or parent in f['parents']]
+        if self.max_page_size:
+            page_size = min(page_size, self.max_page_size)
+        start = int(page_token or 0)
+        result = {'files': files[start:start + page_size]}
+        if start + page_size < len(files):
+            result['nextPageToken'] = str(start + page_size)
+        return result
+
+    def changes_page(self, page_token: str, page_size: int) -> Dict:
+        """返回页标记之后的变更"""
+        with self._lock:
+            start = int(page_token) - 1
+            changes = self._changes[start:start + page_size]
+            result = {'changes': [dict(c) for c in changes]}
+            if start + page_size < len(self._changes):
+                result['nextPageToken'] = str(start + page_size + 1)
+            else:
+                result['newStartPageToken'] = str(len(self._changes) + 1)
+            return result
+
+    def service(self) -> 'FakeDriveService':
+        """返回可替换 get_drive_service() 的服务对象"""
+        return FakeDriveService(self)
+
+
+class FakeDriveService:
+    """与 googleapiclient 的 Drive v3 Resource 接口兼容的最小实现"""
+
+    def __init__(self, drive: FakeDrive):
+        self._drive = drive
+
+    def files(self) -> _Files:
+        return _Files(self._drive)
+
+    def changes(self) -> _Changes:
+        return _Changes(self._drive)
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+    from drive_catalog import DriveCatalog
+    from drive_changes import DriveChangeWatcher
+    import data_manager_gdrive as gdrive
+
+    drive = FakeDrive(root_id=gdrive.GDRIVE_FOLDER_ID)
+    service = drive.service()
+    drive.put_file('All_Data_Week_04.csv', b'week_number,total_score\n4,50\n')
+
+    with tempfile.TemporaryDirectory() as state_dir:
+        catalog = DriveCatalog(lambda: gdrive.list_folder_pages(service, gdrive.GDRIVE_FOLDER_ID))
+        watcher = DriveChangeWatcher(lambda: service, catalog,
+                                     folder_id=gdrive.GDRIVE_FOLDER_ID, drive_id=gdrive.GDRIVE_ID,
+                                     state_path=os.path.join(state_dir, 'changes_state.json'))
+        watcher.poll()
+        print(f"Baseline: {[f['name'] for f in catalog.files()]}")
+
+        drive.put_file('All_Data_Week_05.csv', b'week_number,total_score\n5,48\n')
+        changed = watcher.poll()
+        print(f"Changed: {[f['name'] for f in changed]}")
+        print(f"Catalog: {sorted(f['name'] for f in catalog.files())}")
+        print(f"Folder listings: {drive.list_calls}")
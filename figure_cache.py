@@ -0,0 +1,170 @@
+"""
+跨会话的Plotly图表缓存
+以 (周次版本, 类别, 分数范围, 图表ID) 为键保存序列化后的图表JSON，
+查看同一周次、同一筛选条件的用户共享已生成的图表；按LRU淘汰并限制总内存
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+import plotly.graph_objects as go
+import plotly.io as pio
+
+# 缓存占用的内存上限（MB）
+DEFAULT_MAX_MB = float(os.getenv('FIGURE_CACHE_MAX_MB', '64'))
+
+
+def figure_key(revision: Optional[str],
+               category: Optional[str],
+               score_range: Optional[Tuple[float, float]],
+               chart_id: Hashable) -> Tuple:
+    """
+    图表缓存键
+
+    Args:
+        revision: 图表所用数据的版本（实际读到的数据的版本，见 data_access.load_week_frame()）
+        category: 当前类别筛选
+        score_range: 当前分数范围筛选
+        chart_id: 图表ID；依赖页面内其他控件时传入元组，如 ('fig_trend_3', 产品名)
+
+    Returns:
+        Tuple: 缓存键
+    """
+    if score_range is not None:
+        score_range = tuple(float(v) for v in score_range)
+    return (revision, category, score_range, chart_id)
+
+
+class FigureCache:
+    """
+    图表JSON的LRU缓存
+
+    只保存JSON字符串，命中时重新构造Figure，调用方拿到的是独立对象，
+    可以安全修改而不影响其他会话。
+    """
+
+    def __init__(self, max_bytes: int = int(DEFAULT_MAX_MB * 1024 * 1024)):
+        """
+        Args:
+            max_bytes: 缓存JSON的总字节数上限
+        """
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[Tuple, str]' = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple) -> Optional[go.Figure]:
+        """
+        读取缓存的图表
+
+        Args:
+            key: figure_key() 生成的键
+
+        Returns:
+            go.Figure: 图表，未命中时返回None
+        """
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return pio.from_json(payload)
+
+    def put(self, key: Tuple, fig: go.Figure):
+        """
+        保存图表（超过上限的单个图表不缓存）
+
+        Args:
+            key: figure_key() 生成的键
+            fig: 图表
+        """
+        payload = fig.to_json()
+        size = len(payload)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._entries[key] = payload
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def get_or_build(self, key: Tuple, build_fn: Callable[[], go.Figure]) -> go.Figure:
+        """
+        命中时返回缓存的图表，否则调用 build_fn 生成并缓存
+
+        Args:
+            key: figure_key() 生成的键
+            build_fn: 生成图表的函数
+
+        Returns:
+            go.Figure: 图表
+        """
+        fig = self.get(key)
+        if fig is not None:
+            return fig
+        fig = build_fn()
+        if fig is not None:
+            try:
+                self.put(key, fig)
+            except Exception as e:
+                print(f"Error caching figure {key[-1]}: {e}")
+        return fig
+
+    def invalidate(self, revision: Optional[str] = None):
+        """
+        清除缓存
+
+        Args:
+            revision: 只清除该数据版本的图表，为None时全部清除
+        """
+        with self._lock:
+            if revision is None:
+                self._entries.clear()
+                self._bytes = 0
+                return
+            for key in [k for k in self._entries if k[0] == revision]:
+                self._bytes -= len(self._entries.pop(key))
+
+    def stats(self) -> Dict:
+        """
+        缓存统计
+
+        Returns:
+            Dict: 条目数、占用字节数、命中与未命中次数
+        """
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+_figure_cache: Optional[FigureCache] = None
+_figure_cache_lock = threading.Lock()
+
+
+def get_figure_cache() -> FigureCache:
+    """
+    获取进程级共享的图表缓存（所有Streamlit会话共用）
+
+    Returns:
+        FigureCache: 缓存实例
+    """
+    global _figure_cache
+    if _figure_cache is None:
+        with _figure_cache_lock:
+            if _figure_cache is None:
+                _figure_cache = FigureCache()
+    return _figure_cache
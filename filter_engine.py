@@ -0,0 +1,173 @@
+"""
+侧边栏筛选索引
+每个数据版本预先计算一次：类别 -> 行位图，以及常用排序列的 argsort 排列。
+类别筛选只需查表，分数区间用 searchsorted 在有序值上定位，
+排序复用预先计算的排列，不再对整列做布尔运算、复制和重新排序
+"""
+
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# 预先计算排列的列
+SORT_COLUMNS = ['total_score', 'views', 'engagement_rate', 'emotion_score']
+
+# 类别筛选中表示不筛选的取值
+ALL_CATEGORIES = '全部'
+
+# 结果超过总行数的该比例时，排序改为按整体排列过滤（O(n)），否则对结果单独排序（O(k log k)）
+DENSE_RATIO = 0.125
+
+
+class _SortedColumn:
+    """一列的升序排列与对应的有序值（NaN排在最后）"""
+
+    __slots__ = ('order', 'values', 'valid', 'rank')
+
+    def __init__(self, series: pd.Series):
+        # 浮点列保留原精度，区间边界按列的精度比较（与 Series 比较运算一致）
+        dtype = series.dtype if pd.api.types.is_float_dtype(series.dtype) else np.float64
+        values = series.to_numpy(dtype=dtype, na_value=np.nan)
+        self.order = np.argsort(values, kind='stable').astype(np.int32)
+        self.values = values[self.order]
+        self.valid = int(np.count_nonzero(~np.isnan(values)))
+        # 每行在升序排列中的位置
+        self.rank = np.empty(len(values), dtype=np.int32)
+        self.rank[self.order] = np.arange(len(values), dtype=np.int32)
+
+    def range_positions(self, low: Optional[float], high: Optional[float]) -> np.ndarray:
+        values = self.values[:self.valid]
+        start = 0 if low is None else int(np.searchsorted(values, values.dtype.type(low), side='left'))
+        end = self.valid if high is None else int(np.searchsorted(values, values.dtype.type(high), side='right'))
+        return self.order[start:end]
+
+    def sorted_order(self, ascending: bool) -> np.ndarray:
+        if ascending:
+            return self.order
+        # 降序时NaN仍排在最后，与 DataFrame.sort_values 一致
+        return np.concatenate([self.order[:self.valid][::-1], self.order[self.valid:]])
+
+
+class FilterIndex:
+    """
+    单个DataFrame的筛选/排序索引
+
+    查询结果为行位置（0开始），调用方用 df.iloc[positions] 取出所需的行，
+    原DataFrame不被复制或修改。
+    """
+
+    def __init__(self, df: pd.DataFrame, category_column: str = 'product_category',
+                 sort_columns: Iterable[str] = SORT_COLUMNS):
+        """
+        Args:
+            df: 要建立索引的数据
+            category_column: 类别列
+            sort_columns: 需要排序/区间筛选的列（不存在的列会被跳过）
+        """
+        self.size = len(df)
+        self._categories: Dict[object, np.ndarray] = {}
+        if category_column in df.columns:
+            codes, uniques = pd.factorize(df[category_column])
+            for code, category in enumerate(uniques):
+                self._categories[category] = codes == code
+        self._columns: Dict[str, _SortedColumn] = {
+            column: _SortedColumn(df[column]) for column in sort_columns if column in df.columns
+        }
+
+    def __len__(self) -> int:
+        return self.size
+
+    def category_mask(self, category) -> Optional[np.ndarray]:
+        """
+        类别的行位图
+
+        Args:
+            category: 类别，ALL_CATEGORIES 或 None 表示不筛选
+
+        Returns:
+            np.ndarray: 布尔位图，不筛选时返回None
+        """
+        if category is None or category == ALL_CATEGORIES:
+            return None
+        mask = self._categories.get(category)
+        return mask if mask is not None else np.zeros(self.size, dtype=bool)
+
+    def positions(self, category=None, score_range: Optional[Tuple[float, float]] = None,
+                  score_column: str = 'total_score') -> np.ndarray:
+        """
+        按类别和分数区间筛选
+
+        Args:
+            category: 类别，ALL_CATEGORIES 或 None 表示不筛选
+            score_range: (最小值, 最大值) 闭区间，None 表示不筛选
+            score_column: 区间筛选的列
+
+        Returns:
+            np.ndarray: 符合条件的行位置（升序）
+        """
+        mask = self.category_mask(category)
+        if score_range is None or score_column not in self._columns:
+            if mask is None:
+                return np.arange(self.size, dtype=np.int32)
+            return np.flatnonzero(mask).astype(np.int32)
+
+        candidates = self._columns[score_column].range_positions(*score_range)
+        if mask is not None:
+            candidates = candidates[mask[candidates]]
+        return np.sort(candidates)
+
+    def sort(self, positions: np.ndarray, by: str, ascending: bool = False) -> np.ndarray:
+        """
+        按预先计算的排列对行位置排序
+
+        Args:
+            positions: positions() 的结果（或其子集）
+            by: 排序列（必须在 sort_columns 中）
+            ascending: 是否升序
+
+        Returns:
+            np.ndarray: 排序后的行位置
+        """
+        column = self._columns.get(by)
+        if column is None:
+            raise KeyError(f"No sort index for column: {by}")
+        if len(positions) > self.size * DENSE_RATIO:
+            keep = np.zeros(self.size, dtype=bool)
+            keep[positions] = True
+            order = column.sorted_order(ascending)
+            return order[keep[order]]
+        ranks = column.rank[positions]
+        ordered = positions[np.argsort(ranks, kind='stable')]
+        if ascending:
+            return ordered
+        # 降序：有效值倒序，NaN（rank >= valid）保持在最后
+        valid = np.count_nonzero(ranks < column.valid)
+        return np.concatenate([ordered[:valid][::-1], ordered[valid:]])
+
+
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(0)
+    rows = 1_000_000
+    frame = pd.DataFrame({
+        'product_category': pd.Categorical(rng.choice(['Top Product', 'Watch Product', 'Other'], rows)),
+        'total_score': rng.uniform(20, 60, rows).astype(np.float32),
+        'views': rng.integers(0, 1_000_000, rows),
+    })
+
+    start = time.perf_counter()
+    index = FilterIndex(frame)
+    print(f"Indexed {rows:,} rows in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    start = time.perf_counter()
+    positions = index.positions('Top Product', (55.0, 60.0))
+    ordered = index.sort(positions, 'views')
+    print(f"Filter + sort: {len(ordered):,} rows in {(time.perf_counter() - start) * 1000:.2f} ms")
+
+    start = time.perf_counter()
+    expected = frame[(frame['product_category'] == 'Top Product') &
+                     (frame['total_score'] >= 55.0) & (frame['total_score'] <= 60.0)].sort_values('views', ascending=False)
+    print(f"Pandas mask + sort_values: {(time.perf_counter() - start) * 1000:.2f} ms, "
+          f"same rows: {np.array_equal(np.sort(expected.index.to_numpy()), np.sort(ordered))}")
@@ -4,7 +4,18 @@ import plotly.graph_objects as go
 import pandas as pd
 import numpy as np
 
-def create_quadrant_matrix(df, x_col='avg_price', y_col='market_share', name_col='name', title='市场定位矩阵（四象限分析）'):
+# Above this many points the scatter is drawn with WebGL (Scattergl) and without text labels
+WEBGL_THRESHOLD = 2000
+
+# Above this many points the points are binned server-side into a density heatmap
+MAX_SCATTER_POINTS = 50000
+
+# Number of bins per axis for the density heatmap
+DENSITY_BINS = 150
+
+
+def create_quadrant_matrix(df, x_col='avg_price', y_col='market_share', name_col='name', title='市场定位矩阵（四象限分析）',
+                           webgl_threshold=WEBGL_THRESHOLD, max_points=MAX_SCATTER_POINTS, density_bins=DENSITY_BINS):
     """
     创建真正的四象限矩阵图
     
@@ -14,11 +25,18 @@ def create_quadrant_matrix(df, x_col='avg_price', y_col='market_share', name_col
         y_col: column name for y-axis (market share)
         name_col: column name for labels
         title: chart title
+        webgl_threshold: use Scattergl without text labels above this many points
+        max_points: draw a server-side density heatmap instead of points above this many points
+        density_bins: bins per axis for the density heatmap
     """
     
-    # Calculate medians for quadrant lines
-    median_x = df[x_col].median()
-    median_y = df[y_col].median()
+    # Medians and extents computed once on NumPy arrays (NaN ignored, like pandas)
+    x_values = df[x_col].to_numpy(dtype=float)
+    y_values = df[y_col].to_numpy(dtype=float)
+    median_x = float(np.nanmedian(x_values))
+    median_y = float(np.nanmedian(y_values))
+    x_min, x_max = float(np.nanmin(x_values)), float(np.nanmax(x_values))
+    y_min, y_max = float(np.nanmin(y_values)), float(np.nanmax(y_values))
     
     # Create figure
     fig = go.Figure()
@@ -27,8 +45,8 @@ def create_quadrant_matrix(df, x_col='avg_price', y_col='market_share', name_col
     # Quadrant 1: High price, High share (Top Right) - Leaders
     fig.add_shape(
         type="rect",
-        x0=median_x, x1=df[x_col].max() * 1.1,
-        y0=median_y, y1=df[y_col].max() * 1.1,
+        x0=median_x, x1=x_max * 1.1,
+        y0=median_y, y1=y_max * 1.1,
         fillcolor="rgba(144,238,144,0.2)",  # Light green
         line=dict(width=0),
         layer="below"
@@ -37,8 +55,8 @@ def create_quadrant_matrix(df, x_col='avg_price', y_col='market_share', name_col
     # Quadrant 2: Low price, High share (Top Left) - Challengers
     fig.add_shape(
         type="rect",
-        x0=df[x_col].min() * 0.9, x1=median_x,
-        y0=median_y, y1=df[y_col].max() * 1.1,
+        x0=x_min * 0.9, x1=median_x,
+        y0=median_y, y1=y_max * 1.1,
         fillcolor="rgba(173,216,230,0.2)",  # Light blue
         line=dict(width=0),
         layer="below"
@@ -47,8 +65,8 @@ def create_quadrant_matrix(df, x_col='avg_price', y_col='market_share', name_col
     # Quadrant 3: Low price, Low share (Bottom Left) - Followers
     fig.add_shape(
         type="rect",
-        x0=df[x_col].min() * 0.9, x1=median_x,
-        y0=df[y_col].min() * 0.9, y1=median_y,
+        x0=x_min * 0.9, x1=median_x,
+        y0=y_min * 0.9, y1=median_y,
         fillcolor="rgba(255,182,193,0.2)",  # Light pink/red
         line=dict(width=0),
         layer="below"
@@ -57,29 +75,48 @@ def create_quadrant_matrix(df, x_col='avg_price', y_col='market_share', name_col
     # Quadrant 4: High price, Low share (Bottom Right) - Niche
     fig.add_shape(
         type="rect",
-        x0=median_x, x1=df[x_col].max() * 1.1,
-        y0=df[y_col].min() * 0.9, y1=median_y,
+        x0=median_x, x1=x_max * 1.1,
+        y0=y_min * 0.9, y1=median_y,
         fillcolor="rgba(255,218,185,0.2)",  # Light orange
         line=dict(width=0),
         layer="below"
     )
     
     # Add scatter points
-    fig.add_trace(go.Scatter(
-        x=df[x_col],
-        y=df[y_col],
-        mode='markers+text',
-        text=df[name_col],
-        textposition='top center',
-        marker=dict(
-            size=15,
-            color='#2196F3',
-            line=dict(width=2, color='white')
-        ),
-        hovertemplate='<b>%{text}</b><br>' +
-                      f'{x_col}: %{{x:.2f}}<br>' +
-                      f'{y_col}: %{{y:.2f}}<extra></extra>'
-    ))
+    n_points = len(df)
+    if n_points > max_points:
+        _add_density_trace(fig, x_values, y_values, density_bins)
+    elif n_points > webgl_threshold:
+        fig.add_trace(go.Scattergl(
+            x=x_values,
+            y=y_values,
+            mode='markers',
+            text=df[name_col].astype(str).to_numpy(),
+            marker=dict(
+                size=6,
+                color='#2196F3',
+                opacity=0.6
+            ),
+            hovertemplate='<b>%{text}</b><br>' +
+                          f'{x_col}: %{{x:.2f}}<br>' +
+                          f'{y_col}: %{{y:.2f}}<extra></extra>'
+        ))
+    else:
+        fig.add_trace(go.Scatter(
+            x=df[x_col],
+            y=df[y_col],
+            mode='markers+text',
+            text=df[name_col],
+            textposition='top center',
+            marker=dict(
+                size=15,
+                color='#2196F3',
+                line=dict(width=2, color='white')
+            ),
+            hovertemplate='<b>%{text}</b><br>' +
+                          f'{x_col}: %{{x:.2f}}<br>' +
+                          f'{y_col}: %{{y:.2f}}<extra></extra>'
+        ))
     
     # Add quadrant dividing lines
     fig.add_hline(
@@ -101,10 +138,10 @@ def create_quadrant_matrix(df, x_col='avg_price', y_col='market_share', name_col
     
     # Add quadrant labels
     # Calculate positions for labels
-    x_high = median_x + (df[x_col].max() - median_x) * 0.5
-    x_low = df[x_col].min() + (median_x - df[x_col].min()) * 0.5
-    y_high = median_y + (df[y_col].max() - median_y) * 0.5
-    y_low = df[y_col].min() + (median_y - df[y_col].min()) * 0.5
+    x_high = median_x + (x_max - median_x) * 0.5
+    x_low = x_min + (median_x - x_min) * 0.5
+    y_high = median_y + (y_max - median_y) * 0.5
+    y_low = y_min + (median_y - y_min) * 0.5
     
     # Quadrant 1: Leaders (Top Right)
     fig.add_annotation(
@@ -181,6 +218,26 @@ def create_quadrant_matrix(df, x_col='avg_price', y_col='market_share', name_col
     return fig
 
 
+def _add_density_trace(fig, x_values, y_values, bins):
+    """
+    Bin points server-side with np.histogram2d and draw the counts as a heatmap;
+    empty bins are left transparent so the quadrant backgrounds stay visible
+    """
+    finite = np.isfinite(x_values) & np.isfinite(y_values)
+    counts, x_edges, y_edges = np.histogram2d(x_values[finite], y_values[finite], bins=bins)
+    z = counts.T
+    z = np.where(z > 0, z, np.nan)
+    fig.add_trace(go.Heatmap(
+        x=(x_edges[:-1] + x_edges[1:]) / 2,
+        y=(y_edges[:-1] + y_edges[1:]) / 2,
+        z=z,
+        colorscale='Blues',
+        opacity=0.85,
+        colorbar=dict(title='产品数'),
+        hovertemplate='x: %{x:.2f}<br>y: %{y:.2f}<br>产品数: %{z}<extra></extra>'
+    ))
+
+
 # Code to insert into dashboard.py at line 902:
 MATRIX_REPLACEMENT = '''
         # 使用增强的四象限矩阵
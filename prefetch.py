@@ -0,0 +1,227 @@
+"""
+相邻周次预取
+用户选中某一周后，在后台线程池中把前后相邻的周次下载并解析进周次缓存，
+逐周切换时直接命中缓存。缓存占用超过内存预算时不再预取
+（预算不超过周次缓存自身的LRU上限）；
+同一用户切换到其他周次后，尚未开始的旧预取任务被取消
+"""
+
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from data_access import get_week_cache
+
+# 预取线程数
+DEFAULT_MAX_WORKERS = int(os.getenv('PREFETCH_MAX_WORKERS', '2'))
+
+# 周次缓存的内存预算（MB），超出后不再预取
+DEFAULT_BUDGET_MB = float(os.getenv('PREFETCH_MEMORY_BUDGET_MB', '512'))
+
+# 预取当前周次前后各几周
+DEFAULT_RADIUS = int(os.getenv('PREFETCH_RADIUS', '1'))
+
+
+def adjacent_weeks(available: Iterable[int], current: int, radius: int = DEFAULT_RADIUS) -> List[int]:
+    """
+    当前周次前后相邻的周次（按距离由近到远，同一距离先上一周再下一周）
+
+    Args:
+        available: 可用周次
+        current: 当前周次
+        radius: 前后各取几周
+
+    Returns:
+        List[int]: 相邻周次，当前周次不在可用周次中时为空列表
+    """
+    weeks = sorted(set(available))
+    if current not in weeks:
+        return []
+    position = weeks.index(current)
+    neighbours = []
+    for distance in range(1, radius + 1):
+        for index in (position - distance, position + distance):
+            if 0 <= index < len(weeks):
+                neighbours.append(weeks[index])
+    return neighbours
+
+
+class WeekPrefetcher:
+    """
+    后台预取相邻周次
+
+    每个调用方（owner，例如一个Streamlit会话）有一个代次编号，每次 schedule()
+    代次加一并取消该调用方尚未开始的任务；已开始的任务在下载前再次检查代次，
+    过期则直接返回。正在下载的任务不会被中断，结果照常写入缓存。
+    """
+
+    def __init__(self, load_fn: Callable[[int, Optional[List[str]]], object],
+                 memory_fn: Callable[[Optional[int]], int],
+                 max_workers: int = DEFAULT_MAX_WORKERS,
+                 budget_bytes: int = int(DEFAULT_BUDGET_MB * 1024 * 1024),
+                 radius: int = DEFAULT_RADIUS):
+        """
+        Args:
+            load_fn: 加载某周指定列并写入缓存的函数
+            memory_fn: 返回缓存占用字节数的函数，参数为周次（None表示全部周次）
+            max_workers: 预取线程数
+            budget_bytes: 缓存的内存预算
+            radius: 预取当前周次前后各几周
+        """
+        self._load_fn = load_fn
+        self._memory_fn = memory_fn
+        self.budget_bytes = budget_bytes
+        self.radius = radius
+        self._pool = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix='week-prefetch')
+        self._lock = threading.Lock()
+        # 调用方 -> (代次, 尚未完成的任务)
+        self._owners: Dict[str, Tuple[int, List[Future]]] = {}
+        self.completed = 0
+        self.cancelled = 0
+        self.over_budget = 0
+
+    def _current(self, owner: str, generation: int) -> bool:
+        with self._lock:
+            state = self._owners.get(owner)
+            return state is not None and state[0] == generation
+
+    def _prefetch(self, owner: str, generation: int, week_number: int,
+                  columns: Optional[List[str]], size_hint: int):
+        if not self._current(owner, generation):
+            with self._lock:
+                self.cancelled += 1
+            return
+        if self._memory_fn(None) + size_hint > self.budget_bytes:
+            with self._lock:
+                self.over_budget += 1
+            return
+        try:
+            self._load_fn(week_number, columns)
+            with self._lock:
+                self.completed += 1
+        except Exception as e:
+            print(f"Error prefetching week {week_number}: {e}")
+
+    def schedule(self, current: int, available: Iterable[int],
+                 columns: Optional[Iterable[str]] = None, owner: str = 'default') -> List[int]:
+        """
+        取消该调用方之前的预取，并开始预取当前周次的相邻周次
+
+        Args:
+            current: 当前选中的周次
+            available: 可用周次
+            columns: 预取的列（与当前周次加载的列一致），为None时预取全部列
+            owner: 调用方标识
+
+        Returns:
+            List[int]: 提交预取的周次
+        """
+        columns = list(dict.fromkeys(columns)) if columns is not None else None
+        weeks = adjacent_weeks(available, current, self.radius)
+        # 相邻周次的大小按当前周次估计
+        size_hint = self._memory_fn(current)
+
+        with self._lock:
+            generation, pending = self._owners.get(owner, (0, []))
+            for future in pending:
+                if future.cancel():
+                    self.cancelled += 1
+            generation += 1
+            # 清理任务已全部结束的调用方
+            for name in [name for name, (_, futures) in self._owners.items()
+                         if name != owner and all(f.done() for f in futures)]:
+                del self._owners[name]
+            self._owners[owner] = (generation, [])
+
+        futures = [self._pool.submit(self._prefetch, owner, generation, week, columns, size_hint)
+                   for week in weeks]
+        with self._lock:
+            if self._owners.get(owner, (None,))[0] == generation:
+                self._owners[owner] = (generation, futures)
+        return weeks
+
+    def cancel(self, owner: str = 'default'):
+        """
+        取消调用方尚未开始的预取
+
+        Args:
+            owner: 调用方标识
+        """
+        with self._lock:
+            state = self._owners.pop(owner, None)
+            if state is None:
+                return
+            for future in state[1]:
+                if future.cancel():
+                    self.cancelled += 1
+
+    def stats(self) -> Dict[str, int]:
+        """预取计数：完成、取消、因内存预算跳过"""
+        with self._lock:
+            return {'completed': self.completed, 'cancelled': self.cancelled,
+                    'over_budget': self.over_budget}
+
+
+_prefetcher: Optional[WeekPrefetcher] = None
+_prefetcher_lock = threading.Lock()
+
+
+def get_prefetcher() -> WeekPrefetcher:
+    """
+    获取进程级共享的预取器（写入 data_access 的周次缓存）
+
+    Returns:
+        WeekPrefetcher: 预取器
+    """
+    global _prefetcher
+    if _prefetcher is None:
+        with _prefetcher_lock:
+            if _prefetcher is None:
+                cache = get_week_cache()
+                budget = int(DEFAULT_BUDGET_MB * 1024 * 1024)
+                if cache.max_bytes is not None:
+                    budget = min(budget, cache.max_bytes)
+                _prefetcher = WeekPrefetcher(cache.get, cache.memory_bytes, budget_bytes=budget)
+    return _prefetcher
+
+
+def prefetch_adjacent_weeks(current: int, available: Iterable[int],
+                            columns: Optional[Iterable[str]] = None, owner: str = 'default') -> List[int]:
+    """
+    在后台预取当前周次前后的周次
+
+    Args:
+        current: 当前选中的周次
+        available: 可用周次
+        columns: 预取的列
+        owner: 调用方标识（例如会话ID），切换周次时只取消该调用方的旧预取
+
+    Returns:
+        List[int]: 提交预取的周次
+    """
+    return get_prefetcher().schedule(current, available, columns, owner)
+
+
+if __name__ == "__main__":
+    import time
+    import pandas as pd
+    from data_access import WeekDataCache
+
+    def fake_fetch(week_number, file_info, columns):
+        time.sleep(0.5)
+        return pd.DataFrame({'week_number': [week_number] * 1000, 'total_score': range(1000)})
+
+    cache = WeekDataCache(info_fn=lambda week: {'md5Checksum': f'w{week}'}, fetch_fn=fake_fetch)
+    prefetcher = WeekPrefetcher(cache.get, cache.memory_bytes, max_workers=1)
+
+    cache.get(5)
+    print(f"Prefetching {prefetcher.schedule(5, range(1, 10))}")
+    time.sleep(0.1)
+    # 单线程时周次6尚未开始，切换周次后被取消
+    print(f"Switched to week 8, prefetching {prefetcher.schedule(8, range(1, 10))}")
+    time.sleep(1.5)
+
+    start = time.perf_counter()
+    cache.get(9)
+    print(f"Week 9 from cache in {(time.perf_counter() - start) * 1000:.2f} ms, stats: {prefetcher.stats()}")
@@ -0,0 +1,329 @@
+"""
+跨周产品标识索引
+把 tiktok_url / product_url 规范化后哈希成稳定的产品键，维护
+产品键 -> [(周次, 行号)] 的倒排表。每周数据按文件版本增量写入，
+查询某个产品在各周的表现只需一次字典访问
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import pandas as pd
+
+from disk_cache import atomic_write
+
+# 用于识别产品的列，按优先级排列
+URL_COLUMNS = ['tiktok_url', 'product_url']
+
+# 建立索引需要读取的列
+IDENTITY_COLUMNS = URL_COLUMNS + ['product_name']
+
+DEFAULT_INDEX_PATH = os.getenv('PRODUCT_INDEX_PATH', os.path.join('.cache', 'identity', 'product_index.json'))
+
+
+def source_index_path(source: str, path: str = DEFAULT_INDEX_PATH) -> str:
+    """
+    某个数据来源（Drive/本地）的索引文件路径，不同来源的行号互不通用
+
+    Args:
+        source: 数据来源，例如 'drive' 或 'local'
+        path: 基础路径
+
+    Returns:
+        str: 例如 .cache/identity/drive/product_index.json
+    """
+    return os.path.join(os.path.dirname(path), source, os.path.basename(path))
+
+
+_TIKTOK_VIDEO = re.compile(r'^/@[^/]+/video/(\d+)')
+
+
+def canonical_url(url) -> Optional[str]:
+    """
+    规范化产品链接：去掉协议、www/m 前缀、查询参数、锚点和结尾斜杠，
+    TikTok视频链接只保留视频ID
+
+    Args:
+        url: 原始链接
+
+    Returns:
+        str: 规范化后的链接，无效时返回None
+    """
+    if url is None or url != url:
+        return None
+    url = str(url).strip()
+    if not url:
+        return None
+    if '://' not in url:
+        url = 'https://' + url
+    parts = urlsplit(url)
+    host = parts.netloc.lower().split('@')[-1].split(':')[0]
+    for prefix in ('www.', 'm.'):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    if not host:
+        return None
+    path = parts.path.rstrip('/')
+    if host == 'tiktok.com':
+        match = _TIKTOK_VIDEO.match(path)
+        if match:
+            return f"tiktok.com/video/{match.group(1)}"
+    return f"{host}{path}"
+
+
+def product_key(row: Dict) -> Optional[str]:
+    """
+    计算一行数据的产品键：优先使用规范化链接，没有链接时退回规范化名称
+
+    Args:
+        row: 包含 URL_COLUMNS / product_name 的行
+
+    Returns:
+        str: 16位十六进制产品键，无法识别时返回None
+    """
+    for column in URL_COLUMNS:
+        canonical = canonical_url(row.get(column))
+        if canonical:
+            return hashlib.sha1(canonical.encode('utf-8')).hexdigest()[:16]
+    name = row.get('product_name')
+    if name is None or name != name or not str(name).strip():
+        return None
+    normalized = ' '.join(str(name).casefold().split())
+    return hashlib.sha1(f"name:{normalized}".encode('utf-8')).hexdigest()[:16]
+
+
+def frame_keys(df: pd.DataFrame) -> List[Optional[str]]:
+    """
+    计算周次数据中每一行的产品键
+
+    Args:
+        df: 周次数据（至少包含 IDENTITY_COLUMNS 中的一列）
+
+    Returns:
+        List[Optional[str]]: 与行一一对应的产品键
+    """
+    columns = [col for col in IDENTITY_COLUMNS if col in df.columns]
+    records = df[columns].astype(object).to_dict('records') if columns else [{}] * len(df)
+    return [product_key(record) for record in records]
+
+
+class ProductIdentityIndex:
+    """
+    产品键 -> [(周次, 行号)] 倒排表
+
+    记录每个周次写入时的文件版本；sync() 只重新写入版本变化的周次，
+    并删除已不存在的周次。索引以JSON保存在磁盘上，重启后无需重建。
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path: 索引文件路径
+        """
+        self.path = Path(path or DEFAULT_INDEX_PATH)
+        self._lock = threading.Lock()
+        self._postings: Dict[str, List[Tuple[int, int]]] = {}
+        self._week_keys: Dict[int, List[Optional[str]]] = {}
+        self._revisions: Dict[int, str] = {}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        # 按周次顺序写入，使倒排表保持按周次排序（JSON中的周次顺序不固定）
+        for week, keys in sorted(data.get('weeks', {}).items(), key=lambda item: int(item[0])):
+            self._add_week(int(week), keys)
+        self._revisions = {int(w): rev for w, rev in data.get('revisions', {}).items()}
+
+    def save(self):
+        """把索引写入磁盘"""
+        with self._lock:
+            payload = {
+                'revisions': {str(w): rev for w, rev in self._revisions.items()},
+                'weeks': {str(w): keys for w, keys in sorted(self._week_keys.items())},
+            }
+        try:
+            atomic_write(self.path, json.dumps(payload).encode('utf-8'))
+        except OSError as e:
+            print(f"Error saving product identity index: {e}")
+
+    def _add_week(self, week_number: int, keys: List[Optional[str]]):
+        self._week_keys[week_number] = keys
+        for row, key in enumerate(keys):
+            if key is not None:
+                self._postings.setdefault(key, []).append((week_number, row))
+
+    def _drop_week(self, week_number: int):
+        for key in set(self._week_keys.pop(week_number, [])):
+            if key is None:
+                continue
+            remaining = [p for p in self._postings.get(key, []) if p[0] != week_number]
+            if remaining:
+                self._postings[key] = remaining
+            else:
+                self._postings.pop(key, None)
+
+    def ingest_week(self, week_number: int, df: pd.DataFrame, revision: Optional[str] = None):
+        """
+        写入（或替换）一个周次的数据
+
+        Args:
+            week_number: 周次编号
+            df: 周次数据
+            revision: 文件版本
+        """
+        keys = frame_keys(df)
+        with self._lock:
+            self._drop_week(week_number)
+            self._add_week(week_number, keys)
+            for key in set(k for k in keys if k is not None):
+                self._postings[key].sort()
+            if revision is not None:
+                self._revisions[week_number] = revision
+
+    def remove_week(self, week_number: int):
+        """
+        删除一个周次
+
+        Args:
+            week_number: 周次编号
+        """
+        with self._lock:
+            self._drop_week(week_number)
+            self._revisions.pop(week_number, None)
+
+    def sync(self, revisions: Dict[int, str],
+             load_fn: Callable[[int], Tuple[Optional[pd.DataFrame], Optional[str]]]) -> List[int]:
+        """
+        按文件版本增量同步
+
+        Args:
+            revisions: 周次 -> 当前文件版本（data_access.week_revisions() 的结果）
+            load_fn: 读取某周 IDENTITY_COLUMNS 的函数，返回 (数据, 实际读到的文件版本)；
+                记录的是实际读到的版本，文件在查询版本之后被替换时下次同步会重新写入
+
+        Returns:
+            List[int]: 重新写入或删除的周次
+        """
+        with self._lock:
+            known = dict(self._revisions)
+        changed = []
+        for week_number in [w for w in known if w not in revisions]:
+            self.remove_week(week_number)
+            changed.append(week_number)
+        for week_number, revision in sorted(revisions.items()):
+            if known.get(week_number) == revision:
+                continue
+            df, served = load_fn(week_number)
+            if df is None:
+                continue
+            self.ingest_week(week_number, df, served or revision)
+            changed.append(week_number)
+        if changed:
+            self.save()
+        return sorted(changed)
+
+    def weeks(self) -> List[int]:
+        """已写入的周次"""
+        with self._lock:
+            return sorted(self._week_keys)
+
+    def revisions(self) -> Dict[int, str]:
+        """已写入各周的文件版本"""
+        with self._lock:
+            return dict(self._revisions)
+
+    def key_at(self, week_number: int, row: int) -> Optional[str]:
+        """
+        某周某行的产品键
+
+        Args:
+            week_number: 周次编号
+            row: 行号（从0开始的位置）
+
+        Returns:
+            str: 产品键
+        """
+        with self._lock:
+            keys = self._week_keys.get(week_number)
+            if keys is None or not 0 <= row < len(keys):
+                return None
+            return keys[row]
+
+    def lookup(self, key: Optional[str]) -> List[Tuple[int, int]]:
+        """
+        产品出现过的全部 (周次, 行号)，按周次排序
+
+        Args:
+            key: 产品键
+
+        Returns:
+            List[Tuple[int, int]]: 出现位置
+        """
+        if key is None:
+            return []
+        with self._lock:
+            return list(self._postings.get(key, []))
+
+    def lookup_row(self, row: Dict) -> List[Tuple[int, int]]:
+        """
+        按一行数据（链接/名称）查找该产品的全部出现位置
+
+        Args:
+            row: 包含 URL_COLUMNS / product_name 的行
+
+        Returns:
+            List[Tuple[int, int]]: 出现位置
+        """
+        return self.lookup(product_key(row))
+
+
+def product_history(index: ProductIdentityIndex, key: str,
+                    load_fn: Callable[[int], Optional[pd.DataFrame]]) -> pd.DataFrame:
+    """
+    按倒排表取出某产品在各周的数据行
+
+    Args:
+        index: 产品标识索引
+        key: 产品键
+        load_fn: 读取某周数据（所需列）的函数
+
+    Returns:
+        pd.DataFrame: 每周一行，含 week_number 列
+    """
+    rows = []
+    for week_number, row in index.lookup(key):
+        df = load_fn(week_number)
+        if df is None or row >= len(df):
+            continue
+        rows.append(df.iloc[row].to_dict() | {'week_number': week_number})
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    from data_access import local_file_revision, week_revisions
+    from week_store import local_week_files, read_week_file
+
+    files = local_week_files('reports')
+
+    def load_identity_columns(week):
+        revision = local_file_revision(files[week])
+        return read_week_file(files[week], IDENTITY_COLUMNS), revision
+
+    index = ProductIdentityIndex(source_index_path('local'))
+    changed = index.sync(week_revisions(source='local'), load_identity_columns)
+    print(f"Ingested weeks: {changed or 'none (up to date)'}")
+    for week_number in index.weeks():
+        df = read_week_file(files[week_number], IDENTITY_COLUMNS)
+        for row in range(min(3, len(df))):
+            key = index.key_at(week_number, row)
+            print(f"W{week_number:02d} row {row}: {key} -> {index.lookup(key)}")
@@ -0,0 +1,301 @@
+"""
+周次汇总表
+每个周次按 (类别, 平台) 预先计算行数以及各指标的计数、合计、均值、
+最小值、最大值和分位数，并带上按类别、按平台和整周的汇总行。
+汇总表按文件版本持久化，周次变化时只重新计算该周；
+历史趋势图只读取汇总表，耗时与原始行数无关
+"""
+
+import io
+import itertools
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+from disk_cache import atomic_write
+from week_store import PARQUET_AVAILABLE, PARQUET_COMPRESSION
+
+DEFAULT_ROLLUP_DIR = os.getenv('ROLLUP_DIR', os.path.join('.cache', 'rollups'))
+
+# 分组维度
+ROLLUP_DIMENSIONS = ['product_category', 'platform']
+
+# 汇总的指标
+ROLLUP_METRICS = ['total_score', 'views', 'likes', 'engagement_rate', 'emotion_score']
+
+# 计算汇总需要读取的列
+ROLLUP_COLUMNS = ROLLUP_DIMENSIONS + ROLLUP_METRICS
+
+QUANTILES = [0.25, 0.5, 0.75, 0.9]
+
+# 汇总行在维度列上的取值（表示"全部"）
+ALL = '__all__'
+
+
+def source_rollup_dir(source: str, rollup_dir: str = DEFAULT_ROLLUP_DIR) -> str:
+    """
+    某个数据来源的汇总表目录。相对路径按本模块所在目录（仪表盘根目录）解析，
+    仪表盘和上传脚本无论从哪个工作目录启动都读写同一目录
+
+    Args:
+        source: 数据来源，例如 'drive' 或 'local'
+        rollup_dir: 基础目录
+
+    Returns:
+        str: 例如 <仪表盘根目录>/.cache/rollups/drive
+    """
+    root = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(root, rollup_dir, source)
+
+
+def _metric_stats(grouped, metrics: List[str]) -> pd.DataFrame:
+    stats = grouped[metrics].agg(['count', 'sum', 'mean', 'min', 'max'])
+    stats.columns = [f"{metric}_{stat}" for metric, stat in stats.columns]
+    quantiles = grouped[metrics].quantile(QUANTILES).unstack()
+    quantiles.columns = [f"{metric}_p{round(q * 100)}" for metric, q in quantiles.columns]
+    return pd.concat([stats, quantiles], axis=1)
+
+
+def compute_rollup(df: pd.DataFrame, week_number: int) -> pd.DataFrame:
+    """
+    计算一个周次的汇总表
+
+    Args:
+        df: 周次数据（文件中不存在的维度/指标会被跳过）
+        week_number: 周次编号
+
+    Returns:
+        pd.DataFrame: 每个 (类别, 平台) 组合一行，另含维度为 ALL 的汇总行；
+            列为 week_number、维度、count 以及 "<指标>_<统计量>"
+    """
+    dimensions = [dim for dim in ROLLUP_DIMENSIONS if dim in df.columns]
+    metrics = [m for m in ROLLUP_METRICS if m in df.columns]
+    frame = df[dimensions + metrics].copy()
+    for dim in dimensions:
+        frame[dim] = frame[dim].astype(object).where(frame[dim].notna(), '未知').astype(str)
+    for metric in metrics:
+        frame[metric] = pd.to_numeric(frame[metric], errors='coerce').astype('float64')
+
+    parts = []
+    for size in range(len(dimensions), -1, -1):
+        for keys in itertools.combinations(dimensions, size):
+            if keys:
+                grouped = frame.groupby(list(keys), sort=True)
+            else:
+                grouped = frame.groupby(pd.Series(ALL, index=frame.index, name='_all'))
+            part = pd.concat([grouped.size().rename('count'), _metric_stats(grouped, metrics)], axis=1)
+            part = part.reset_index(drop=not keys)
+            for dim in ROLLUP_DIMENSIONS:
+                if dim not in keys:
+                    part[dim] = ALL
+            parts.append(part)
+
+    rollup = pd.concat(parts, ignore_index=True)
+    rollup.insert(0, 'week_number', week_number)
+    leading = ['week_number'] + ROLLUP_DIMENSIONS + ['count']
+    return rollup[leading + [col for col in rollup.columns if col not in leading]]
+
+
+def select(rollups: pd.DataFrame, category: Optional[str] = ALL,
+           platform: Optional[str] = ALL) -> pd.DataFrame:
+    """
+    从汇总表中取某个粒度的行
+
+    Args:
+        rollups: 汇总表
+        category: 类别；ALL 取全部类别的汇总行，None 取各类别的明细行
+        platform: 平台；ALL 取全部平台的汇总行，None 取各平台的明细行
+
+    Returns:
+        pd.DataFrame: 符合条件的行，按周次排序
+    """
+    mask = pd.Series(True, index=rollups.index)
+    for dim, value in (('product_category', category), ('platform', platform)):
+        mask &= (rollups[dim] != ALL) if value is None else (rollups[dim] == value)
+    return rollups[mask].sort_values('week_number').reset_index(drop=True)
+
+
+class WeekRollups:
+    """
+    按周次管理汇总表
+
+    内存中按 (周次, 版本) 缓存；磁盘上每个周次保存一个Parquet文件
+    （记录计算时的文件版本），版本一致时直接读取，否则重新计算。
+    """
+
+    def __init__(self, load_fn: Callable[[int], Optional[pd.DataFrame]],
+                 rollup_dir: str = DEFAULT_ROLLUP_DIR):
+        """
+        Args:
+            load_fn: 读取某周 ROLLUP_COLUMNS 的函数
+            rollup_dir: 汇总表保存目录
+        """
+        self._load_fn = load_fn
+        self.rollup_dir = Path(rollup_dir)
+        self._lock = threading.Lock()
+        self._rollups: Dict[int, tuple] = {}
+
+    def rollup_path(self, week_number: int) -> Path:
+        """周次汇总表文件的路径"""
+        return self.rollup_dir / f"All_Data_Week_{week_number:02d}.rollup.parquet"
+
+    def _read(self, week_number: int, revision: str) -> Optional[pd.DataFrame]:
+        path = self.rollup_path(week_number)
+        if not PARQUET_AVAILABLE or not path.exists():
+            return None
+        try:
+            rollup = pd.read_parquet(path)
+        except Exception as e:
+            print(f"Error reading rollup {path}: {e}")
+            return None
+        if rollup.attrs.get('revision') != revision:
+            return None
+        return rollup
+
+    def _write(self, week_number: int, rollup: pd.DataFrame):
+        if not PARQUET_AVAILABLE:
+            return
+        path = self.rollup_path(week_number)
+        try:
+            buffer = io.BytesIO()
+            rollup.to_parquet(buffer, engine='pyarrow', compression=PARQUET_COMPRESSION, index=False)
+            atomic_write(path, buffer.getvalue())
+        except Exception as e:
+            print(f"Error saving rollup {path}: {e}")
+
+    def ingest_week(self, week_number: int, df: pd.DataFrame, revision: str) -> pd.DataFrame:
+        """
+        用已加载的周次数据计算并保存汇总表（上传或同步新周次后调用）
+
+        Args:
+            week_number: 周次编号
+            df: 周次数据
+            revision: 文件版本
+
+        Returns:
+            pd.DataFrame: 该周的汇总表
+        """
+        rollup = compute_rollup(df, week_number)
+        rollup.attrs['revision'] = revision
+        self._write(week_number, rollup)
+        with self._lock:
+            self._rollups[week_number] = (revision, rollup)
+        return rollup
+
+    def get(self, week_number: int, revision: str) -> Optional[pd.DataFrame]:
+        """
+        获取指定周次、指定版本的汇总表
+
+        Args:
+            week_number: 周次编号
+            revision: 文件版本
+
+        Returns:
+            pd.DataFrame: 汇总表，无法读取周次数据时返回None
+        """
+        with self._lock:
+            cached = self._rollups.get(week_number)
+        if cached is not None and cached[0] == revision:
+            return cached[1]
+
+        rollup = self._read(week_number, revision)
+        if rollup is not None:
+            with self._lock:
+                self._rollups[week_number] = (revision, rollup)
+            return rollup
+
+        df = self._load_fn(week_number)
+        if df is None:
+            return None
+        return self.ingest_week(week_number, df, revision)
+
+    def history(self, revisions: Dict[int, str]) -> pd.DataFrame:
+        """
+        多个周次的汇总表
+
+        Args:
+            revisions: 周次 -> 文件版本（data_access.week_revisions() 的结果）
+
+        Returns:
+            pd.DataFrame: 各周汇总表纵向拼接，没有数据时为空表
+        """
+        frames = []
+        for week_number, revision in sorted(revisions.items()):
+            rollup = self.get(week_number, revision)
+            if rollup is not None:
+                frames.append(rollup)
+        if not frames:
+            return pd.DataFrame(columns=['week_number'] + ROLLUP_DIMENSIONS + ['count'])
+        return pd.concat(frames, ignore_index=True)
+
+
+def rollup_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    对已在内存中的多周数据（含 week_number 列）逐周计算汇总表，
+    例如合并相似产品之后的历史数据
+
+    Args:
+        df: 多周数据
+
+    Returns:
+        pd.DataFrame: 与 WeekRollups.history() 结构相同的汇总表
+    """
+    frames = [compute_rollup(week_df, int(week_number))
+              for week_number, week_df in df.groupby('week_number', sort=True)]
+    if not frames:
+        return pd.DataFrame(columns=['week_number'] + ROLLUP_DIMENSIONS + ['count'])
+    return pd.concat(frames, ignore_index=True)
+
+
+# group_summary() 输出列 -> 汇总表列（与 sql_engine 的类别/平台汇总列名一致）
+SUMMARY_COLUMNS = {
+    'product_count': 'count',
+    'total_score': 'total_score_mean',
+    'emotion_score': 'emotion_score_mean',
+    'engagement_rate': 'engagement_rate_mean',
+    'views': 'views_sum',
+    'likes': 'likes_sum',
+}
+
+
+def group_summary(rollups: pd.DataFrame, dimension: str) -> pd.DataFrame:
+    """
+    由汇总表得到按 (周次, 类别) 或 (周次, 平台) 的汇总，
+    列与 WeekQueryEngine.category_breakdown()/platform_comparison() 相同（SQL引擎不可用时使用）
+
+    Args:
+        rollups: 汇总表
+        dimension: 'product_category' 或 'platform'
+
+    Returns:
+        pd.DataFrame: 按周次、产品数降序排列，数据中没有该维度时为空表
+    """
+    if dimension == 'product_category':
+        rows = select(rollups, category=None, platform=ALL)
+    elif dimension == 'platform':
+        rows = select(rollups, category=ALL, platform=None)
+    else:
+        raise ValueError(f"Unknown dimension: {dimension}")
+    if rows.empty:
+        return pd.DataFrame()
+    columns = {source: target for target, source in SUMMARY_COLUMNS.items() if source in rows.columns}
+    summary = rows[['week_number', dimension] + list(columns)].rename(columns=columns)
+    return summary.sort_values(['week_number', 'product_count'], ascending=[True, False],
+                               kind='stable').reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    import time
+    from data_access import week_revisions
+    from week_store import local_week_files, read_week_file
+
+    files = local_week_files('reports')
+    rollups = WeekRollups(lambda week: read_week_file(files[week], ROLLUP_COLUMNS))
+
+    start = time.perf_counter()
+    history = rollups.history(week_revisions(source='local'))
+    print(f"{len(history)} rollup rows in {(time.perf_counter() - start) * 1000:.1f} ms")
+    print(select(history)[['week_number', 'count', 'total_score_mean', 'views_sum']].to_string(index=False))
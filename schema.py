@@ -0,0 +1,146 @@
+"""
+产品数据的标准列类型
+加载周次数据时统一选择紧凑的存储类型：低基数字符串列使用分类（字典）编码，
+编号类整数按取值范围降位，长文本使用Arrow字符串；
+分数和比率保持float64
+"""
+
+import sys
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    ARROW_STRINGS_AVAILABLE = True
+except ImportError:
+    ARROW_STRINGS_AVAILABLE = False
+
+# 取值种类很少的字符串列
+CATEGORY_COLUMNS = [
+    'product_category', 'platform', 'track_type', 'report_date', 'emotion_trend',
+    'competition_level', 'market_potential', 'action_priority', 'price_range'
+]
+
+# AI生成的分析长文本列
+AI_TEXT_COLUMNS = ['ai_market_positioning', 'ai_target_audience', 'ai_pricing_strategy', 'ai_risks']
+
+# 自由文本列
+TEXT_COLUMNS = ['product_name', 'tiktok_url'] + AI_TEXT_COLUMNS
+
+# 只用于比较、分组和显示的整数列，可按取值范围降位（int8/int16）；
+# 计数和分数（views、likes、*_score 等）会参与乘法和求和，降位后可能溢出回绕，保持原类型
+DOWNCAST_INT_COLUMNS = ['week_number', 'year', 'product_rank']
+
+# 未登记的字符串列：不同取值占比低于该比例时按分类存储
+CATEGORY_MAX_RATIO = 0.5
+
+
+def _text_dtype():
+    return pd.StringDtype('pyarrow') if ARROW_STRINGS_AVAILABLE else object
+
+
+def column_dtype(name: str, series: pd.Series) -> Optional[object]:
+    """
+    返回某列的目标存储类型
+
+    Args:
+        name: 列名
+        series: 列数据
+
+    Returns:
+        目标类型，保持原样时返回None
+    """
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        return None
+
+    if name in TEXT_COLUMNS:
+        return _text_dtype()
+    if name in CATEGORY_COLUMNS:
+        return 'category'
+
+    if pd.api.types.is_bool_dtype(dtype):
+        return None
+    if pd.api.types.is_integer_dtype(dtype):
+        if len(series) == 0 or name not in DOWNCAST_INT_COLUMNS:
+            return None
+        return pd.to_numeric(series, downcast='integer').dtype
+    if pd.api.types.is_float_dtype(dtype):
+        # 分数/比率直接进入滑块、表格和导出文件，float32会显示成 20.040000915527344
+        return None
+
+    if pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype):
+        if len(series) and series.nunique(dropna=True) <= len(series) * CATEGORY_MAX_RATIO:
+            return 'category'
+        return _text_dtype()
+    return None
+
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    把周次数据转换为标准存储类型
+
+    Args:
+        df: 原始数据
+
+    Returns:
+        pd.DataFrame: 转换后的数据（不修改传入的DataFrame）
+    """
+    if df is None:
+        return None
+    dtypes: Dict[str, object] = {}
+    for name in df.columns:
+        try:
+            target = column_dtype(name, df[name])
+        except Exception as e:
+            print(f"Error choosing dtype for column {name}: {e}")
+            continue
+        if target is not None and target != df[name].dtype:
+            dtypes[name] = target
+    if not dtypes:
+        return df
+    try:
+        return df.astype(dtypes)
+    except Exception as e:
+        print(f"Error applying schema: {e}")
+        return df
+
+
+def memory_report(before: pd.DataFrame, after: pd.DataFrame) -> pd.DataFrame:
+    """
+    对比转换前后各列的内存占用
+
+    Args:
+        before: 转换前的数据
+        after: 转换后的数据
+
+    Returns:
+        pd.DataFrame: 每列的类型与字节数，最后一行为合计
+    """
+    before_bytes = before.memory_usage(deep=True, index=False)
+    after_bytes = after.memory_usage(deep=True, index=False)
+    report = pd.DataFrame({
+        'before_dtype': before.dtypes.astype(str),
+        'after_dtype': after.dtypes.astype(str),
+        'before_bytes': before_bytes,
+        'after_bytes': after_bytes,
+    })
+    report.loc['TOTAL'] = ['', '', before_bytes.sum(), after_bytes.sum()]
+    report['saved_pct'] = (
+        (1 - report['after_bytes'] / report['before_bytes'].replace(0, np.nan)) * 100
+    ).round(1)
+    return report
+
+
+if __name__ == "__main__":
+    from week_store import local_week_files
+
+    target = sys.argv[1] if len(sys.argv) > 1 else 'reports'
+    for week_number, path in local_week_files(target).items():
+        raw = pd.read_parquet(path) if path.endswith('.parquet') else pd.read_csv(path)
+        report = memory_report(raw, apply_schema(raw))
+        total = report.loc['TOTAL']
+        print(f"Week {week_number:02d}: {int(total['before_bytes']):,} → "
+              f"{int(total['after_bytes']):,} bytes ({total['saved_pct']}% saved)")
@@ -0,0 +1,132 @@
+"""
+产品名称搜索索引
+对产品名称建立三元组（trigram）倒排索引，子串与前缀查询只需
+合并少量倒排列表再校验候选，不必逐行扫描全部名称
+"""
+
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+NGRAM = 3
+
+# 前缀查询使用的起始标记（不会出现在正常文本中）
+START_MARK = '\x02'
+
+
+def normalize(text) -> str:
+    """统一大小写；空值视为空字符串"""
+    if text is None or text != text:
+        return ''
+    return str(text).casefold()
+
+
+def ngrams(text: str, n: int = NGRAM) -> set:
+    """文本中所有长度为n的子串"""
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+class TrigramIndex:
+    """
+    三元组倒排索引
+
+    每个文档以起始标记开头后建立索引，因此前缀查询也能直接用三元组定位。
+    查询结果为文档在构建时的位置（0开始），按升序排列。
+    """
+
+    def __init__(self, texts: Iterable):
+        """
+        Args:
+            texts: 要索引的文本（通常是产品名称列）
+        """
+        self._texts: List[str] = [START_MARK + normalize(t) for t in texts]
+        postings: Dict[str, List[int]] = {}
+        for doc_id, text in enumerate(self._texts):
+            for gram in ngrams(text):
+                postings.setdefault(gram, []).append(doc_id)
+        self._postings: Dict[str, np.ndarray] = {
+            gram: np.asarray(ids, dtype=np.int32) for gram, ids in postings.items()
+        }
+        # 短于三元组的文档无法通过倒排列表找到，单独记录
+        self._short_docs = np.asarray(
+            [i for i, text in enumerate(self._texts) if len(text) < NGRAM], dtype=np.int32
+        )
+        # 短查询需要合并大量倒排列表，结果按查询缓存
+        self._short_cache: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def _candidates(self, pattern: str) -> np.ndarray:
+        if len(pattern) >= NGRAM:
+            lists = []
+            for gram in ngrams(pattern):
+                ids = self._postings.get(gram)
+                if ids is None:
+                    return np.empty(0, dtype=np.int32)
+                lists.append(ids)
+            lists.sort(key=len)
+            result = lists[0]
+            for ids in lists[1:]:
+                result = np.intersect1d(result, ids, assume_unique=True)
+                if len(result) == 0:
+                    break
+            return result
+
+        # 比三元组短的查询：合并所有包含该查询的三元组
+        cached = self._short_cache.get(pattern)
+        if cached is None:
+            lists = [ids for gram, ids in self._postings.items() if pattern in gram]
+            cached = np.unique(np.concatenate(lists)) if lists else np.empty(0, dtype=np.int32)
+            self._short_cache[pattern] = cached
+        return cached
+
+    def search(self, query: str, prefix: bool = False) -> np.ndarray:
+        """
+        查询包含（或以之开头）指定文本的文档，不区分大小写
+
+        Args:
+            query: 查询文本
+            prefix: True 时只匹配以查询开头的文档
+
+        Returns:
+            np.ndarray: 匹配文档的位置
+        """
+        query = normalize(query)
+        if not query:
+            return np.arange(len(self._texts), dtype=np.int32)
+
+        pattern = START_MARK + query if prefix else query
+        candidates = self._candidates(pattern)
+        if len(pattern) > NGRAM:
+            # 三元组都出现不代表连续出现，逐个校验候选
+            if prefix:
+                candidates = [i for i in candidates if self._texts[i].startswith(pattern)]
+            else:
+                candidates = [i for i in candidates if pattern in self._texts[i]]
+            return np.asarray(candidates, dtype=np.int32)
+        if len(pattern) < NGRAM and len(self._short_docs):
+            # 短文档不在倒排列表中，单独校验
+            short = [i for i in self._short_docs if pattern in self._texts[i]]
+            candidates = np.union1d(candidates, np.asarray(short, dtype=np.int32))
+        return candidates
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+    import pandas as pd
+    from week_store import local_week_files, read_week_file
+
+    reports_dir = sys.argv[1] if len(sys.argv) > 1 else 'reports'
+    frames = [read_week_file(path, ['product_name']) for path in local_week_files(reports_dir).values()]
+    names = pd.concat(frames, ignore_index=True)['product_name'] if frames else pd.Series([], dtype=object)
+
+    start = time.perf_counter()
+    index = TrigramIndex(names)
+    print(f"Indexed {len(index)} names in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    for query in sys.argv[2:] or ['shoe', '3d']:
+        start = time.perf_counter()
+        hits = index.search(query)
+        print(f"{query!r}: {len(hits)} hits in {(time.perf_counter() - start) * 1000:.3f} ms")
@@ -0,0 +1,351 @@
+"""
+嵌入式SQL分析引擎
+把每个周次快照注册为一张分区表（week_XX），再用视图 weeks 合并全部周次，
+跨周的历史、平台对比和类别分布直接以SQL聚合在引擎内完成。
+优先使用DuckDB（列式存储、多线程执行，超出内存限制时溢写到磁盘），
+未安装时退回Python自带的SQLite
+"""
+
+import os
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+import pandas as pd
+
+try:
+    import duckdb
+    DUCKDB_AVAILABLE = True
+except ImportError:
+    DUCKDB_AVAILABLE = False
+
+DEFAULT_ENGINE_DIR = os.getenv('SQL_ENGINE_DIR', os.path.join('.cache', 'sql'))
+
+# 内存数据库的路径标记
+MEMORY_DB = ':memory:'
+
+# DuckDB的内存上限与线程数，超出内存上限的中间结果写入临时目录
+DEFAULT_MEMORY_LIMIT = os.getenv('SQL_MEMORY_LIMIT', '1GB')
+DEFAULT_THREADS = int(os.getenv('SQL_THREADS', str(os.cpu_count() or 4)))
+
+# 注册到引擎的列（文件中不存在的列会被忽略）
+ANALYTICS_COLUMNS = [
+    'week_number', 'product_name', 'product_category', 'platform', 'total_score',
+    'emotion_score', 'views', 'likes', 'engagement_rate', 'sales_volume',
+    'sales_estimate', 'revenue_estimate', 'price', 'price_avg', 'growth_rate'
+]
+
+_IDENTIFIER = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+
+def partition_table(week_number: int) -> str:
+    """周次分区表的表名"""
+    return f"week_{week_number:02d}"
+
+
+def _quote(name: str) -> str:
+    if not _IDENTIFIER.match(name):
+        raise ValueError(f"Invalid column name: {name}")
+    return f'"{name}"'
+
+
+def _plain_frame(df: pd.DataFrame, week_number: int) -> pd.DataFrame:
+    """分类/Arrow字符串列转换为普通类型，并补上 week_number 列"""
+    df = df.copy()
+    for name in df.columns:
+        dtype = df[name].dtype
+        if isinstance(dtype, pd.CategoricalDtype) or pd.api.types.is_string_dtype(dtype):
+            df[name] = df[name].astype(object).where(df[name].notna(), None)
+    df['week_number'] = week_number
+    return df
+
+
+class WeekQueryEngine:
+    """
+    周次数据的SQL查询层
+
+    每个周次一张表，记录写入时的文件版本；sync() 只重写版本变化的周次。
+    数据库文件保存在磁盘上，重启后无需重新导入；db_path 为 ':memory:' 时
+    使用进程内存数据库（每个进程各自导入）。
+    """
+
+    def __init__(self, db_path: Optional[str] = None, backend: Optional[str] = None):
+        """
+        Args:
+            db_path: 数据库文件路径，默认按后端保存在 DEFAULT_ENGINE_DIR；':memory:' 表示内存数据库
+            backend: 'duckdb' 或 'sqlite'，默认有DuckDB时使用DuckDB
+        """
+        self.backend = backend or ('duckdb' if DUCKDB_AVAILABLE else 'sqlite')
+        if self.backend == 'duckdb' and not DUCKDB_AVAILABLE:
+            raise ValueError("duckdb is not installed")
+        if self.backend not in ('duckdb', 'sqlite'):
+            raise ValueError(f"Unknown backend: {self.backend}")
+
+        suffix = 'duckdb' if self.backend == 'duckdb' else 'sqlite'
+        self.in_memory = db_path == MEMORY_DB
+        self.db_path = Path(db_path or os.path.join(DEFAULT_ENGINE_DIR, f"weeks.{suffix}"))
+        if self.in_memory:
+            # 各进程的内存数据库使用各自的溢写目录
+            spill_dir = Path(DEFAULT_ENGINE_DIR) / f"spill-{os.getpid()}"
+        else:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            spill_dir = self.db_path.parent / 'spill'
+        self._lock = threading.Lock()
+
+        if self.backend == 'duckdb':
+            self._con = duckdb.connect(MEMORY_DB if self.in_memory else str(self.db_path))
+            self._con.execute(f"SET threads TO {DEFAULT_THREADS}")
+            self._con.execute(f"SET memory_limit = '{DEFAULT_MEMORY_LIMIT}'")
+            self._con.execute(f"SET temp_directory = '{spill_dir.as_posix()}'")
+        else:
+            self._con = sqlite3.connect(MEMORY_DB if self.in_memory else str(self.db_path),
+                                        check_same_thread=False)
+        self._execute("CREATE TABLE IF NOT EXISTS _week_revisions (week_number INTEGER PRIMARY KEY, revision TEXT)")
+
+    def _execute(self, sql: str, params: Sequence = ()):
+        self._con.execute(sql, list(params))
+        if self.backend == 'sqlite':
+            self._con.commit()
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._con.close()
+
+    # ---------- 分区管理 ----------
+
+    def revisions(self) -> Dict[int, str]:
+        """已注册周次 -> 文件版本"""
+        with self._lock:
+            rows = self._con.execute("SELECT week_number, revision FROM _week_revisions").fetchall()
+        return {int(week): revision for week, revision in rows}
+
+    def _table_columns(self, table: str) -> List[str]:
+        if self.backend == 'duckdb':
+            rows = self._con.execute(
+                "SELECT column_name FROM information_schema.columns WHERE table_name = ? ORDER BY ordinal_position",
+                [table]
+            ).fetchall()
+            return [row[0] for row in rows]
+        return [row[1] for row in self._con.execute(f"PRAGMA table_info({table})").fetchall()]
+
+    def _rebuild_view(self):
+        """weeks 视图：各分区表按列名对齐后 UNION ALL，缺少的列补NULL"""
+        weeks = sorted(int(week) for (week,) in self._con.execute(
+            "SELECT week_number FROM _week_revisions").fetchall())
+        self._execute("DROP VIEW IF EXISTS weeks")
+        if not weeks:
+            return
+        table_columns = {week: self._table_columns(partition_table(week)) for week in weeks}
+        columns = list(dict.fromkeys(col for cols in table_columns.values() for col in cols))
+        selects = []
+        for week in weeks:
+            present = set(table_columns[week])
+            fields = ', '.join(_quote(col) if col in present else f"NULL AS {_quote(col)}" for col in columns)
+            selects.append(f"SELECT {fields} FROM {partition_table(week)}")
+        self._execute("CREATE VIEW weeks AS " + " UNION ALL ".join(selects))
+
+    def register_week(self, week_number: int, df: pd.DataFrame, revision: str):
+        """
+        写入（或替换）一个周次分区
+
+        Args:
+            week_number: 周次编号
+            df: 周次数据
+            revision: 文件版本
+        """
+        table = partition_table(week_number)
+        frame = _plain_frame(df, week_number)
+        for name in frame.columns:
+            _quote(name)
+        with self._lock:
+            if self.backend == 'duckdb':
+                self._con.register('_incoming', frame)
+                try:
+                    self._con.execute(f"CREATE OR REPLACE TABLE {table} AS SELECT * FROM _incoming")
+                finally:
+                    self._con.unregister('_incoming')
+            else:
+                frame.to_sql(table, self._con, if_exists='replace', index=False)
+            self._execute("DELETE FROM _week_revisions WHERE week_number = ?", [week_number])
+            self._execute("INSERT INTO _week_revisions VALUES (?, ?)", [week_number, revision])
+            self._rebuild_view()
+
+    def drop_week(self, week_number: int):
+        """
+        删除一个周次分区
+
+        Args:
+            week_number: 周次编号
+        """
+        with self._lock:
+            self._execute(f"DROP TABLE IF EXISTS {partition_table(week_number)}")
+            self._execute("DELETE FROM _week_revisions WHERE week_number = ?", [week_number])
+            self._rebuild_view()
+
+    def sync(self, revisions: Dict[int, str],
+             load_fn: Callable[[int], Optional[pd.DataFrame]]) -> List[int]:
+        """
+        按文件版本增量同步分区
+
+        Args:
+            revisions: 周次 -> 当前文件版本（data_access.week_revisions() 的结果）
+            load_fn: 读取某周数据的函数
+
+        Returns:
+            List[int]: 重新写入或删除的周次
+        """
+        known = self.revisions()
+        changed = []
+        for week_number in [w for w in known if w not in revisions]:
+            self.drop_week(week_number)
+            changed.append(week_number)
+        for week_number, revision in sorted(revisions.items()):
+            if known.get(week_number) == revision:
+                continue
+            df = load_fn(week_number)
+            if df is None:
+                continue
+            try:
+                self.register_week(week_number, df, revision)
+                changed.append(week_number)
+            except Exception as e:
+                print(f"Error registering week {week_number}: {e}")
+        return sorted(changed)
+
+    # ---------- 查询 ----------
+
+    def columns(self) -> List[str]:
+        """weeks 视图的列"""
+        with self._lock:
+            if not self.revisions_registered():
+                return []
+            return self._table_columns('weeks')
+
+    def revisions_registered(self) -> bool:
+        return self._con.execute("SELECT COUNT(*) FROM _week_revisions").fetchone()[0] > 0
+
+    def query(self, sql: str, params: Sequence = ()) -> pd.DataFrame:
+        """
+        执行只读SQL查询，可以引用 weeks 视图或 week_XX 分区表
+
+        DuckDB只接受单条SELECT语句；SQLite在查询期间开启 PRAGMA query_only，
+        写入语句会被数据库拒绝
+
+        Args:
+            sql: SQL语句，参数使用 ? 占位
+            params: 参数
+
+        Returns:
+            pd.DataFrame: 查询结果
+
+        Raises:
+            ValueError: DuckDB后端收到SELECT以外的语句时
+        """
+        with self._lock:
+            if self.backend == 'duckdb':
+                # 同一进程中无法再以只读方式打开同一个数据库文件，改为检查语句类型
+                statements = self._con.extract_statements(sql)
+                if len(statements) != 1 or statements[0].type != duckdb.StatementType.SELECT:
+                    raise ValueError("Only a single SELECT statement is allowed")
+                return self._con.execute(sql, list(params)).df()
+            self._con.execute("PRAGMA query_only = ON")
+            try:
+                return pd.read_sql_query(sql, self._con, params=list(params))
+            finally:
+                self._con.execute("PRAGMA query_only = OFF")
+
+    def _group_summary(self, dimension: str, week_number: Optional[int]) -> pd.DataFrame:
+        available = set(self.columns())
+        if dimension not in available:
+            return pd.DataFrame()
+        fields = ['COUNT(*) AS product_count']
+        for column, agg in (('total_score', 'AVG'), ('emotion_score', 'AVG'), ('engagement_rate', 'AVG'),
+                            ('views', 'SUM'), ('likes', 'SUM'), ('sales_volume', 'SUM'),
+                            ('revenue_estimate', 'SUM')):
+            if column in available:
+                fields.append(f"{agg}({_quote(column)}) AS {_quote(column)}")
+        where, params = '', []
+        if week_number is not None:
+            where, params = 'WHERE week_number = ?', [week_number]
+        sql = (f"SELECT week_number, {_quote(dimension)}, {', '.join(fields)} FROM weeks {where} "
+               f"GROUP BY week_number, {_quote(dimension)} ORDER BY week_number, product_count DESC")
+        return self.query(sql, params)
+
+    def category_breakdown(self, week_number: Optional[int] = None) -> pd.DataFrame:
+        """
+        按 (周次, 类别) 汇总
+
+        Args:
+            week_number: 只统计某一周，为None时统计全部周次
+
+        Returns:
+            pd.DataFrame: 产品数、平均分数与浏览/互动合计
+        """
+        return self._group_summary('product_category', week_number)
+
+    def platform_comparison(self, week_number: Optional[int] = None) -> pd.DataFrame:
+        """
+        按 (周次, 平台) 汇总
+
+        Args:
+            week_number: 只统计某一周，为None时统计全部周次
+
+        Returns:
+            pd.DataFrame: 产品数、平均分数与浏览/销售合计（数据中没有platform列时为空表）
+        """
+        return self._group_summary('platform', week_number)
+
+
+_engines: Dict[str, WeekQueryEngine] = {}
+_engines_lock = threading.Lock()
+
+
+def get_query_engine(name: str = 'default') -> WeekQueryEngine:
+    """
+    获取进程级共享的查询引擎
+
+    DuckDB数据库文件同一时间只能被一个进程打开，多实例部署时后启动的进程
+    打开失败，此时退回进程内存数据库（该进程自行导入各周次，不影响查询结果）
+
+    Args:
+        name: 引擎名称（不同数据来源使用不同的数据库文件）
+
+    Returns:
+        WeekQueryEngine: 查询引擎
+    """
+    engine = _engines.get(name)
+    if engine is None:
+        with _engines_lock:
+            engine = _engines.get(name)
+            if engine is None:
+                suffix = 'duckdb' if DUCKDB_AVAILABLE else 'sqlite'
+                db_path = os.path.join(DEFAULT_ENGINE_DIR, f"{name}.{suffix}")
+                try:
+                    engine = WeekQueryEngine(db_path)
+                except Exception as e:
+                    print(f"Error opening SQL engine {db_path}, using an in-memory database: {e}")
+                    engine = WeekQueryEngine(MEMORY_DB)
+                _engines[name] = engine
+    return engine
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+    from data_access import week_revisions
+    from week_store import local_week_files, read_week_file
+
+    files = local_week_files('reports')
+    engine = get_query_engine('local')
+    changed = engine.sync(week_revisions(source='local'),
+                          lambda week: read_week_file(files[week], ANALYTICS_COLUMNS))
+    print(f"Backend: {engine.backend}, registered weeks: {changed or 'none (up to date)'}")
+
+    sql = ' '.join(sys.argv[1:]) or "SELECT week_number, COUNT(*) AS n, AVG(total_score) AS avg_score FROM weeks GROUP BY week_number"
+    start = time.perf_counter()
+    result = engine.query(sql)
+    print(f"{len(result)} rows in {(time.perf_counter() - start) * 1000:.1f} ms")
+    print(result.to_string(index=False))
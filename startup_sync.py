@@ -0,0 +1,281 @@
+"""
+启动同步 - stale-while-revalidate
+仪表板启动时先用上次同步的本地快照（Drive目录快照与磁盘缓存，或reports目录）
+立即渲染，与Google Drive的校验和同步在后台线程中进行，完成后下一次rerun生效。
+同步状态（正在同步、最近一次成功的时间、失败原因）保存在磁盘上，
+供侧边栏显示数据新鲜度
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+from disk_cache import DEFAULT_CACHE_DIR, atomic_write
+
+# 启动模式：background 先用本地快照渲染、后台同步；blocking 等待同步完成再渲染
+DEFAULT_SYNC_MODE = os.getenv('DASHBOARD_SYNC_MODE', 'background')
+
+# 两次后台同步之间的最小间隔（秒）
+DEFAULT_SYNC_INTERVAL = float(os.getenv('DASHBOARD_SYNC_INTERVAL_SECONDS', '60'))
+
+# 本地没有任何快照时，首次渲染最多等待后台同步的时间（秒）
+DEFAULT_STARTUP_WAIT = float(os.getenv('DASHBOARD_STARTUP_WAIT_SECONDS', '10'))
+
+DEFAULT_STATE_DIR = os.path.join(DEFAULT_CACHE_DIR, 'sync')
+
+# 同步状态
+IDLE = 'idle'
+SYNCING = 'syncing'
+FRESH = 'fresh'
+FAILED = 'failed'
+DISABLED = 'disabled'
+
+
+def revalidate_drive() -> Tuple[bool, Optional[str]]:
+    """
+    通过Drive变更通知校验目录索引（失效发生变化的周次）
+
+    Returns:
+        Tuple[bool, Optional[str]]: (是否成功, 失败原因)
+    """
+    from data_access import check_for_updates
+    from data_manager_gdrive import get_change_watcher
+
+    check_for_updates(force=True)
+    watcher = get_change_watcher()
+    if watcher.last_error is not None or not watcher.catalog.loaded:
+        return False, watcher.last_error or "Drive catalog not loaded"
+    return True, None
+
+
+def revalidate_rclone() -> Tuple[bool, Optional[str]]:
+    """
+    用rclone把Drive上的周次文件复制到reports目录
+
+    Returns:
+        Tuple[bool, Optional[str]]: (是否成功, 失败原因)
+    """
+    from sync_data_from_gdrive import sync_from_google_drive
+    if sync_from_google_drive():
+        return True, None
+    return False, "rclone sync failed"
+
+
+class BackgroundSync:
+    """
+    后台同步任务
+
+    trigger() 在后台线程中运行同步函数并立即返回；同一时间只运行一个，
+    距上次开始不足 min_interval 时不再触发。最近一次成功的时间写入
+    状态文件，重启后侧边栏仍能显示本地快照的新鲜度。
+    """
+
+    def __init__(self, name: str,
+                 sync_fn: Callable[[], Tuple[bool, Optional[str]]],
+                 min_interval: float = DEFAULT_SYNC_INTERVAL,
+                 enabled: bool = True,
+                 state_dir: str = DEFAULT_STATE_DIR,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            name: 任务名称（决定状态文件名）
+            sync_fn: 同步函数，返回 (是否成功, 失败原因)
+            min_interval: 两次同步之间的最小间隔（秒）
+            enabled: 是否启用（例如未配置Drive时为False，只使用本地数据）
+            state_dir: 状态文件目录
+            clock: 时钟函数（便于测试替换）
+        """
+        self.name = name
+        self._sync_fn = sync_fn
+        self.min_interval = min_interval
+        self.enabled = enabled
+        self.state_path = Path(state_dir) / f"{name}.json"
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._done.set()
+        self._thread: Optional[threading.Thread] = None
+        self._started_at: Optional[float] = None
+        self._state = IDLE if enabled else DISABLED
+        self._error: Optional[str] = None
+        self._last_success: Optional[float] = self._load_last_success()
+
+    def _load_last_success(self) -> Optional[float]:
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                return json.load(f).get('last_success')
+        except (OSError, ValueError):
+            return None
+
+    def _save_last_success(self):
+        try:
+            payload = {'name': self.name, 'last_success': self._last_success}
+            atomic_write(self.state_path, json.dumps(payload).encode('utf-8'))
+        except OSError as e:
+            print(f"Error saving sync state {self.state_path}: {e}")
+
+    @property
+    def running(self) -> bool:
+        """是否正在同步"""
+        return not self._done.is_set()
+
+    def trigger(self, force: bool = False) -> bool:
+        """
+        在后台开始一次同步
+
+        Args:
+            force: 忽略最小间隔
+
+        Returns:
+            bool: 是否开始了新的同步
+        """
+        if not self.enabled:
+            return False
+        with self._lock:
+            if self.running:
+                return False
+            if (not force and self._started_at is not None
+                    and self._clock() - self._started_at < self.min_interval):
+                return False
+            self._started_at = self._clock()
+            self._state = SYNCING
+            self._done.clear()
+            self._thread = threading.Thread(target=self._run, name=f"sync-{self.name}", daemon=True)
+            self._thread.start()
+        return True
+
+    def _run(self):
+        try:
+            ok, error = self._sync_fn()
+        except Exception as e:
+            print(f"Error in background sync {self.name}: {e}")
+            ok, error = False, str(e)
+        with self._lock:
+            if ok:
+                self._state, self._error = FRESH, None
+                self._last_success = time.time()
+                self._save_last_success()
+            else:
+                self._state, self._error = FAILED, error
+        self._done.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        等待正在进行的同步结束
+
+        Args:
+            timeout: 最长等待时间（秒），None 表示一直等待
+
+        Returns:
+            bool: 同步是否已结束
+        """
+        return self._done.wait(timeout)
+
+    def status(self) -> Dict:
+        """
+        同步状态
+
+        Returns:
+            Dict: state（idle/syncing/fresh/failed/disabled）、last_success（time.time()，
+                从未成功时为None）、error（最近一次失败的原因）
+        """
+        with self._lock:
+            return {'state': self._state, 'last_success': self._last_success, 'error': self._error}
+
+
+def format_age(seconds: float) -> str:
+    """把秒数格式化为"N 分钟前"之类的相对时间"""
+    if seconds < 60:
+        return "刚刚"
+    if seconds < 3600:
+        return f"{int(seconds // 60)} 分钟前"
+    if seconds < 86400:
+        return f"{int(seconds // 3600)} 小时前"
+    return f"{int(seconds // 86400)} 天前"
+
+
+def freshness_message(status: Dict, now: Optional[float] = None) -> Tuple[str, str]:
+    """
+    侧边栏显示的数据新鲜度
+
+    Args:
+        status: BackgroundSync.status() 的结果
+        now: 当前时间（time.time()），默认取当前时间
+
+    Returns:
+        Tuple[str, str]: (级别 success/info/warning, 提示文字)
+    """
+    now = time.time() if now is None else now
+    last_success = status.get('last_success')
+    synced = f"上次同步 {format_age(now - last_success)}" if last_success else "尚未与Google Drive同步过"
+    state = status.get('state')
+    if state == DISABLED:
+        return 'info', "💾 未配置Google Drive，仅使用本地数据"
+    if state == SYNCING:
+        return 'info', f"🔄 正在后台与Google Drive同步，当前显示本地快照（{synced}）"
+    if state == FAILED:
+        return 'warning', f"⚠️ 同步失败，显示本地快照（{synced}）：{status.get('error') or '未知错误'}"
+    if state == FRESH:
+        return 'success', f"✅ 数据已与Google Drive同步（{synced}）"
+    return 'info', f"💾 显示本地快照（{synced}）"
+
+
+_syncs: Dict[str, BackgroundSync] = {}
+_syncs_lock = threading.Lock()
+
+
+def get_background_sync(source: str) -> BackgroundSync:
+    """
+    获取进程级共享的后台同步任务
+
+    Args:
+        source: 'drive' 通过Drive API校验目录索引，'rclone' 用rclone同步reports目录
+
+    Returns:
+        BackgroundSync: 同步任务
+    """
+    sync = _syncs.get(source)
+    if sync is None:
+        with _syncs_lock:
+            sync = _syncs.get(source)
+            if sync is None:
+                if source == 'drive':
+                    sync = BackgroundSync('drive', revalidate_drive)
+                elif source == 'rclone':
+                    from sync_data_from_gdrive import rclone_configured
+                    sync = BackgroundSync('rclone', revalidate_rclone, enabled=rclone_configured())
+                else:
+                    raise ValueError(f"Unknown sync source: {source}")
+                _syncs[source] = sync
+    return sync
+
+
+def start_sync(source: str, mode: str = DEFAULT_SYNC_MODE) -> BackgroundSync:
+    """
+    在每次rerun开始时调用：按最小间隔触发后台同步；blocking 模式下等待同步结束
+
+    Args:
+        source: 'drive' 或 'rclone'
+        mode: 'background' 或 'blocking'
+
+    Returns:
+        BackgroundSync: 同步任务
+    """
+    sync = get_background_sync(source)
+    sync.trigger()
+    if mode == 'blocking':
+        sync.wait()
+    return sync
+
+
+if __name__ == "__main__":
+    import sys
+
+    source = sys.argv[1] if len(sys.argv) > 1 else 'rclone'
+    sync = start_sync(source)
+    print(freshness_message(sync.status())[1])
+    sync.wait()
+    print(freshness_message(sync.status())[1])
@@ -87,7 +87,7 @@ def analyze_sales_trends(df):
             df['revenue_estimate'] = df['sales_estimate'] * df['price']
             agg_dict['revenue_estimate'] = 'sum'
         
-        platform_performance = df.groupby('platform').agg(agg_dict)
+        platform_performance = df.groupby('platform', observed=True).agg(agg_dict)
         
         # 根据可用的列排序
         if 'revenue_estimate' in platform_performance.columns:
@@ -110,7 +110,7 @@ def analyze_sales_trends(df):
         elif 'sales_estimate' in df.columns:
             agg_dict['sales_estimate'] = 'sum'
         
-        category_performance = df.groupby('product_category').agg(agg_dict).sort_values('views', ascending=False)
+        category_performance = df.groupby('product_category', observed=True).agg(agg_dict).sort_values('views', ascending=False)
         
         if not category_performance.empty:
             top_category = category_performance.index[0]
@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 """
 Sync data from Google Drive to local reports directory
-This script runs automatically when the dashboard starts
+The dashboard runs this in the background on startup (see startup_sync.py)
+and keeps serving the existing local files while it runs
 """
 
 import os
@@ -9,8 +10,23 @@ import subprocess
 import sys
 from pathlib import Path
 
-def sync_from_google_drive():
-    """Download all data files from Google Drive to local reports directory"""
+# rclone copy timeout in seconds
+SYNC_TIMEOUT_SECONDS = float(os.getenv('RCLONE_SYNC_TIMEOUT_SECONDS', '60'))
+
+RCLONE_CONFIG = Path.home() / '.gdrive-rclone.ini'
+
+def rclone_configured():
+    """Whether the rclone config for Google Drive exists"""
+    return RCLONE_CONFIG.exists()
+
+def sync_from_google_drive(timeout=SYNC_TIMEOUT_SECONDS, verbose=False):
+    """
+    Download all data files from Google Drive to local reports directory
+    
+    Args:
+        timeout: rclone timeout in seconds
+        verbose: pass -v to rclone (output is only printed on failure)
+    """
     
     print("🔄 Syncing data from Google Drive...")
     
@@ -19,28 +35,30 @@ def sync_from_google_drive():
     reports_dir.mkdir(exist_ok=True)
     
     # Check if rclone config exists
-    rclone_config = Path.home() / '.gdrive-rclone.ini'
+    rclone_config = RCLONE_CONFIG
     
-    if not rclone_config.exists():
+    if not rclone_configured():
         print("⚠️  Google Drive not configured. Using local data only.")
         return False
     
     try:
-        # Sync all CSV files from Google Drive
+        # Sync all CSV files (and their Parquet snapshots) from Google Drive
         cmd = [
             'rclone', 'copy',
             'manus_google_drive:Market Intelligence Data/',
             str(reports_dir),
             '--config', str(rclone_config),
             '--include', '*.csv',
-            '-v'
+            '--include', '*.parquet'
         ]
+        if verbose:
+            cmd.append('-v')
         
         result = subprocess.run(
             cmd,
             capture_output=True,
             text=True,
-            timeout=60
+            timeout=timeout
         )
         
         if result.returncode == 0:
@@ -63,7 +81,7 @@ def sync_from_google_drive():
 
 def main():
     """Main entry point"""
-    success = sync_from_google_drive()
+    success = sync_from_google_drive(verbose=True)
     sys.exit(0 if success else 1)
 
 if __name__ == "__main__":
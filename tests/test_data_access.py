@@ -0,0 +1,129 @@
+import pandas as pd
+import pytest
+
+import data_access
+from data_access import WeekDataCache, concat_weeks, load_weeks
+from drive_catalog import DriveCatalog
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def drive(monkeypatch):
+    """目录索引 + 周次缓存，缓存按 md5Checksum 返回不同内容"""
+    files = {'1': {'id': '1', 'name': 'All_Data_Week_04.csv', 'md5Checksum': 'v1',
+                   'modifiedTime': '2026-01-01T00:00:00.000Z'}}
+    frames = {'v1': pd.DataFrame({'product_name': ['a', 'b']}),
+              'v2': pd.DataFrame({'product_name': ['a', 'b', 'c']})}
+    clock = FakeClock()
+    catalog = DriveCatalog(lambda: [dict(f) for f in files.values()], refresh_seconds=600, clock=clock)
+    cache = WeekDataCache(
+        ttl_seconds=300,
+        info_fn=lambda week: catalog.get(f"All_Data_Week_{week:02d}.csv"),
+        fetch_fn=lambda week, info, columns: frames[info['md5Checksum']],
+        clock=clock
+    )
+    monkeypatch.setattr(data_access, '_week_cache', cache)
+    catalog.add_listener(data_access._on_catalog_refresh)
+    return files, catalog, cache
+
+
+def test_catalog_refresh_invalidates_changed_week(drive):
+    files, catalog, cache = drive
+    df, revision = cache.get_with_revision(4)
+    assert revision == 'v1' and len(df) == 2
+
+    files['1']['md5Checksum'] = 'v2'
+    assert catalog.refresh()
+
+    # 刷新后缓存不再持有旧版本，下一次读取与目录索引一致
+    assert cache.revision(4) is None
+    df, revision = cache.get_with_revision(4)
+    assert revision == 'v2' and len(df) == 3
+    assert revision == catalog.get('All_Data_Week_04.csv')['md5Checksum']
+
+
+def test_catalog_refresh_keeps_unchanged_week(drive):
+    files, catalog, cache = drive
+    cache.get(4)
+    assert catalog.refresh()
+    assert cache.revision(4) == 'v1'
+
+
+def test_catalog_refresh_reports_removed_files():
+    files = {'1': {'id': '1', 'name': 'All_Data_Week_04.csv', 'md5Checksum': 'v1'}}
+    catalog = DriveCatalog(lambda: list(files.values()))
+    seen = []
+    catalog.add_listener(seen.append)
+    catalog.refresh()
+    files.clear()
+    catalog.refresh()
+    assert seen[-1] == [{'id': '1', 'name': 'All_Data_Week_04.csv', 'md5Checksum': 'v1', 'removed': True}]
+
+
+def test_expected_revision_bypasses_ttl(drive):
+    files, catalog, cache = drive
+    cache.get(4)
+    files['1']['md5Checksum'] = 'v2'
+    catalog.upsert(dict(files['1']))
+
+    # TTL内仍返回旧版本，除非调用方给出期望的版本
+    assert cache.get_with_revision(4)[1] == 'v1'
+    df, revision = cache.get_with_revision(4, revision='v2')
+    assert revision == 'v2' and len(df) == 3
+
+
+def test_cache_evicts_least_recently_used_week():
+    frame = pd.DataFrame({'views': range(1000)})
+    fetches = []
+
+    def fetch(week, info, columns):
+        fetches.append(week)
+        return frame.copy()
+
+    nbytes = int(frame.memory_usage(index=True, deep=True).sum())
+    cache = WeekDataCache(info_fn=lambda week: {'md5Checksum': f'w{week}'}, fetch_fn=fetch,
+                          max_bytes=2 * nbytes, clock=FakeClock())
+    cache.get(1)
+    cache.get(2)
+    cache.get(1)
+    cache.get(3)
+    assert cache.memory_bytes() <= cache.max_bytes
+    assert cache.memory_bytes(2) == 0 and cache.revision(2) is None
+    assert cache.memory_bytes(1) > 0 and cache.evictions == 1
+
+    cache.get(1)
+    assert fetches == [1, 2, 3]
+
+
+def test_cache_keeps_a_week_larger_than_the_limit():
+    cache = WeekDataCache(info_fn=lambda week: {'md5Checksum': f'w{week}'},
+                          fetch_fn=lambda week, info, columns: pd.DataFrame({'x': range(100)}),
+                          max_bytes=1, clock=FakeClock())
+    assert cache.get(1) is not None
+    assert cache.get(2) is not None
+    assert cache.memory_bytes(1) == 0 and cache.memory_bytes(2) > 0
+
+
+def test_load_weeks_records_served_revisions(tmp_path):
+    for week in (4, 5):
+        pd.DataFrame({'product_name': ['a'], 'total_score': [40.0]}).to_csv(
+            tmp_path / f"All_Data_Week_{week:02d}.csv", index=False)
+    df = load_weeks(source='local', reports_dir=tmp_path, columns=['product_name'])
+    assert sorted(df.attrs['revisions']) == [4, 5]
+    assert df.attrs['revision'] == data_access.dataset_revision(source='local', reports_dir=tmp_path)
+
+
+def test_concat_weeks_missing_bool_column_is_na():
+    combined = concat_weeks({
+        1: pd.DataFrame({'x': [1, 2], 'flag': [True, False]}),
+        2: pd.DataFrame({'x': [3]}),
+    })
+    assert combined['flag'].dtype == 'boolean'
+    assert combined['flag'].isna().tolist() == [False, False, True]
@@ -0,0 +1,24 @@
+import numpy as np
+
+from dedup import cluster_names
+
+
+def test_near_duplicates_share_a_cluster():
+    names = [
+        'Elegoo Neptune 4 Pro 3D Printer High Speed 500mm/s',
+        'Bambu Lab A1 mini multicolor printing',
+        'ELEGOO Neptune 4 Pro 3D Printer - High Speed 500mm/s!',
+        'Elegoo Neptune 4 Pro 3D Printer High Speed 500mm/s',
+    ]
+    labels = cluster_names(names)
+    assert labels.tolist() == [0, 1, 0, 0]
+
+
+def test_distinct_and_blank_names_stay_apart():
+    labels = cluster_names(['PLA filament 1kg black', 'Resin washing station', '', None])
+    assert labels.tolist() == [0, 1, 2, 3]
+
+
+def test_empty_input():
+    labels = cluster_names([])
+    assert len(labels) == 0 and labels.dtype == np.int64
@@ -0,0 +1,53 @@
+import hashlib
+
+import pytest
+
+import data_manager_gdrive as gdrive
+from disk_cache import DiskCache
+from fake_drive import FakeDrive
+
+
+def file_info(content, **overrides):
+    info = {'id': 'f1', 'name': 'All_Data_Week_04.csv',
+            'md5Checksum': hashlib.md5(content).hexdigest(), 'modifiedTime': 't1'}
+    info.update(overrides)
+    return info
+
+
+def test_put_then_get(tmp_path):
+    cache = DiskCache(str(tmp_path))
+    info = file_info(b'a,b\n1,2\n')
+    cache.put(info['name'], info, b'a,b\n1,2\n')
+    assert cache.get(info['name'], info) == b'a,b\n1,2\n'
+    assert cache.cached_file_info(info['name'])['md5Checksum'] == info['md5Checksum']
+
+
+def test_md5_mismatch_is_not_cached(tmp_path):
+    cache = DiskCache(str(tmp_path))
+    info = file_info(b'expected')
+    with pytest.raises(ValueError):
+        cache.put(info['name'], info, b'corrupt')
+    assert cache.read_index(info['name']) is None
+    assert cache.get(info['name'], info) is None
+
+
+def test_replaced_object_is_pruned(tmp_path):
+    cache = DiskCache(str(tmp_path))
+    first = cache.put('w.csv', file_info(b'v1'), b'v1')
+    second = cache.put('w.csv', file_info(b'v2'), b'v2')
+    objects = {path.name for path in (tmp_path / 'objects').iterdir()}
+    assert objects == {second} and first != second
+
+
+def test_download_retries_and_rejects_mismatch(tmp_path, monkeypatch):
+    monkeypatch.setattr(gdrive, 'get_disk_cache', lambda: DiskCache(str(tmp_path)))
+    drive = FakeDrive()
+    info = drive.put_file('All_Data_Week_04.csv', b'a,b\n1,2\n')
+
+    assert gdrive.download_file_cached(info, drive.service()) == b'a,b\n1,2\n'
+
+    calls = drive.download_calls
+    stale = dict(info, name='All_Data_Week_05.csv', md5Checksum=hashlib.md5(b'old').hexdigest())
+    assert gdrive.download_file_cached(stale, drive.service()) is None
+    assert drive.download_calls - calls == gdrive.DOWNLOAD_ATTEMPTS
+    assert DiskCache(str(tmp_path)).read_index('All_Data_Week_05.csv') is None
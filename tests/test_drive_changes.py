@@ -0,0 +1,114 @@
+import pytest
+
+import data_manager_gdrive as gdrive
+from drive_catalog import DriveCatalog
+from drive_changes import DriveChangeWatcher
+from fake_drive import FOLDER_MIME_TYPE, FakeDrive
+
+FOLDER_ID = 'folder'
+DRIVE_ID = 'drive'
+
+
+class BrokenService:
+    """changes().list 总是失败的服务对象"""
+
+    def __init__(self, service):
+        self._service = service
+
+    def files(self):
+        return self._service.files()
+
+    def changes(self):
+        raise RuntimeError('invalid page token')
+
+
+@pytest.fixture
+def drive():
+    drive = FakeDrive(root_id=FOLDER_ID)
+    drive.put_file('All_Data_Week_04.csv', b'week_number\n4\n')
+    return drive
+
+
+def make_watcher(drive, state_path, service_factory=None):
+    service = drive.service()
+    catalog = DriveCatalog(lambda: gdrive.list_folder_pages(service, FOLDER_ID))
+    return DriveChangeWatcher(service_factory or (lambda: service), catalog,
+                              folder_id=FOLDER_ID, drive_id=DRIVE_ID, state_path=str(state_path))
+
+
+def test_first_poll_lists_folder_and_saves_token(drive, tmp_path):
+    watcher = make_watcher(drive, tmp_path / 'state.json')
+    assert watcher.poll() == []
+    assert drive.list_calls == 1
+    assert watcher.page_token == str(drive.change_counter)
+    assert [f['name'] for f in watcher.catalog.files()] == ['All_Data_Week_04.csv']
+
+
+def test_new_process_resumes_from_saved_token(drive, tmp_path):
+    make_watcher(drive, tmp_path / 'state.json').poll()
+    drive.put_file('All_Data_Week_05.csv', b'week_number\n5\n')
+
+    watcher = make_watcher(drive, tmp_path / 'state.json')
+    assert watcher.catalog.loaded
+    changed = watcher.poll()
+    assert [f['name'] for f in changed] == ['All_Data_Week_05.csv']
+    assert drive.list_calls == 1
+    assert sorted(f['name'] for f in watcher.catalog.files()) == \
+        ['All_Data_Week_04.csv', 'All_Data_Week_05.csv']
+
+    # 保存的是推进后的页标记：再启动一个实例时没有新的变更
+    assert make_watcher(drive, tmp_path / 'state.json').poll() == []
+
+
+def test_changes_outside_folder_are_ignored_and_deletes_reported(drive, tmp_path):
+    watcher = make_watcher(drive, tmp_path / 'state.json')
+    watcher.poll()
+    week_04 = watcher.catalog.get('All_Data_Week_04.csv')
+    drive.put_file('other.csv', b'x', parent='elsewhere')
+    drive.delete_file(week_04['id'])
+
+    changed = watcher.poll()
+    assert [f['id'] for f in changed] == [week_04['id']]
+    assert watcher.catalog.get('All_Data_Week_04.csv') is None
+
+
+def test_error_resets_token_and_next_poll_relists(drive, tmp_path):
+    broken = {'on': False}
+    service = drive.service()
+    watcher = make_watcher(drive, tmp_path / 'state.json',
+                           lambda: BrokenService(service) if broken['on'] else service)
+    watcher.poll()
+
+    broken['on'] = True
+    drive.put_file('All_Data_Week_05.csv', b'week_number\n5\n')
+    assert watcher.poll() == []
+    assert watcher.last_error is not None
+    assert watcher.page_token is None
+    assert watcher.catalog.loaded
+
+    broken['on'] = False
+    watcher.poll()
+    assert watcher.last_error is None
+    assert watcher.page_token == str(drive.change_counter)
+    assert drive.list_calls == 2
+    assert watcher.catalog.get('All_Data_Week_05.csv') is not None
+
+
+def test_list_folder_pages_follows_page_tokens():
+    drive = FakeDrive(root_id=FOLDER_ID, max_page_size=2)
+    subfolder = drive.put_file('archive', b'', mime_type=FOLDER_MIME_TYPE)
+    for week in range(1, 6):
+        drive.put_file(f'All_Data_Week_{week:02d}.csv', b'x')
+    drive.put_file('All_Data_Week_01.csv', b'old', parent=subfolder['id'])
+
+    files = gdrive.list_folder_pages(drive.service(), FOLDER_ID)
+    assert drive.list_calls == 3
+    assert sorted(f['name'] for f in files) == \
+        ['All_Data_Week_01.csv', 'All_Data_Week_02.csv', 'All_Data_Week_03.csv',
+         'All_Data_Week_04.csv', 'All_Data_Week_05.csv', 'archive']
+    assert len({f['id'] for f in files}) == 6
+
+
+def test_list_folder_pages_raises_without_service():
+    with pytest.raises(Exception):
+        gdrive.list_folder_pages(None, FOLDER_ID)
@@ -0,0 +1,98 @@
+import gzip
+import io
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from exports import XLSX_AVAILABLE, ExportCache, available_formats, export_key
+from week_store import PARQUET_AVAILABLE
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({
+        'product_name': ['打印机 A', 'Filament, 1kg', None],
+        'total_score': [45.5, 38.25, None],
+        'views': [1000, 20, 0],
+    })
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ExportCache(str(tmp_path / 'exports'))
+
+
+def test_export_key_depends_on_revision_and_filters():
+    key = export_key('rev1', {'category': '全部', 'search': ''})
+    assert key == export_key('rev1', {'search': '', 'category': '全部'})
+    assert key != export_key('rev2', {'category': '全部', 'search': ''})
+    assert key != export_key('rev1', {'category': 'Other', 'search': ''})
+
+
+def test_csv_round_trip(cache, frame):
+    path = cache.build('k', 'csv.gz', lambda: {'data': frame})
+    with gzip.open(path, 'rb') as f:
+        restored = pd.read_csv(io.BytesIO(f.read()), encoding='utf-8-sig')
+    pd.testing.assert_frame_equal(restored, frame)
+
+
+@pytest.mark.skipif(not PARQUET_AVAILABLE, reason="pyarrow is not installed")
+def test_parquet_round_trip(cache, frame):
+    path = cache.build('k', 'parquet', lambda: {'data': frame})
+    pd.testing.assert_frame_equal(pd.read_parquet(path), frame, check_dtype=False)
+
+
+@pytest.mark.skipif(not XLSX_AVAILABLE, reason="xlsxwriter is not installed")
+def test_xlsx_round_trip(cache, frame):
+    pytest.importorskip('openpyxl')
+    summary = pd.DataFrame({'rows': [len(frame)]})
+    path = cache.build('k', 'xlsx', lambda: {'data': frame, 'summary': summary})
+    sheets = pd.read_excel(path, sheet_name=None)
+    assert list(sheets) == ['data', 'summary']
+    pd.testing.assert_frame_equal(sheets['data'], frame, check_dtype=False)
+
+
+def test_build_reuses_existing_file(cache, frame):
+    calls = []
+
+    def sheets():
+        calls.append(1)
+        return {'data': frame}
+
+    first = cache.build('k', 'csv.gz', sheets)
+    assert cache.get('k', 'csv.gz') == first
+    assert cache.build('k', 'csv.gz', sheets) == first
+    assert len(calls) == 1
+
+
+def test_concurrent_builds_run_once(cache, frame):
+    calls = []
+
+    def sheets():
+        calls.append(1)
+        time.sleep(0.05)
+        return {'data': frame}
+
+    threads = [threading.Thread(target=cache.build, args=('k', 'csv.gz', sheets)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert cache._building == {}
+
+
+def test_eviction_keeps_latest_file(tmp_path, frame):
+    cache = ExportCache(str(tmp_path / 'exports'), max_bytes=1)
+    old = cache.build('old', 'csv.gz', lambda: {'data': frame})
+    new = cache.build('new', 'csv.gz', lambda: {'data': frame})
+    assert not old.exists() and new.exists()
+    assert cache.get('old', 'csv.gz') is None
+
+
+def test_unknown_format(cache, frame):
+    assert 'csv.gz' in available_formats()
+    with pytest.raises(ValueError):
+        cache.build('k', 'json', lambda: {'data': frame})
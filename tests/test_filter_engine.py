@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from filter_engine import ALL_CATEGORIES, FilterIndex
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(7)
+    rows = 500
+    scores = rng.uniform(20, 60, rows).astype(np.float32)
+    scores[rng.choice(rows, 20, replace=False)] = np.nan
+    return pd.DataFrame({
+        'product_category': pd.Categorical(rng.choice(['Top Product', 'Watch Product', 'Other'], rows)),
+        'total_score': scores,
+        'views': rng.integers(0, 10_000, rows),
+    })
+
+
+def expected_mask(df, category, score_range):
+    mask = pd.Series(True, index=df.index)
+    if category != ALL_CATEGORIES:
+        mask &= df['product_category'] == category
+    if score_range is not None:
+        mask &= (df['total_score'] >= score_range[0]) & (df['total_score'] <= score_range[1])
+    return mask.to_numpy()
+
+
+@pytest.mark.parametrize('category', [ALL_CATEGORIES, 'Top Product', 'Other', 'Missing'])
+@pytest.mark.parametrize('score_range', [None, (20.0, 60.0), (35.5, 45.0), (50.0, 40.0)])
+def test_positions_match_boolean_filter(frame, category, score_range):
+    index = FilterIndex(frame)
+    positions = index.positions(category, score_range)
+    assert positions.tolist() == np.flatnonzero(expected_mask(frame, category, score_range)).tolist()
+
+
+@pytest.mark.parametrize('by', ['total_score', 'views'])
+@pytest.mark.parametrize('ascending', [False, True])
+@pytest.mark.parametrize('category', [ALL_CATEGORIES, 'Watch Product'])
+def test_sort_matches_sort_values(frame, by, ascending, category):
+    index = FilterIndex(frame)
+    positions = index.positions(category, None)
+    ordered = index.sort(positions, by, ascending)
+    expected = frame.iloc[positions].sort_values(by, ascending=ascending, kind='stable')
+    assert frame[by].iloc[ordered].tolist() == pytest.approx(expected[by].tolist(), nan_ok=True)
+    assert sorted(ordered.tolist()) == positions.tolist()
+
+
+def test_length_matches_frame(frame):
+    assert len(FilterIndex(frame)) == len(frame)
@@ -0,0 +1,37 @@
+import pandas as pd
+
+from product_identity import ProductIdentityIndex
+
+
+def week_frame(*urls):
+    return pd.DataFrame({'tiktok_url': list(urls), 'product_name': [f"p{i}" for i in range(len(urls))]})
+
+
+def test_sync_records_served_revision(tmp_path):
+    index = ProductIdentityIndex(str(tmp_path / 'index.json'))
+    # 查询版本之后文件被替换：读到的是 b
+    assert index.sync({4: 'a'}, lambda week: (week_frame('https://x.com/1'), 'b')) == [4]
+    assert index.revisions() == {4: 'b'}
+    # 目录索引追上之后不再重复写入
+    assert index.sync({4: 'b'}, lambda week: (None, None)) == []
+
+
+def test_sync_falls_back_to_requested_revision(tmp_path):
+    index = ProductIdentityIndex(str(tmp_path / 'index.json'))
+    index.sync({4: 'a'}, lambda week: (week_frame('https://x.com/1'), None))
+    assert index.revisions() == {4: 'a'}
+
+
+def test_sync_links_weeks_and_survives_reload(tmp_path):
+    path = str(tmp_path / 'index.json')
+    index = ProductIdentityIndex(path)
+    frames = {4: week_frame('https://www.x.com/1?s=1', 'https://x.com/2'),
+              5: week_frame('https://x.com/2', 'https://x.com/1/')}
+    index.sync({4: 'a', 5: 'b'}, lambda week: (frames[week], None))
+
+    reloaded = ProductIdentityIndex(path)
+    key = reloaded.key_at(4, 0)
+    assert key == reloaded.key_at(5, 1)
+    assert reloaded.lookup(key) == [(4, 0), (5, 1)]
+    assert reloaded.sync({5: 'b'}, lambda week: (None, None)) == [4]
+    assert reloaded.lookup(key) == [(5, 1)]
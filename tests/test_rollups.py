@@ -0,0 +1,63 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import rollups
+from rollups import ALL, compute_rollup, group_summary, select, source_rollup_dir
+
+
+@pytest.fixture
+def week():
+    rng = np.random.default_rng(3)
+    rows = 200
+    return pd.DataFrame({
+        'product_category': rng.choice(['Top Product', 'Other'], rows),
+        'platform': rng.choice(['TikTok', 'Amazon', None], rows),
+        'total_score': rng.uniform(20, 60, rows),
+        'views': rng.integers(0, 100_000, rows),
+    })
+
+
+def test_overall_row_matches_frame(week):
+    rollup = compute_rollup(week, 7)
+    overall = select(rollup).iloc[0]
+    assert overall['week_number'] == 7
+    assert overall['count'] == len(week)
+    assert overall['total_score_mean'] == pytest.approx(week['total_score'].mean())
+    assert overall['views_sum'] == week['views'].sum()
+    assert overall['total_score_p50'] == pytest.approx(week['total_score'].median())
+
+
+def test_category_rows_match_groupby(week):
+    rollup = compute_rollup(week, 7)
+    by_category = select(rollup, category=None).set_index('product_category')
+    expected = week.groupby('product_category')['total_score'].agg(['count', 'mean', 'max'])
+    assert by_category['total_score_count'].to_dict() == expected['count'].to_dict()
+    assert by_category['total_score_mean'].to_dict() == pytest.approx(expected['mean'].to_dict())
+    assert by_category['total_score_max'].to_dict() == pytest.approx(expected['max'].to_dict())
+
+
+def test_missing_platform_is_grouped_as_unknown(week):
+    rollup = compute_rollup(week, 7)
+    by_platform = select(rollup, platform=None).set_index('platform')
+    assert by_platform.loc['未知', 'count'] == week['platform'].isna().sum()
+    assert ALL not in by_platform.index
+
+
+def test_rollup_dir_does_not_depend_on_cwd(tmp_path, monkeypatch):
+    expected = source_rollup_dir('drive')
+    monkeypatch.chdir(tmp_path)
+    assert source_rollup_dir('drive') == expected
+    assert os.path.dirname(os.path.abspath(rollups.__file__)) in expected
+    assert source_rollup_dir('drive', str(tmp_path)) == os.path.join(str(tmp_path), 'drive')
+
+
+def test_group_summary_matches_groupby(week):
+    summary = group_summary(compute_rollup(week, 7), 'product_category').set_index('product_category')
+    expected = week.groupby('product_category')['total_score'].agg(['size', 'mean'])
+    assert summary['product_count'].to_dict() == expected['size'].to_dict()
+    assert summary['total_score'].to_dict() == pytest.approx(expected['mean'].to_dict())
+    assert summary['product_count'].is_monotonic_decreasing
+    assert group_summary(compute_rollup(week.drop(columns='platform'), 7), 'platform').empty
@@ -0,0 +1,33 @@
+import pandas as pd
+
+from schema import apply_schema
+
+
+def test_scores_keep_float64():
+    df = apply_schema(pd.DataFrame({
+        'total_score': [20.04, 55.31],
+        'engagement_rate': [0.1, 0.25],
+    }))
+    assert df['total_score'].dtype == 'float64'
+    assert df['engagement_rate'].dtype == 'float64'
+    assert float(df['total_score'].min()) == 20.04
+
+
+def test_only_identifier_ints_are_downcast():
+    df = apply_schema(pd.DataFrame({
+        'week_number': [4, 5],
+        'product_rank': [1, 2],
+        'views': [1_000, 2_000],
+    }))
+    assert df['week_number'].dtype == 'int8'
+    assert df['product_rank'].dtype == 'int8'
+    assert df['views'].dtype == 'int64'
+
+
+def test_low_cardinality_strings_become_categories():
+    df = apply_schema(pd.DataFrame({
+        'product_category': ['家居', '家居', '玩具', '家居'],
+        'product_name': ['a', 'b', 'c', 'd'],
+    }))
+    assert isinstance(df['product_category'].dtype, pd.CategoricalDtype)
+    assert not isinstance(df['product_name'].dtype, pd.CategoricalDtype)
@@ -0,0 +1,75 @@
+import pandas as pd
+import pytest
+
+import sql_engine
+from sql_engine import MEMORY_DB, WeekQueryEngine
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = WeekQueryEngine(str(tmp_path / 'weeks.sqlite'), backend='sqlite')
+    yield engine
+    engine.close()
+
+
+def week_frame(week, rows):
+    return pd.DataFrame({'product_category': ['Top Product'] * rows, 'total_score': [float(week)] * rows})
+
+
+def test_sync_registers_only_changed_weeks(engine):
+    loads = []
+
+    def load(week):
+        loads.append(week)
+        return week_frame(week, week)
+
+    assert engine.sync({4: 'a', 5: 'b'}, load) == [4, 5]
+    assert engine.sync({4: 'a', 5: 'b'}, load) == []
+    assert engine.sync({4: 'a', 5: 'c'}, load) == [5]
+    assert loads == [4, 5, 5]
+    assert engine.revisions() == {4: 'a', 5: 'c'}
+
+    counts = engine.query("SELECT week_number, COUNT(*) AS n FROM weeks GROUP BY week_number ORDER BY week_number")
+    assert counts['n'].tolist() == [4, 5]
+
+
+def test_sync_drops_removed_weeks(engine):
+    engine.sync({4: 'a', 5: 'b'}, lambda week: week_frame(week, 1))
+    assert engine.sync({5: 'b'}, lambda week: week_frame(week, 1)) == [4]
+    assert engine.query("SELECT DISTINCT week_number FROM weeks")['week_number'].tolist() == [5]
+
+
+def test_sync_skips_weeks_that_fail_to_load(engine):
+    assert engine.sync({4: 'a'}, lambda week: None) == []
+    assert engine.revisions() == {}
+
+
+def test_query_is_read_only(engine):
+    engine.sync({4: 'a'}, lambda week: week_frame(week, 2))
+    with pytest.raises(Exception):
+        engine.query("DELETE FROM week_04")
+    assert engine.query("SELECT COUNT(*) AS n FROM week_04")['n'][0] == 2
+    # 查询之后仍可写入
+    assert engine.sync({4: 'b'}, lambda week: week_frame(week, 3)) == [4]
+
+
+def test_in_memory_engine(tmp_path, monkeypatch):
+    monkeypatch.setattr(sql_engine, 'DEFAULT_ENGINE_DIR', str(tmp_path))
+    engine = WeekQueryEngine(MEMORY_DB, backend='sqlite')
+    assert engine.sync({4: 'a'}, lambda week: week_frame(week, 2)) == [4]
+    assert engine.category_breakdown()['product_count'].tolist() == [2]
+    assert list(tmp_path.iterdir()) == []
+    engine.close()
+
+
+def test_shared_engine_falls_back_to_memory_when_file_cannot_be_opened(tmp_path, monkeypatch):
+    monkeypatch.setattr(sql_engine, 'DEFAULT_ENGINE_DIR', str(tmp_path))
+    monkeypatch.setattr(sql_engine, 'DUCKDB_AVAILABLE', False)
+    monkeypatch.setattr(sql_engine, '_engines', {})
+    # 数据库路径被占用（例如另一个进程持有DuckDB文件锁）
+    (tmp_path / 'locked.sqlite').mkdir()
+    engine = sql_engine.get_query_engine('locked')
+    assert engine.in_memory
+    assert engine.sync({4: 'a'}, lambda week: week_frame(week, 3)) == [4]
+    assert sql_engine.get_query_engine('locked') is engine
+    engine.close()
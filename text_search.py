@@ -0,0 +1,402 @@
+"""
+AI分析文本全文检索
+对 ai_market_positioning / ai_target_audience / ai_pricing_strategy / ai_risks
+建立BM25倒排索引：中文按相邻两字切分（bigram），英文与数字按整词切分。
+每个周次的索引按文件版本保存在磁盘上，跨周查询时合并各周的统计量打分
+"""
+
+import io
+import os
+import re
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from disk_cache import atomic_write
+from schema import AI_TEXT_COLUMNS
+
+# 索引文件保存目录
+DEFAULT_INDEX_DIR = os.getenv('TEXT_INDEX_DIR', os.path.join('.cache', 'search'))
+
+# BM25参数
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_TOKEN_PATTERN = re.compile(r'[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+|[a-z0-9]+(?:[.\-][a-z0-9]+)*')
+
+# 查询中表示“并且”的连接词，不作为检索词
+_QUERY_CONNECTIVES = {'and', '和', '与', '及', '并且'}
+
+
+def tokenize(text) -> List[str]:
+    """
+    切分文本：连续的中文按相邻两字切分（单字保留为一个词），英文/数字按整词切分
+
+    Args:
+        text: 文本
+
+    Returns:
+        List[str]: 词列表
+    """
+    if text is None or text != text:
+        return []
+    tokens = []
+    for run in _TOKEN_PATTERN.findall(str(text).casefold()):
+        if run[0].isascii():
+            tokens.append(run)
+        elif len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def parse_query(query: str) -> List[List[str]]:
+    """
+    把查询拆成若干子句，每个子句是一个查询词切分后的词列表
+
+    例如 "环保 and TPU" -> [['环保'], ['tpu']]
+
+    Args:
+        query: 查询文本（空格分隔多个查询词）
+
+    Returns:
+        List[List[str]]: 子句列表
+    """
+    clauses = []
+    for word in str(query).split():
+        if word.casefold() in _QUERY_CONNECTIVES:
+            continue
+        tokens = tokenize(word)
+        if tokens:
+            clauses.append(tokens)
+    return clauses
+
+
+class BM25Index:
+    """
+    单个周次的BM25倒排索引
+
+    文档为周次数据的一行（多个AI文本列拼接），文档编号即行位置。
+    """
+
+    def __init__(self, postings: Dict[str, Tuple[np.ndarray, np.ndarray]],
+                 doc_lens: np.ndarray, revision: Optional[str] = None):
+        """
+        Args:
+            postings: 词 -> (文档编号数组, 词频数组)
+            doc_lens: 每个文档的词数
+            revision: 建立索引时的文件版本
+        """
+        self.postings = postings
+        self.doc_lens = doc_lens
+        self.revision = revision
+
+    @classmethod
+    def build(cls, documents: List[str], revision: Optional[str] = None) -> 'BM25Index':
+        """
+        从文档列表建立索引
+
+        Args:
+            documents: 文档文本
+            revision: 文件版本
+
+        Returns:
+            BM25Index: 索引
+        """
+        doc_ids: Dict[str, List[int]] = {}
+        freqs: Dict[str, List[int]] = {}
+        doc_lens = np.zeros(len(documents), dtype=np.int32)
+        for doc_id, text in enumerate(documents):
+            tokens = tokenize(text)
+            doc_lens[doc_id] = len(tokens)
+            for token, tf in Counter(tokens).items():
+                doc_ids.setdefault(token, []).append(doc_id)
+                freqs.setdefault(token, []).append(tf)
+        postings = {
+            token: (np.asarray(ids, dtype=np.int32), np.asarray(freqs[token], dtype=np.int32))
+            for token, ids in doc_ids.items()
+        }
+        return cls(postings, doc_lens, revision)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, revision: Optional[str] = None,
+                   columns: List[str] = AI_TEXT_COLUMNS) -> 'BM25Index':
+        """
+        从周次数据建立索引（缺少的列视为空文本）
+
+        Args:
+            df: 周次数据
+            revision: 文件版本
+            columns: 参与检索的文本列
+
+        Returns:
+            BM25Index: 索引
+        """
+        present = [col for col in columns if col in df.columns]
+        if not present:
+            return cls.build([''] * len(df), revision)
+        text = df[present].astype(object).where(df[present].notna(), '').astype(str)
+        documents = text.agg('\n'.join, axis=1).tolist()
+        return cls.build(documents, revision)
+
+    @property
+    def num_docs(self) -> int:
+        return len(self.doc_lens)
+
+    def doc_freq(self, token: str) -> int:
+        """包含该词的文档数"""
+        entry = self.postings.get(token)
+        return 0 if entry is None else len(entry[0])
+
+    def matching_docs(self, clauses: List[List[str]]) -> np.ndarray:
+        """
+        同时满足所有子句（子句内全部词都出现）的文档
+
+        Args:
+            clauses: parse_query() 的结果
+
+        Returns:
+            np.ndarray: 文档编号
+        """
+        result = None
+        for clause in clauses:
+            for token in clause:
+                entry = self.postings.get(token)
+                if entry is None:
+                    return np.empty(0, dtype=np.int32)
+                result = entry[0] if result is None else np.intersect1d(result, entry[0], assume_unique=True)
+                if len(result) == 0:
+                    return result
+        return result if result is not None else np.empty(0, dtype=np.int32)
+
+    def score(self, tokens: List[str], idf: Dict[str, float], avgdl: float) -> np.ndarray:
+        """
+        计算所有文档的BM25得分
+
+        Args:
+            tokens: 查询词
+            idf: 词 -> IDF（跨周查询时使用全局统计量）
+            avgdl: 平均文档长度
+
+        Returns:
+            np.ndarray: 每个文档的得分
+        """
+        scores = np.zeros(self.num_docs, dtype=np.float64)
+        if avgdl <= 0:
+            return scores
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lens / avgdl)
+        for token in set(tokens):
+            entry = self.postings.get(token)
+            if entry is None:
+                continue
+            ids, tfs = entry
+            scores[ids] += idf[token] * tfs * (BM25_K1 + 1) / (tfs + norm[ids])
+        return scores
+
+    def save(self, path: Path):
+        """
+        保存索引（npz格式，原子写入）
+
+        Args:
+            path: 文件路径
+        """
+        terms = list(self.postings)
+        lengths = np.asarray([len(self.postings[t][0]) for t in terms], dtype=np.int64)
+        offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        empty = np.empty(0, dtype=np.int32)
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer,
+            terms=np.asarray(terms, dtype=str),
+            offsets=offsets,
+            doc_ids=np.concatenate([self.postings[t][0] for t in terms]) if terms else empty,
+            tfs=np.concatenate([self.postings[t][1] for t in terms]) if terms else empty,
+            doc_lens=self.doc_lens,
+            revision=np.asarray(self.revision or '', dtype=str),
+        )
+        atomic_write(Path(path), buffer.getvalue())
+
+    @classmethod
+    def load(cls, path: Path) -> 'BM25Index':
+        """
+        读取保存的索引
+
+        Args:
+            path: 文件路径
+
+        Returns:
+            BM25Index: 索引
+        """
+        with np.load(path, allow_pickle=False) as data:
+            terms = data['terms'].tolist()
+            offsets = data['offsets']
+            doc_ids = data['doc_ids']
+            tfs = data['tfs']
+            postings = {
+                term: (doc_ids[offsets[i]:offsets[i + 1]], tfs[offsets[i]:offsets[i + 1]])
+                for i, term in enumerate(terms)
+            }
+            return cls(postings, data['doc_lens'], str(data['revision']) or None)
+
+
+def search_indexes(indexes: Dict[int, BM25Index], query: str,
+                   top_k: int = 50, match_all: bool = True) -> pd.DataFrame:
+    """
+    在多个周次的索引中检索，IDF与平均文档长度按全部周次合并计算
+
+    Args:
+        indexes: 周次 -> 索引
+        query: 查询文本，空格分隔多个查询词
+        top_k: 最多返回的结果数
+        match_all: True 时只返回包含全部查询词的文档
+
+    Returns:
+        pd.DataFrame: week_number, row, score 三列，按得分降序
+    """
+    columns = ['week_number', 'row', 'score']
+    clauses = parse_query(query)
+    if not clauses or not indexes:
+        return pd.DataFrame(columns=columns)
+
+    tokens = [token for clause in clauses for token in clause]
+    total_docs = sum(index.num_docs for index in indexes.values())
+    total_len = sum(int(index.doc_lens.sum()) for index in indexes.values())
+    if total_docs == 0:
+        return pd.DataFrame(columns=columns)
+    avgdl = total_len / total_docs
+    idf = {}
+    for token in set(tokens):
+        df_t = sum(index.doc_freq(token) for index in indexes.values())
+        idf[token] = float(np.log(1 + (total_docs - df_t + 0.5) / (df_t + 0.5)))
+
+    results = []
+    for week_number, index in indexes.items():
+        scores = index.score(tokens, idf, avgdl)
+        if match_all:
+            rows = index.matching_docs(clauses)
+        else:
+            rows = np.flatnonzero(scores > 0)
+        if len(rows) == 0:
+            continue
+        results.append(pd.DataFrame({
+            'week_number': week_number,
+            'row': rows,
+            'score': scores[rows],
+        }))
+
+    if not results:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(results, ignore_index=True).nlargest(top_k, 'score').reset_index(drop=True)
+
+
+class WeekTextIndex:
+    """
+    按周次管理BM25索引
+
+    内存中按 (周次, 版本) 缓存；磁盘上每个周次保存一个索引文件，
+    版本一致时直接读取，否则重新读取文本列并建立索引。
+    新索引记录的是实际读到的文本的版本，而不是调用方请求的版本，
+    二者不同时（例如文件在两次查询之间被更新）下次请求会重新建立。
+    不同数据来源（Drive/本地）应使用不同的 index_dir。
+    """
+
+    def __init__(self, load_text_fn: Callable[[int], Tuple[Optional[pd.DataFrame], Optional[str]]],
+                 index_dir: str = DEFAULT_INDEX_DIR):
+        """
+        Args:
+            load_text_fn: 读取某周AI文本列的函数，返回 (文本列, 实际读到的文件版本)
+            index_dir: 索引文件保存目录
+        """
+        self._load_text_fn = load_text_fn
+        self.index_dir = Path(index_dir)
+        self._lock = threading.Lock()
+        self._indexes: Dict[int, BM25Index] = {}
+
+    def index_path(self, week_number: int) -> Path:
+        """周次索引文件的路径"""
+        return self.index_dir / f"All_Data_Week_{week_number:02d}.bm25.npz"
+
+    def get(self, week_number: int, revision: str) -> Optional[BM25Index]:
+        """
+        获取指定周次、指定版本的索引
+
+        Args:
+            week_number: 周次编号
+            revision: 文件版本
+
+        Returns:
+            BM25Index: 索引，无法读取文本时返回None
+        """
+        with self._lock:
+            index = self._indexes.get(week_number)
+        if index is not None and index.revision == revision:
+            return index
+
+        path = self.index_path(week_number)
+        index = None
+        if path.exists():
+            try:
+                index = BM25Index.load(path)
+            except Exception as e:
+                print(f"Error reading text index {path}: {e}")
+            if index is not None and index.revision != revision:
+                index = None
+
+        if index is None:
+            df, served = self._load_text_fn(week_number)
+            if df is None:
+                return None
+            index = BM25Index.from_frame(df, served or revision)
+            try:
+                index.save(path)
+            except OSError as e:
+                print(f"Error saving text index {path}: {e}")
+
+        with self._lock:
+            self._indexes[week_number] = index
+        return index
+
+    def search(self, revisions: Dict[int, str], query: str,
+               top_k: int = 50, match_all: bool = True) -> pd.DataFrame:
+        """
+        跨周检索
+
+        Args:
+            revisions: 周次 -> 文件版本（data_access.week_revisions() 的结果）
+            query: 查询文本
+            top_k: 最多返回的结果数
+            match_all: True 时只返回包含全部查询词的文档
+
+        Returns:
+            pd.DataFrame: week_number, row, score 三列
+        """
+        indexes = {}
+        for week_number, revision in sorted(revisions.items()):
+            index = self.get(week_number, revision)
+            if index is not None:
+                indexes[week_number] = index
+        return search_indexes(indexes, query, top_k=top_k, match_all=match_all)
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+    from data_access import local_file_revision, week_revisions
+    from week_store import local_week_files, read_week_file
+
+    files = local_week_files('reports')
+    searcher = WeekTextIndex(lambda week: (read_week_file(files[week], AI_TEXT_COLUMNS),
+                                           local_file_revision(files[week])),
+                             os.path.join(DEFAULT_INDEX_DIR, 'local'))
+    query = ' '.join(sys.argv[1:]) or '环保 TPU'
+    revisions = week_revisions(source='local')
+
+    start = time.perf_counter()
+    results = searcher.search(revisions, query)
+    print(f"{query!r}: {len(results)} results in {(time.perf_counter() - start) * 1000:.1f} ms")
+    print(results.head(10).to_string(index=False))
@@ -0,0 +1,200 @@
+"""
+周次数据存储格式
+周次快照以Parquet（列式、带类型、zstd压缩）保存，两种格式可以并存：
+Parquet不比CSV旧时优先读取Parquet，否则（CSV在生成快照后又被更新）读取CSV
+"""
+
+import glob
+import io
+import os
+import re
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from schema import apply_schema
+
+try:
+    import pyarrow  # noqa: F401
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+PARQUET_COMPRESSION = 'zstd'
+
+WEEK_FILE_PATTERN = re.compile(r'^All_Data_Week_(\d+)\.(parquet|csv)$')
+
+
+def week_parquet_filename(week_number: int) -> str:
+    """
+    周次数据Parquet的文件名
+
+    Args:
+        week_number: 周次编号
+
+    Returns:
+        str: 例如 "All_Data_Week_05.parquet"
+    """
+    return f"All_Data_Week_{week_number:02d}.parquet"
+
+
+def is_parquet(filename: str) -> bool:
+    """按扩展名判断是否为Parquet文件"""
+    return str(filename).lower().endswith('.parquet')
+
+
+def write_week_snapshot(df: pd.DataFrame, path: str) -> bool:
+    """
+    以Parquet格式保存周次快照
+
+    Args:
+        df: 周次数据
+        path: 目标文件路径（.parquet）
+
+    Returns:
+        bool: 是否写入成功（未安装pyarrow时返回False）
+    """
+    if not PARQUET_AVAILABLE:
+        return False
+    try:
+        df.to_parquet(path, engine='pyarrow', compression=PARQUET_COMPRESSION, index=False)
+        return True
+    except Exception as e:
+        print(f"Error writing parquet snapshot {path}: {e}")
+        return False
+
+
+def parquet_is_current(parquet_path: str, csv_path: str) -> bool:
+    """
+    同一周次的Parquet快照是否可以代替CSV（Parquet存在且不比CSV旧）
+
+    Args:
+        parquet_path: Parquet文件路径
+        csv_path: CSV文件路径
+
+    Returns:
+        bool: 应读取Parquet时返回True
+    """
+    try:
+        parquet_mtime = os.path.getmtime(parquet_path)
+    except OSError:
+        return False
+    try:
+        return parquet_mtime >= os.path.getmtime(csv_path)
+    except OSError:
+        return True
+
+
+def _parquet_columns(source, columns: Optional[List[str]]) -> Optional[List[str]]:
+    """把请求的列限制在Parquet文件实际存在的列中（只读取文件尾部的schema）"""
+    if columns is None:
+        return None
+    import pyarrow.parquet as pq
+    names = set(pq.read_schema(source).names)
+    return [col for col in columns if col in names]
+
+
+def read_week_bytes(content: bytes, filename: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    从文件内容解析周次数据
+
+    Args:
+        content: 文件内容
+        filename: 文件名（用于判断格式）
+        columns: 只读取这些列（文件中不存在的列会被忽略），为None时读取全部
+
+    Returns:
+        pd.DataFrame: 周次数据（已按 schema.apply_schema 转换类型）
+    """
+    buffer = io.BytesIO(content)
+    if is_parquet(filename):
+        columns = _parquet_columns(buffer, columns)
+        buffer.seek(0)
+        return apply_schema(pd.read_parquet(buffer, columns=columns))
+    if columns is None:
+        return apply_schema(pd.read_csv(buffer))
+    wanted = set(columns)
+    return apply_schema(pd.read_csv(buffer, usecols=lambda col: col in wanted))
+
+
+def read_week_file(path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    读取本地周次数据文件，同名Parquet存在且不比CSV旧时优先读取Parquet
+
+    Args:
+        path: 文件路径（.csv 或 .parquet）
+        columns: 只读取这些列（文件中不存在的列会被忽略），为None时读取全部
+
+    Returns:
+        pd.DataFrame: 周次数据（已按 schema.apply_schema 转换类型）
+    """
+    path = str(path)
+    if not is_parquet(path) and PARQUET_AVAILABLE:
+        parquet_path = os.path.splitext(path)[0] + '.parquet'
+        if parquet_is_current(parquet_path, path):
+            path = parquet_path
+    if is_parquet(path):
+        return apply_schema(pd.read_parquet(path, columns=_parquet_columns(path, columns)))
+    if columns is None:
+        return apply_schema(pd.read_csv(path))
+    wanted = set(columns)
+    return apply_schema(pd.read_csv(path, usecols=lambda col: col in wanted))
+
+
+def local_week_files(reports_dir: str = 'reports') -> Dict[int, str]:
+    """
+    列出本地目录中的周次数据文件（同一周优先不比CSV旧的Parquet）
+
+    Args:
+        reports_dir: 报告目录
+
+    Returns:
+        Dict[int, str]: 周次 -> 文件路径
+    """
+    files: Dict[int, str] = {}
+    for path in sorted(glob.glob(str(Path(reports_dir) / 'All_Data_Week_*'))):
+        match = WEEK_FILE_PATTERN.match(Path(path).name)
+        if not match:
+            continue
+        week_number = int(match.group(1))
+        if match.group(2) == 'parquet' and not PARQUET_AVAILABLE:
+            continue
+        if week_number not in files:
+            files[week_number] = path
+        elif is_parquet(path) and parquet_is_current(path, files[week_number]):
+            files[week_number] = path
+        elif not is_parquet(path) and not parquet_is_current(files[week_number], path):
+            files[week_number] = path
+    return dict(sorted(files.items()))
+
+
+def convert_directory(reports_dir: str = 'reports') -> List[str]:
+    """
+    为目录中只有CSV（或Parquet快照比CSV旧）的周次生成Parquet快照
+
+    Args:
+        reports_dir: 报告目录
+
+    Returns:
+        List[str]: 新生成的Parquet文件
+    """
+    written = []
+    for path in sorted(glob.glob(str(Path(reports_dir) / 'All_Data_Week_*.csv'))):
+        parquet_path = os.path.splitext(path)[0] + '.parquet'
+        if parquet_is_current(parquet_path, path):
+            continue
+        if write_week_snapshot(pd.read_csv(path), parquet_path):
+            written.append(parquet_path)
+    return written
+
+
+if __name__ == "__main__":
+    target = sys.argv[1] if len(sys.argv) > 1 else 'reports'
+    if not PARQUET_AVAILABLE:
+        print("❌ pyarrow is not installed")
+        sys.exit(1)
+    for parquet_path in convert_directory(target):
+        csv_size = os.path.getsize(os.path.splitext(parquet_path)[0] + '.csv')
+        print(f"✅ {parquet_path} ({csv_size:,} → {os.path.getsize(parquet_path):,} bytes)")